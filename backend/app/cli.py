@@ -0,0 +1,199 @@
+"""Analyse URLs from the command line without starting the web server.
+
+Reads one URL per line from the given files, or from stdin, and runs the
+same fetch, tag parsing and rule checks as ``POST /analyze/batch``. One
+NDJSON object is written per URL as soon as it finishes. Run from the
+``backend`` directory::
+
+    python -m app urls.txt > results.ndjson
+    cat urls.txt | python -m app --ai
+
+The exit status is 1 when any URL could not be analysed. OpenAI and the
+database are only loaded with ``--ai`` or ``--record-history``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict
+from typing import Any, TextIO
+from urllib.parse import urlsplit
+
+from .config import get_settings
+
+
+def read_urls(sources: Iterable[str]) -> Iterator[str]:
+    """Yield the URLs listed in files (``-`` for stdin), skipping blanks and ``#`` comments."""
+    for source in sources:
+        handle = sys.stdin if source == "-" else open(source, encoding="utf-8")
+        try:
+            for line in handle:
+                url = line.strip()
+                if url and not url.startswith("#"):
+                    yield url
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+
+def _record(item: Any) -> dict[str, Any]:
+    return {
+        "url": item.url,
+        "status_code": item.status_code,
+        "load_time_ms": item.load_time_ms,
+        "seo_tags": item.seo_tags,
+        "issues": [finding.message for finding in item.findings],
+        "findings": [asdict(finding) for finding in item.findings],
+        "error": item.error,
+    }
+
+
+async def _add_feedback(record: dict[str, Any], item: Any) -> None:
+    from .schemas import SEOTags
+    from .services.ai_feedback import AIClientError, generate_feedback
+
+    try:
+        ai_feedback, google_preview, social_preview = await generate_feedback(
+            SEOTags(**item.seo_tags), item.fetch_result, record["issues"]
+        )
+    except AIClientError as exc:
+        record["ai_error"] = str(exc)
+        return
+    except Exception as exc:  # noqa: BLE001 - one failed call must not abort the others
+        record["ai_error"] = f"AI feedback failed: {exc or type(exc).__name__}"
+        return
+    record.update(
+        ai_feedback=ai_feedback, google_preview=google_preview, social_preview=social_preview
+    )
+
+
+def _record_history(item: Any) -> None:
+    from .services.storage import SessionLocal, record_analysis
+
+    with SessionLocal() as session:
+        record_analysis(
+            session,
+            url=item.url,
+            status_code=item.status_code,
+            load_time_ms=item.load_time_ms,
+            timings=asdict(item.fetch_result.timings),
+            issue_ids=[finding.rule_id for finding in item.findings],
+            seo_tags=item.seo_tags,
+        )
+
+
+async def run(
+    urls: Iterable[str],
+    output: TextIO,
+    *,
+    concurrency: int,
+    per_host_concurrency: int,
+    use_ai: bool = False,
+    record_history: bool = False,
+) -> int:
+    """Analyse ``urls`` concurrently, writing NDJSON to ``output``; return the failure count."""
+    from .services.batch import BatchItem, iter_batch_analysis
+    from .services.fetcher import close_fetch_client
+    from .services.parse_stage import close_parse_stage
+
+    failures = 0
+    feedback_tasks: set[asyncio.Task[None]] = set()
+
+    def _write(record: dict[str, Any]) -> None:
+        nonlocal failures
+        if record["error"] is not None:
+            failures += 1
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+
+    async def _finish(record: dict[str, Any], item: BatchItem) -> None:
+        await _add_feedback(record, item)
+        _write(record)
+
+    if record_history:
+        from .services.storage import init_db
+
+        await asyncio.to_thread(init_db)
+
+    def _valid_urls() -> Iterator[str]:
+        # A generator, so URLs are read only as fast as the batch takes them.
+        for url in urls:
+            if urlsplit(url).scheme in ("http", "https"):
+                yield url
+            else:
+                _write(_record(BatchItem(url=url, error="Not an http(s) URL.")))
+
+    try:
+        async for item in iter_batch_analysis(
+            _valid_urls(), concurrency=concurrency, per_host_concurrency=per_host_concurrency
+        ):
+            record = _record(item)
+            if item.error is None and record_history:
+                await asyncio.to_thread(_record_history, item)
+            if item.error is None and use_ai:
+                # Feedback runs alongside the remaining fetches instead of holding them up.
+                task = asyncio.create_task(_finish(record, item))
+                feedback_tasks.add(task)
+                task.add_done_callback(feedback_tasks.discard)
+            else:
+                _write(record)
+        await asyncio.gather(*feedback_tasks)
+    finally:
+        await close_fetch_client()
+        close_parse_stage()
+    return failures
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a whole number of at least 1, got {value!r}")
+    return number
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="python -m app", description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "inputs", nargs="*", default=["-"], help="Files with one URL per line (default: stdin)."
+    )
+    parser.add_argument("-o", "--output", help="Write NDJSON here instead of stdout.")
+    parser.add_argument("--concurrency", type=_positive_int, default=settings.batch_concurrency)
+    parser.add_argument(
+        "--per-host-concurrency", type=_positive_int, default=settings.batch_per_host_concurrency
+    )
+    parser.add_argument(
+        "--ai", action="store_true", help="Add AI feedback and previews (needs OPENAI_API_KEY)."
+    )
+    parser.add_argument(
+        "--record-history",
+        action="store_true",
+        help="Also add each page to the analysis history database.",
+    )
+    args = parser.parse_args(argv)
+    for source in args.inputs:
+        if source != "-" and not (os.path.isfile(source) and os.access(source, os.R_OK)):
+            parser.error(f"cannot read input file {source!r}")
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        failures = asyncio.run(
+            run(
+                read_urls(args.inputs),
+                output,
+                concurrency=args.concurrency,
+                per_host_concurrency=args.per_host_concurrency,
+                use_ai=args.ai,
+                record_history=args.record_history,
+            )
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    sys.exit(1 if failures else 0)
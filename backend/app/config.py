@@ -13,10 +13,73 @@ class Settings(BaseSettings):
     """Application configuration loaded from environment variables."""
 
     openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
+    openai_timeout: float = Field(default=30.0, alias="OPENAI_TIMEOUT")
+    openai_max_retries: int = Field(default=2, alias="OPENAI_MAX_RETRIES")
+    openai_max_concurrency: int = Field(default=8, alias="OPENAI_MAX_CONCURRENCY")
+    openai_calls_per_minute: int = Field(default=0, alias="OPENAI_CALLS_PER_MINUTE")
+    ai_feedback_enabled: bool = Field(default=True, alias="AI_FEEDBACK_ENABLED")
+    ai_previews: bool = Field(default=False, alias="AI_PREVIEWS")
+    feedback_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 3600, alias="FEEDBACK_CACHE_TTL_SECONDS"
+    )
+    feedback_cache_max_entries: int = Field(
+        default=10_000, alias="FEEDBACK_CACHE_MAX_ENTRIES"
+    )
+    feedback_cache_memory_entries: int = Field(
+        default=256, alias="FEEDBACK_CACHE_MEMORY_ENTRIES"
+    )
     database_url: str | None = Field(default=None, alias="DATABASE_URL")
+    database_async: bool = Field(default=False, alias="DATABASE_ASYNC")
+    database_pool_size: int = Field(default=10, alias="DATABASE_POOL_SIZE")
+    database_max_overflow: int = Field(default=20, alias="DATABASE_MAX_OVERFLOW")
+    recent_flush_interval: float = Field(default=0.5, alias="RECENT_FLUSH_INTERVAL")
+    recent_flush_max_batch: int = Field(default=500, alias="RECENT_FLUSH_MAX_BATCH")
     cors_origins: list[str] = Field(
         default_factory=lambda: ["http://localhost:5173"]
     )
+    fetch_timeout: float = Field(default=15.0, alias="FETCH_TIMEOUT")
+    fetch_http2: bool = Field(default=True, alias="FETCH_HTTP2")
+    fetch_max_connections: int = Field(default=100, alias="FETCH_MAX_CONNECTIONS")
+    fetch_max_connections_per_host: int = Field(
+        default=6, alias="FETCH_MAX_CONNECTIONS_PER_HOST"
+    )
+    fetch_max_bytes: int = Field(default=5 * 1024 * 1024, alias="FETCH_MAX_BYTES")
+    parse_executor: str = Field(default="process", alias="PARSE_EXECUTOR")
+    parse_workers: int | None = Field(default=None, alias="PARSE_WORKERS")
+    parse_max_pending: int = Field(default=64, alias="PARSE_MAX_PENDING")
+    analysis_cache_ttl_seconds: float = Field(default=300.0, alias="ANALYSIS_CACHE_TTL_SECONDS")
+    analysis_cache_stale_seconds: float = Field(
+        default=3600.0, alias="ANALYSIS_CACHE_STALE_SECONDS"
+    )
+    analysis_cache_max_entries: int = Field(default=1000, alias="ANALYSIS_CACHE_MAX_ENTRIES")
+    deep_max_resources: int = Field(default=100, alias="DEEP_MAX_RESOURCES")
+    deep_resource_max_bytes: int = Field(
+        default=2 * 1024 * 1024, alias="DEEP_RESOURCE_MAX_BYTES"
+    )
+    server_timing: bool = Field(default=False, alias="SERVER_TIMING")
+    traceroute_max_processes: int = Field(default=4, alias="TRACEROUTE_MAX_PROCESSES")
+    traceroute_max_targets: int = Field(default=10, alias="TRACEROUTE_MAX_TARGETS")
+    traceroute_cache_ttl_seconds: float = Field(
+        default=600.0, alias="TRACEROUTE_CACHE_TTL_SECONDS"
+    )
+    traceroute_cache_max_entries: int = Field(
+        default=1000, alias="TRACEROUTE_CACHE_MAX_ENTRIES"
+    )
+    crawl_max_pages: int = Field(default=500, alias="CRAWL_MAX_PAGES")
+    crawl_max_depth: int = Field(default=5, alias="CRAWL_MAX_DEPTH")
+    crawl_concurrency: int = Field(default=4, alias="CRAWL_CONCURRENCY")
+    crawl_max_frontier: int = Field(default=100_000, alias="CRAWL_MAX_FRONTIER")
+    crawl_seen_capacity: int = Field(default=1_000_000, alias="CRAWL_SEEN_CAPACITY")
+    crawl_user_agent: str = Field(default="SEOAnalyzerBot", alias="CRAWL_USER_AGENT")
+    export_chunk_rows: int = Field(default=10_000, alias="EXPORT_CHUNK_ROWS")
+    job_workers: int = Field(default=4, alias="JOB_WORKERS")
+    job_stale_seconds: int = Field(default=600, alias="JOB_STALE_SECONDS")
+    job_retention_seconds: int = Field(default=86_400, alias="JOB_RETENTION_SECONDS")
+    batch_max_urls: int = Field(default=5000, alias="BATCH_MAX_URLS")
+    batch_concurrency: int = Field(default=20, alias="BATCH_CONCURRENCY")
+    batch_per_host_concurrency: int = Field(
+        default=4, alias="BATCH_PER_HOST_CONCURRENCY"
+    )
 
     class Config:
         env_file = ".env"
@@ -31,6 +94,19 @@ class Settings(BaseSettings):
         db_path = base_dir / "seo_analyzer.db"
         return f"sqlite:///{db_path}"
 
+    @property
+    def resolved_async_database_url(self) -> str:
+        """The database URL rewritten for an asyncio driver (aiosqlite/asyncpg)."""
+        url = self.resolved_database_url
+        for prefix, async_prefix in (
+            ("sqlite://", "sqlite+aiosqlite://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+            ("postgres://", "postgresql+asyncpg://"),
+        ):
+            if url.startswith(prefix):
+                return async_prefix + url[len(prefix):]
+        return url
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,36 +1,159 @@
 from __future__ import annotations
 
-from fastapi import Depends, FastAPI, HTTPException, Path, status
+import asyncio
+import json
+import logging
+import re
+from collections.abc import AsyncIterator, Callable
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Any
+
+from fastapi import (
+    BackgroundTasks,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from .config import get_settings
 from .schemas import (
+    AnalysisPoint,
     AnalyzeRequest,
     AnalyzeResponse,
+    BatchAnalyzeRequest,
+    BatchAnalyzeResult,
+    CrawlPageResult,
+    CrawlRequest,
+    CrawlSummary,
+    DailyLoadStats,
+    FetchTimings,
     GooglePreview,
+    JobStatus,
     RecentSite as RecentSiteSchema,
+    ResourceEntry,
+    RuleInfo,
+    SEOFinding,
     SEOTags,
     SocialPreview,
     TracerouteRequest,
     TracerouteResponse,
     TracerouteHop,
+    TracerouteStreamRequest,
+)
+from .services.ai_feedback import (
+    AIClientError,
+    FeedbackStream,
+    completions_in_flight,
+    generate_feedback,
+)
+from .services.analysis_cache import get_analysis_cache
+from .services.batch import fetch_sitemap_urls, iter_batch_analysis
+from .services.crawler import SiteCrawl
+from .services.export import (
+    FILE_EXTENSIONS,
+    MEDIA_TYPES,
+    ExportUnavailableError,
+    export_history,
+    issue_rule_ids,
+)
+from .services.feedback_cache import get_feedback_cache
+from .services.fetcher import (
+    FetchError,
+    FetchResult,
+    close_fetch_client,
+    fetch_html,
+    open_fetch_client,
+)
+from .services.jobs import JobEvent, JobQueue
+from .services.metrics import (
+    Collector,
+    Counter,
+    Histogram,
+    collect_server_timing,
+    format_server_timing,
+    merge_server_timing,
+    register_gauge,
+    render_metrics,
+    span,
+)
+from .services.parse_stage import (
+    close_parse_stage,
+    open_parse_stage,
+    discover_page_resources,
+    parse_and_evaluate,
+    parse_stage_active,
+    parse_tags,
+)
+from .services.resources import build_waterfall
+from .services.recent_recorder import get_recent_site_recorder
+from .services.seo_rules import (
+    RULES,
+    Finding,
+    RulePlan,
+    UnknownRuleError,
+    get_rule_plan,
+    record_rule_timings,
+    rule_stats,
+)
+from .services.singleflight import SingleFlight
+from .services.storage import (
+    SessionLocal,
+    fetch_analysis_history,
+    fetch_daily_load_stats,
+    fetch_recent_site_rows,
+    get_page_snapshot,
+    get_session,
+    init_db,
+    recent_sites_snapshot,
+    record_analysis,
+    save_page_snapshot,
 )
-from .services.ai_feedback import AIClientError, generate_feedback
-from .services.fetcher import FetchError, fetch_html
-from .services.parser import parse_seo_tags
-from .services.seo_rules import evaluate_seo_issues
-from .services.storage import fetch_recent_sites, get_session, init_db, record_recent_site
 from .services.traceroute import (
     TracerouteError,
     TracerouteTimeoutError,
+    TracerouteResult,
     TracerouteUnavailableError,
+    asset_hosts,
+    iter_traceroutes,
     run_traceroute,
 )
+from .services.urls import normalize_url
 
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
+AnalysisKey = tuple[str, tuple[str, ...] | None, tuple[str, ...], bool, bool]
+
+# Each shared analysis carries its stage timings, so every waiter can report them.
+_analyses_in_flight: SingleFlight[AnalysisKey, tuple[AnalyzeResponse, dict[str, float]]] = (
+    SingleFlight()
+)
+
+COLLAPSED_SCHEME_PATTERN = re.compile(r"^(https?):/(?!/)")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "seo_analyzer_http_request_seconds",
+    "Time to produce an HTTP response, by route.",
+    labelnames=("method", "route", "status"),
+)
+ANALYSIS_CACHE_REQUESTS = Counter(
+    "seo_analyzer_analysis_cache_requests_total",
+    "GET /analyze/{url} lookups by X-Cache result.",
+    labelnames=("result",),
+)
+
 app = FastAPI(
     title="SEO Analyzer API",
     version="0.1.0",
@@ -43,50 +166,281 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 
+@app.middleware("http")
+async def _time_requests(request: Request, call_next: Callable) -> Response:
+    """Record request latency and, if enabled, send the stage breakdown back."""
+    with collect_server_timing() as stages:
+        started = perf_counter()
+        response = await call_next(request)
+        elapsed = perf_counter() - started
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        elapsed,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    if settings.server_timing:
+        stages["total"] = elapsed
+        response.headers["Server-Timing"] = format_server_timing(stages)
+        response.headers["Timing-Allow-Origin"] = ", ".join(settings.cors_origins)
+    return response
+
+
 @app.on_event("startup")
-def _on_startup() -> None:
+async def _on_startup() -> None:
     init_db()
+    if settings.database_async:
+        get_recent_site_recorder().open_async_engine()
+    open_fetch_client()
+    open_parse_stage()
+    await job_queue.start()
+
 
+@app.on_event("shutdown")
+async def _on_shutdown() -> None:
+    await job_queue.stop()
+    await get_recent_site_recorder().stop()
+    await close_fetch_client()
+    close_parse_stage()
 
-@app.post("/analyze", response_model=AnalyzeResponse, status_code=status.HTTP_200_OK)
+
+@app.post(
+    "/analyze",
+    response_model=AnalyzeResponse,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobStatus}},
+)
 async def analyze_endpoint(
     payload: AnalyzeRequest,
-    session: Session = Depends(get_session),
-) -> AnalyzeResponse:
+    run_async: bool = Query(
+        False, alias="async", description="Queue the analysis and return a job id."
+    ),
+) -> AnalyzeResponse | JSONResponse:
     """Fetch and analyse a website's SEO metadata."""
+    if run_async:
+        _validated_rule_plan(payload)
+        event = await job_queue.submit(str(payload.url), payload.model_dump(mode="json"))
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=_job_status(event).model_dump(mode="json"),
+            headers={"Location": f"/jobs/{event.job_id}"},
+        )
+    return await _analyze_shared(payload)
+
+
+def _analysis_key(payload: AnalyzeRequest) -> AnalysisKey:
+    rules = tuple(sorted(payload.rules)) if payload.rules is not None else None
+    return (
+        normalize_url(str(payload.url)),
+        rules,
+        tuple(sorted(payload.disabled_rules)),
+        payload.include_ai_feedback,
+        payload.deep,
+    )
+
+
+async def _analyze_shared(payload: AnalyzeRequest) -> AnalyzeResponse:
+    """Run the analysis, sharing one in-progress job between identical requests.
+
+    The job owns its database session so it is unaffected by any one caller
+    disconnecting; errors reach every waiter and nothing is kept afterwards.
+    """
+
+    async def _job() -> tuple[AnalyzeResponse, dict[str, float]]:
+        with SessionLocal() as session, collect_server_timing() as timings:
+            return await _run_analysis(payload, session), timings
+
+    result, timings = await _analyses_in_flight.run(_analysis_key(payload), _job)
+    merge_server_timing(timings)
+    return result
+
+
+def _validated_rule_plan(payload: AnalyzeRequest) -> RulePlan:
+    """Return the rule plan, rejecting requests that name unknown rules."""
+    plan = get_rule_plan()
+    try:
+        plan.validate([*(payload.rules or ()), *payload.disabled_rules])
+    except UnknownRuleError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return plan
+
+
+def _no_progress(stage: str) -> None:
+    pass
+
+
+async def _run_analysis(
+    payload: AnalyzeRequest,
+    session: Session,
+    *,
+    progress: Callable[[str], None] = _no_progress,
+) -> AnalyzeResponse:
+    fetch_result, seo_tags, findings = await _analyze_page(payload, session, progress=progress)
+    issues = [finding.message for finding in findings]
+
+    try:
+        with span("ai"):
+            feedback = await generate_feedback(
+                seo_tags, fetch_result, issues, use_ai=payload.include_ai_feedback
+            )
+    except AIClientError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(exc),
+        ) from exc
+    progress("ai")
+
+    return _build_response(fetch_result, seo_tags, findings, feedback)
+
+
+async def _analyze_page(
+    payload: AnalyzeRequest,
+    session: Session,
+    *,
+    progress: Callable[[str], None] = _no_progress,
+) -> tuple[FetchResult, SEOTags, list[Finding]]:
+    """Fetch, parse and run rules for a page, recording it in the database."""
     url = str(payload.url)
+    plan = _validated_rule_plan(payload)
+    default_rules = payload.rules is None and not payload.disabled_rules
+
+    with span("db"):
+        snapshot = await asyncio.to_thread(get_page_snapshot, session, url)
+    # Deep mode needs the body to find resources, so it never asks for a 304.
+    conditional = snapshot if not payload.deep else None
     try:
-        fetch_result = await fetch_html(url)
+        fetch_result = await fetch_html(
+            url,
+            etag=conditional.etag if conditional else None,
+            last_modified=conditional.last_modified if conditional else None,
+        )
     except FetchError as exc:
         raise HTTPException(
             status_code=exc.status_code or status.HTTP_502_BAD_GATEWAY,
             detail=str(exc),
         ) from exc
+    progress("fetched")
+    if fetch_result.not_modified:
+        if snapshot is None:
+            # No validators were sent, so there is no stored page the 304 could refer to.
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="The site answered 304 Not Modified to an unconditional request.",
+            )
+        # Report the stored page's status; not_modified records that the server sent 304.
+        fetch_result.status_code = snapshot.status_code or status.HTTP_200_OK
 
-    seo_data = parse_seo_tags(fetch_result.html)
+    # Rules are re-run even for a 304: some judge the fetch (load time, status), not the tags.
+    if snapshot and (
+        fetch_result.not_modified or fetch_result.body_hash == snapshot.body_hash
+    ):
+        seo_data = dict(snapshot.seo_tags)
+        with span("rules"):
+            report = plan.evaluate(
+                seo_data,
+                fetch_result=fetch_result,
+                enabled=payload.rules,
+                disabled=payload.disabled_rules,
+            )
+        record_rule_timings(report.timings_ms)
+        findings = report.findings
+    else:
+        seo_data, findings = await parse_and_evaluate(
+            fetch_result, enabled=payload.rules, disabled=payload.disabled_rules
+        )
     seo_tags = SEOTags(**seo_data)
-    issues = evaluate_seo_issues(seo_data, fetch_result=fetch_result)
+    # Tags and rules are produced by one parse-stage call, so both complete together.
+    progress("parsed")
+    progress("rules")
+
+    resource_findings: list[Finding] = []
+    if payload.deep:
+        resource_findings = await _analyze_resources(payload, plan, fetch_result, seo_data)
+        progress("resources")
 
-    record_recent_site(
-        session,
+    get_recent_site_recorder().record(
         url=fetch_result.url,
         status_code=fetch_result.status_code,
         load_time_ms=fetch_result.load_time_ms,
     )
+    page_findings = findings
+    # The snapshot only keeps page findings; resource findings depend on the deep flag.
+    findings = findings + resource_findings
 
-    try:
-        ai_feedback, google_preview_raw, social_preview_raw = generate_feedback(
-            seo_tags, fetch_result, issues
+    def _store() -> None:
+        if not fetch_result.not_modified and default_rules:
+            save_page_snapshot(
+                session,
+                url=url,
+                status_code=fetch_result.status_code,
+                etag=fetch_result.etag,
+                last_modified=fetch_result.last_modified,
+                body_hash=fetch_result.body_hash,
+                seo_tags=seo_data,
+                findings=[asdict(finding) for finding in page_findings],
+            )
+        record_analysis(
+            session,
+            url=fetch_result.url,
+            status_code=fetch_result.status_code,
+            load_time_ms=fetch_result.load_time_ms,
+            timings=asdict(fetch_result.timings),
+            issue_ids=[finding.rule_id for finding in findings],
+            seo_tags=seo_data,
         )
-    except AIClientError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(exc),
-        ) from exc
 
+    with span("db"):
+        # The session is only used from one thread at a time, so it can move off the loop.
+        await asyncio.to_thread(_store)
+
+    return fetch_result, seo_tags, findings
+
+
+async def _analyze_resources(
+    payload: AnalyzeRequest,
+    plan: RulePlan,
+    fetch_result: FetchResult,
+    seo_data: dict[str, str | None],
+) -> list[Finding]:
+    """Build the page's resource waterfall and run the rules that need it."""
+    resources = await discover_page_resources(fetch_result.html, fetch_result.url)
+    with span("resources"):
+        fetch_result.resources = await build_waterfall(resources)
+
+    enabled = plan.resource_rule_ids
+    if payload.rules is not None:
+        enabled = enabled & set(payload.rules)
+    report = plan.evaluate(
+        seo_data,
+        fetch_result=fetch_result,
+        enabled=enabled,
+        disabled=payload.disabled_rules,
+    )
+    record_rule_timings(report.timings_ms)
+    return report.findings
+
+
+def _resource_entries(fetch_result: FetchResult) -> list[ResourceEntry] | None:
+    if fetch_result.resources is None:
+        return None
+    return [
+        ResourceEntry(**asdict(resource), compressed=resource.compressed)
+        for resource in fetch_result.resources
+    ]
+
+
+def _build_response(
+    fetch_result: FetchResult,
+    seo_tags: SEOTags,
+    findings: list[Finding],
+    feedback: tuple[str, dict[str, str], dict[str, str]],
+) -> AnalyzeResponse:
+    ai_feedback, google_preview_raw, social_preview_raw = feedback
     google_preview = GooglePreview(**google_preview_raw)
     social_preview = SocialPreview(
         title=social_preview_raw["title"],
@@ -96,51 +450,520 @@ async def analyze_endpoint(
     return AnalyzeResponse(
         url=fetch_result.url,
         status_code=fetch_result.status_code,
+        not_modified=fetch_result.not_modified,
         load_time_ms=fetch_result.load_time_ms,
+        timings=FetchTimings(**asdict(fetch_result.timings)),
         seo_tags=seo_tags,
-        issues=issues,
+        issues=[finding.message for finding in findings],
+        findings=[SEOFinding(**asdict(finding)) for finding in findings],
         ai_feedback=ai_feedback,
         google_preview=google_preview,
         social_preview=social_preview,
+        resources=_resource_entries(fetch_result),
     )
 
 
-@app.get("/analyze/{raw_url}", response_model=AnalyzeResponse)
+@app.post("/analyze/stream", response_class=StreamingResponse)
+async def analyze_stream_endpoint(
+    payload: AnalyzeRequest,
+    session: Session = Depends(get_session),
+) -> StreamingResponse:
+    """Analyse a website, streaming NDJSON events as each part becomes ready.
+
+    An ``analysis`` event with the fetch metrics, tags and issues comes first,
+    then ``ai_feedback`` events carrying text deltas, and finally a
+    ``complete`` event with the full feedback and previews (or ``error``).
+    """
+    fetch_result, seo_tags, findings = await _analyze_page(payload, session)
+    issues = [finding.message for finding in findings]
+    resources = _resource_entries(fetch_result)
+    feedback_stream = FeedbackStream(
+        seo_tags, fetch_result, issues, use_ai=payload.include_ai_feedback
+    )
+
+    def _event(name: str, **data: Any) -> str:
+        return json.dumps({"event": name, **data}, ensure_ascii=False) + "\n"
+
+    async def _stream() -> AsyncIterator[str]:
+        yield _event(
+            "analysis",
+            url=fetch_result.url,
+            status_code=fetch_result.status_code,
+            not_modified=fetch_result.not_modified,
+            load_time_ms=fetch_result.load_time_ms,
+            timings=asdict(fetch_result.timings),
+            seo_tags=seo_tags.model_dump(),
+            issues=issues,
+            findings=[asdict(finding) for finding in findings],
+            resources=(
+                [entry.model_dump() for entry in resources] if resources is not None else None
+            ),
+        )
+        try:
+            async for delta in feedback_stream:
+                yield _event("ai_feedback", delta=delta)
+        except AIClientError as exc:
+            yield _event("error", detail=str(exc))
+            return
+        finally:
+            # A disconnected client stops iteration early; free the OpenAI slot now.
+            await feedback_stream.aclose()
+        response = _build_response(fetch_result, seo_tags, findings, feedback_stream.result)
+        yield _event(
+            "complete",
+            ai_feedback=response.ai_feedback,
+            google_preview=response.google_preview.model_dump(),
+            social_preview=response.social_preview.model_dump(),
+        )
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+def _record_audited_page(
+    url: str,
+    status_code: int | None,
+    load_time_ms: float | None,
+    seo_tags: dict[str, str | None] | None,
+    findings: list[Finding],
+) -> None:
+    """Add a batch or crawl result to the analysis history (without fetch timings)."""
+    with SessionLocal() as session:
+        record_analysis(
+            session,
+            url=url,
+            status_code=status_code,
+            load_time_ms=load_time_ms,
+            timings=None,
+            issue_ids=[finding.rule_id for finding in findings],
+            seo_tags=seo_tags,
+        )
+
+
+@app.post("/analyze/batch", response_class=StreamingResponse)
+async def analyze_batch_endpoint(payload: BatchAnalyzeRequest) -> StreamingResponse:
+    """Analyse many URLs concurrently, streaming NDJSON results as they finish."""
+    urls = [str(url) for url in payload.urls]
+    if payload.sitemap_url is not None:
+        try:
+            urls += await fetch_sitemap_urls(
+                str(payload.sitemap_url), limit=settings.batch_max_urls
+            )
+        except FetchError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Unable to load sitemap: {exc}",
+            ) from exc
+
+    if len(urls) > settings.batch_max_urls:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch is limited to {settings.batch_max_urls} URLs.",
+        )
+
+    async def _stream() -> AsyncIterator[str]:
+        async for item in iter_batch_analysis(
+            urls,
+            concurrency=min(
+                payload.concurrency or settings.batch_concurrency,
+                settings.batch_concurrency,
+            ),
+            per_host_concurrency=min(
+                payload.per_host_concurrency or settings.batch_per_host_concurrency,
+                settings.batch_per_host_concurrency,
+            ),
+        ):
+            if payload.record_history and item.error is None:
+                await asyncio.to_thread(
+                    _record_audited_page,
+                    item.url,
+                    item.status_code,
+                    item.load_time_ms,
+                    item.seo_tags,
+                    item.findings,
+                )
+            result = BatchAnalyzeResult(
+                url=item.url,
+                status_code=item.status_code,
+                load_time_ms=item.load_time_ms,
+                seo_tags=SEOTags(**item.seo_tags) if item.seo_tags is not None else None,
+                issues=[finding.message for finding in item.findings],
+                findings=[SEOFinding(**asdict(finding)) for finding in item.findings],
+                error=item.error,
+            )
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+@app.post("/crawl", response_class=StreamingResponse)
+async def crawl_endpoint(payload: CrawlRequest) -> StreamingResponse:
+    """Crawl a site from one URL, streaming each page and then site-wide findings."""
+    crawl = SiteCrawl(
+        str(payload.url),
+        max_depth=min(
+            payload.max_depth if payload.max_depth is not None else settings.crawl_max_depth,
+            settings.crawl_max_depth,
+        ),
+        max_pages=min(payload.max_pages or settings.crawl_max_pages, settings.crawl_max_pages),
+        concurrency=min(
+            payload.concurrency or settings.crawl_concurrency, settings.crawl_concurrency
+        ),
+    )
+
+    def _event(name: str, **data: Any) -> str:
+        return json.dumps({"event": name, **data}, ensure_ascii=False) + "\n"
+
+    async def _stream() -> AsyncIterator[str]:
+        async for page in crawl:
+            if payload.record_history and page.error is None:
+                await asyncio.to_thread(
+                    _record_audited_page,
+                    page.url,
+                    page.status_code,
+                    page.load_time_ms,
+                    page.seo_tags,
+                    page.findings,
+                )
+            result = CrawlPageResult(
+                url=page.url,
+                depth=page.depth,
+                status_code=page.status_code,
+                load_time_ms=page.load_time_ms,
+                seo_tags=SEOTags(**page.seo_tags) if page.seo_tags is not None else None,
+                issues=[finding.message for finding in page.findings],
+                findings=[SEOFinding(**asdict(finding)) for finding in page.findings],
+                links_found=page.links_found,
+                error=page.error,
+            )
+            yield _event("page", **result.model_dump())
+        yield _event("summary", **CrawlSummary(**asdict(crawl.summary)).model_dump())
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+async def _run_job(request: dict[str, Any], progress: Callable[[str], None]) -> dict[str, Any]:
+    payload = AnalyzeRequest(**request)
+    with SessionLocal() as session:
+        result = await _run_analysis(payload, session, progress=progress)
+    return result.model_dump(mode="json")
+
+
+job_queue = JobQueue(
+    _run_job,
+    workers=settings.job_workers,
+    stale_seconds=settings.job_stale_seconds,
+    retention_seconds=settings.job_retention_seconds,
+)
+
+register_gauge(
+    "seo_analyzer_analyses_in_flight",
+    "Distinct analyses currently running.",
+    lambda: len(_analyses_in_flight),
+)
+register_gauge(
+    "seo_analyzer_openai_in_flight",
+    "Distinct OpenAI completions currently running.",
+    completions_in_flight,
+)
+register_gauge("seo_analyzer_job_queue_depth", "Queued analysis jobs.", lambda: job_queue.depth)
+register_gauge(
+    "seo_analyzer_parse_stage_jobs",
+    "Pages running on or waiting for the parse stage.",
+    parse_stage_active,
+)
+register_gauge(
+    "seo_analyzer_recent_sites_pending",
+    "Recent-site updates waiting to be flushed.",
+    lambda: get_recent_site_recorder().pending,
+)
+Collector(
+    "seo_analyzer_feedback_cache_requests_total",
+    "AI feedback cache lookups by result.",
+    kind="counter",
+    collect=lambda: [
+        ({"result": result}, getattr(get_feedback_cache().stats, result))
+        for result in ("memory_hits", "database_hits", "misses")
+    ],
+)
+Collector(
+    "seo_analyzer_rule_seconds_total",
+    "Accumulated execution time per SEO rule.",
+    kind="counter",
+    collect=lambda: [
+        ({"rule": rule_id}, stats.total_ms / 1000) for rule_id, stats in rule_stats().items()
+    ],
+)
+Collector(
+    "seo_analyzer_rule_calls_total",
+    "Executions per SEO rule.",
+    kind="counter",
+    collect=lambda: [({"rule": rule_id}, stats.calls) for rule_id, stats in rule_stats().items()],
+)
+
+
+def _job_status(event: JobEvent) -> JobStatus:
+    return JobStatus(
+        job_id=event.job_id,
+        status=event.status,
+        stage=event.stage,
+        error=event.error,
+        result=AnalyzeResponse(**event.result) if event.result else None,
+    )
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def job_status(job_id: str) -> JobStatus:
+    """Poll the state of an analysis queued with ``POST /analyze?async=true``."""
+    event = job_queue.get(job_id)
+    if event is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found.")
+    return _job_status(event)
+
+
+@app.get("/jobs/{job_id}/events", response_class=StreamingResponse)
+async def job_events(job_id: str) -> StreamingResponse:
+    """Stream a job's stage changes as server-sent events until it finishes."""
+    if await asyncio.to_thread(job_queue.get, job_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found.")
+
+    async def _stream() -> AsyncIterator[str]:
+        async for event in job_queue.events(job_id):
+            data = _job_status(event).model_dump_json()
+            yield f"event: {event.status}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/analyze/{raw_url:path}", response_model=AnalyzeResponse)
 async def analyze_via_path(
+    http_request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     raw_url: str = Path(..., description="URL-encoded website URL to analyse."),
-    session: Session = Depends(get_session),
+    refresh: bool = Query(False, description="Bypass the response cache."),
 ) -> AnalyzeResponse:
-    """Convenience wrapper around POST /analyze using a path parameter."""
+    """Convenience wrapper around POST /analyze using a path parameter.
+
+    Results are cached per normalised URL. Stale entries are served at once
+    while a background task refreshes them; ``X-Cache`` and ``Age`` headers
+    describe what was returned.
+    """
+    # Some proxies collapse the "//" after the scheme; restore it.
+    raw_url = COLLAPSED_SCHEME_PATTERN.sub(r"\1://", raw_url)
+    # The path parameter stops at "?", so the target's query arrives as ours.
+    query = _target_query(http_request.url.query)
+    if query:
+        raw_url = f"{raw_url}?{query}"
     # Normalise the incoming URL by ensuring scheme.
     if not raw_url.startswith(("http://", "https://")):
         raw_url = f"https://{raw_url}"
     request = AnalyzeRequest(url=raw_url)
-    return await analyze_endpoint(request, session=session)
+    url = str(request.url)
+
+    cache = get_analysis_cache()
+    cached = None if refresh else cache.get(url)
+    if cached is not None:
+        if cached.stale and cache.begin_refresh(url):
+            background_tasks.add_task(_refresh_cached_analysis, request)
+        response.headers["X-Cache"] = "STALE" if cached.stale else "HIT"
+        ANALYSIS_CACHE_REQUESTS.inc(result=response.headers["X-Cache"].lower())
+        response.headers["Age"] = str(int(cached.age_seconds))
+        return cached.value
+
+    result = await _analyze_shared(request)
+    cache.put((url, result.url), result)
+    response.headers["X-Cache"] = "REFRESH" if refresh else "MISS"
+    ANALYSIS_CACHE_REQUESTS.inc(result=response.headers["X-Cache"].lower())
+    response.headers["Age"] = "0"
+    return result
+
+
+def _target_query(query: str) -> str:
+    """The query string with this endpoint's own ``refresh`` parameter removed."""
+    return "&".join(
+        part for part in query.split("&") if part and part.split("=", 1)[0] != "refresh"
+    )
+
+
+async def _refresh_cached_analysis(request: AnalyzeRequest) -> None:
+    url = str(request.url)
+    cache = get_analysis_cache()
+    try:
+        result = await _analyze_shared(request)
+        cache.put((url, result.url), result)
+    except Exception:  # noqa: BLE001 - the stale entry keeps being served
+        logger.exception("Background refresh of %s failed.", url)
+    finally:
+        cache.end_refresh(url)
 
 
 @app.get("/recent", response_model=list[RecentSiteSchema])
-def recent_sites(session: Session = Depends(get_session)) -> list[RecentSiteSchema]:
+def recent_sites(
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+) -> list[RecentSiteSchema] | Response:
     """Return a list of recently analysed sites."""
-    records = fetch_recent_sites(session)
+    etag, rows = recent_sites_snapshot.get(lambda: fetch_recent_site_rows(session))
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return [RecentSiteSchema(**row) for row in rows]
+
+
+@app.get("/history", response_model=list[AnalysisPoint])
+def analysis_history(
+    url: str = Query(..., description="Analysed URL, as reported by /analyze."),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    session: Session = Depends(get_session),
+) -> list[AnalysisPoint]:
+    """Return the time series of analyses for a URL, oldest first."""
+    records = fetch_analysis_history(session, url, since=since, until=until, limit=limit)
     return [
-        RecentSiteSchema(
-            url=record.url,
-            last_analyzed_at=record.last_analyzed_at,
-            last_status_code=record.last_status_code,
-            last_load_time_ms=record.last_load_time_ms,
+        AnalysisPoint(
+            analyzed_at=record.analyzed_at,
+            status_code=record.status_code,
+            load_time_ms=record.load_time_ms,
+            timings=FetchTimings(
+                connect_ms=record.connect_ms,
+                tls_ms=record.tls_ms,
+                ttfb_ms=record.ttfb_ms,
+                download_ms=record.download_ms,
+            )
+            if record.ttfb_ms is not None
+            else None,
+            issue_ids=record.issue_ids,
+            issue_count=record.issue_count,
+            tag_hash=record.tag_hash,
         )
         for record in records
     ]
 
 
+@app.get("/export", response_class=StreamingResponse)
+def export_analysis_history(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    url: str | None = Query(None, description="Only export analyses of this URL."),
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> StreamingResponse:
+    """Stream the analysis history as gzip-compressed CSV or Parquet, one column per tag."""
+    try:
+        chunks = export_history(format, url=url, since=since, until=until)
+    except ExportUnavailableError as exc:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc)) from exc
+    filename = f"analysis_history{FILE_EXTENSIONS[format]}"
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            # Bit i of issue_bits is the i-th rule id in this list.
+            "X-Issue-Rules": ",".join(issue_rule_ids()),
+        },
+    )
+
+
+@app.get("/history/daily", response_model=list[DailyLoadStats])
+def analysis_history_daily(
+    url: str = Query(..., description="Analysed URL, as reported by /analyze."),
+    days: int = Query(30, ge=1, le=3650),
+    session: Session = Depends(get_session),
+) -> list[DailyLoadStats]:
+    """Return p50/p95 load time and average issue count per day for a URL."""
+    since = datetime.utcnow() - timedelta(days=days)
+    rows = fetch_daily_load_stats(session, url, since=since)
+    return [
+        DailyLoadStats(
+            day=day,
+            samples=samples,
+            p50_load_time_ms=p50,
+            p95_load_time_ms=p95,
+            avg_issue_count=avg_issues,
+        )
+        for day, samples, p50, p95, avg_issues in rows
+    ]
+
+
+@app.get("/rules", response_model=list[RuleInfo])
+def list_rules() -> list[RuleInfo]:
+    """Return the registered SEO rules with their accumulated execution times."""
+    stats = rule_stats()
+    rules = []
+    for rule in RULES.values():
+        rule_timing = stats.get(rule.id)
+        calls = rule_timing.calls if rule_timing else 0
+        total_ms = rule_timing.total_ms if rule_timing else 0.0
+        rules.append(
+            RuleInfo(
+                id=rule.id,
+                severity=rule.severity,
+                description=rule.description,
+                requires=list(rule.requires),
+                calls=calls,
+                total_ms=total_ms,
+                avg_ms=total_ms / calls if calls else None,
+            )
+        )
+    return rules
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Expose stage latencies, cache counters and queue gauges for Prometheus."""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/health")
 def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
+async def _page_asset_hosts(url: str) -> list[str]:
+    """Hosts the page's tags point at, from its stored snapshot or a head-only fetch."""
+    with SessionLocal() as session:
+        snapshot = get_page_snapshot(session, url)
+        seo_data = dict(snapshot.seo_tags) if snapshot else None
+    if seo_data is None:
+        fetch_result = await fetch_html(url, head_only=True)
+        url = fetch_result.url
+        seo_data = await parse_tags(fetch_result.html)
+    return asset_hosts(url, seo_data)
+
+
+def _traceroute_http_error(exc: TracerouteError) -> HTTPException:
+    if isinstance(exc, TracerouteUnavailableError):
+        return HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc))
+    if isinstance(exc, TracerouteTimeoutError):
+        return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(exc))
+    return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
+
+
+def _traceroute_response(result: TracerouteResult) -> TracerouteResponse:
+    return TracerouteResponse(
+        target=result.target,
+        hops=[TracerouteHop(**asdict(hop)) for hop in result.hops],
+        raw_output=result.raw_output,
+        cached=result.cached,
+    )
+
+
 @app.post("/traceroute", response_model=TracerouteResponse)
 async def traceroute_endpoint(payload: TracerouteRequest) -> TracerouteResponse:
-    """Run a traceroute to the provided URL's host."""
+    """Run a traceroute to the provided URL's host.
+
+    With ``include_asset_hosts`` the hosts named by the page's image, URL and
+    canonical tags are traced at the same time; their failures are reported
+    in ``asset_errors`` instead of failing the request.
+    """
     host = payload.url.host
     if not host:
         raise HTTPException(
@@ -148,20 +971,82 @@ async def traceroute_endpoint(payload: TracerouteRequest) -> TracerouteResponse:
             detail="Unable to determine host from URL.",
         )
 
-    try:
-        result = await run_traceroute(host)
-    except TracerouteUnavailableError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc)
-        ) from exc
-    except TracerouteTimeoutError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(exc)
-        ) from exc
-    except TracerouteError as exc:
+    hosts: list[str] = []
+    asset_errors: dict[str, str] = {}
+    if payload.include_asset_hosts:
+        try:
+            hosts = await _page_asset_hosts(str(payload.url))
+        except FetchError as exc:
+            asset_errors[host] = f"Unable to load page: {exc}"
+        hosts = hosts[: settings.traceroute_max_targets - 1]
+
+    results = await asyncio.gather(
+        run_traceroute(host),
+        *(run_traceroute(asset_host) for asset_host in hosts),
+        return_exceptions=True,
+    )
+    result, *asset_results = results
+    if isinstance(result, TracerouteError):
+        raise _traceroute_http_error(result) from result
+    if isinstance(result, BaseException):
+        raise result
+
+    response = _traceroute_response(result)
+    for asset_host, asset_result in zip(hosts, asset_results):
+        if isinstance(asset_result, TracerouteError):
+            asset_errors[asset_host] = str(asset_result)
+        elif isinstance(asset_result, BaseException):
+            raise asset_result
+        else:
+            response.asset_traces.append(_traceroute_response(asset_result))
+    response.asset_errors = asset_errors
+    return response
+
+
+@app.post("/traceroute/stream", response_class=StreamingResponse)
+async def traceroute_stream_endpoint(payload: TracerouteStreamRequest) -> StreamingResponse:
+    """Trace several URLs' hosts concurrently, streaming hops as NDJSON events.
+
+    A ``targets`` event lists the page and asset hosts first. Then each
+    ``hop`` event carries one parsed hop as soon as traceroute prints it.
+    Every target ends with ``complete`` (``cached`` tells whether the trace
+    came from the cache) or ``error`` (``detail``).
+    """
+    page_hosts = list(dict.fromkeys(url.host for url in payload.urls if url.host))
+    if len(page_hosts) > settings.traceroute_max_targets:
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)
-        ) from exc
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Traceroute is limited to {settings.traceroute_max_targets} hosts.",
+        )
+
+    def _event(name: str, **data: Any) -> str:
+        return json.dumps({"event": name, **data}, ensure_ascii=False) + "\n"
+
+    async def _stream() -> AsyncIterator[str]:
+        extra_hosts: dict[str, None] = {}
+        if payload.include_asset_hosts:
+            urls = [str(url) for url in payload.urls]
+            discovered = await asyncio.gather(
+                *(_page_asset_hosts(url) for url in urls), return_exceptions=True
+            )
+            for url, hosts in zip(urls, discovered):
+                if isinstance(hosts, FetchError):
+                    yield _event("discovery_error", url=url, detail=str(hosts))
+                elif isinstance(hosts, BaseException):
+                    raise hosts
+                else:
+                    extra_hosts.update(dict.fromkeys(h for h in hosts if h not in page_hosts))
+        room = settings.traceroute_max_targets - len(page_hosts)
+        assets = list(extra_hosts)[:room]
+        yield _event("targets", page_hosts=page_hosts, asset_hosts=assets)
+
+        async for event in iter_traceroutes([*page_hosts, *assets]):
+            if event.kind == "hop":
+                data = asdict(event.hop)
+            elif event.kind == "complete":
+                data = {"cached": event.cached}
+            else:
+                data = {"detail": event.error}
+            yield _event(event.kind, target=event.target, **data)
 
-    hops = [TracerouteHop(hop=hop, details=details) for hop, details in result.hops]
-    return TracerouteResponse(target=result.target, hops=hops, raw_output=result.raw_output)
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
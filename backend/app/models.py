@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy import JSON, DateTime, Float, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -12,6 +13,16 @@ class RecentSite(Base):
     """Stores metadata for recently analyzed URLs."""
 
     __tablename__ = "recent_sites"
+    __table_args__ = (
+        # Covers the /recent query so it is answered from the index alone.
+        Index(
+            "ix_recent_sites_recent_covering",
+            "last_analyzed_at",
+            "url",
+            "last_status_code",
+            "last_load_time_ms",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     url: Mapped[str] = mapped_column(String, unique=True, nullable=False)
@@ -20,3 +31,91 @@ class RecentSite(Base):
     )
     last_status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
     last_load_time_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class FeedbackCacheEntry(Base):
+    """Cached AI feedback keyed on a hash of the normalized prompt inputs."""
+
+    __tablename__ = "feedback_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    ai_feedback: Mapped[str] = mapped_column(Text, nullable=False)
+    google_preview: Mapped[dict[str, str]] = mapped_column(JSON, nullable=False)
+    social_preview: Mapped[dict[str, str]] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), default=datetime.utcnow, nullable=False
+    )
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), default=datetime.utcnow, nullable=False, index=True
+    )
+
+
+class PageSnapshot(Base):
+    """Validators and parsed results from the last full fetch of a URL."""
+
+    __tablename__ = "page_snapshots"
+
+    url: Mapped[str] = mapped_column(String, primary_key=True)
+    etag: Mapped[str | None] = mapped_column(String, nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String, nullable=True)
+    body_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Status of the full response, reported again when a re-fetch answers 304.
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    seo_tags: Mapped[dict[str, str | None]] = mapped_column(JSON, nullable=False)
+    findings: Mapped[list[dict[str, str]]] = mapped_column(JSON, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), default=datetime.utcnow, nullable=False
+    )
+
+
+class AnalysisRecord(Base):
+    """Append-only history entry written for every completed analysis."""
+
+    __tablename__ = "analysis_history"
+    __table_args__ = (
+        Index("ix_analysis_history_url_analyzed_at", "url", "analyzed_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    url: Mapped[str] = mapped_column(String, nullable=False)
+    analyzed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), default=datetime.utcnow, nullable=False
+    )
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    load_time_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    connect_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    tls_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ttfb_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    download_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    issue_ids: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=list)
+    issue_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tag_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+
+class TagSet(Base):
+    """A distinct set of SEO tags, stored once and referenced by its hash from the history."""
+
+    __tablename__ = "tag_sets"
+
+    tag_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    seo_tags: Mapped[dict[str, str | None]] = mapped_column(JSON, nullable=False)
+
+
+class AnalysisJob(Base):
+    """A queued analysis, persisted so pending jobs survive a restart."""
+
+    __tablename__ = "analysis_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    url: Mapped[str] = mapped_column(String, nullable=False)
+    request: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    stage: Mapped[str] = mapped_column(String(16), nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), default=datetime.utcnow, nullable=False
+    )
@@ -1,11 +1,15 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any
 
-from pydantic import BaseModel, HttpUrl, field_validator
+from pydantic import BaseModel, Field, HttpUrl, field_validator, model_validator
 
 
 class AnalyzeRequest(BaseModel):
     url: HttpUrl
+    rules: list[str] | None = None
+    disabled_rules: list[str] = Field(default_factory=list)
+    include_ai_feedback: bool = True
+    deep: bool = False
 
     @field_validator("url")
     @classmethod
@@ -28,6 +32,12 @@ class SEOTags(BaseModel):
     twitter_image: str | None = None
 
 
+class SEOFinding(BaseModel):
+    rule_id: str
+    severity: str
+    message: str
+
+
 class GooglePreview(BaseModel):
     title: str
     snippet: str
@@ -38,15 +48,110 @@ class SocialPreview(BaseModel):
     description: str
 
 
+class FetchTimings(BaseModel):
+    connect_ms: float
+    tls_ms: float
+    ttfb_ms: float
+    download_ms: float
+
+
+class ResourceEntry(BaseModel):
+    url: str
+    kind: str
+    render_blocking: bool
+    status_code: int | None = None
+    content_type: str | None = None
+    content_encoding: str | None = None
+    compressed: bool
+    size_bytes: int | None = None
+    start_ms: float
+    duration_ms: float
+    timings: FetchTimings
+    error: str | None = None
+
+
 class AnalyzeResponse(BaseModel):
     url: str
     status_code: int
+    not_modified: bool = False
     load_time_ms: float
+    timings: FetchTimings | None = None
     seo_tags: SEOTags
     issues: list[str]
+    findings: list[SEOFinding] = Field(default_factory=list)
     ai_feedback: str
     google_preview: GooglePreview
     social_preview: SocialPreview
+    resources: list[ResourceEntry] | None = None
+
+
+class BatchAnalyzeRequest(BaseModel):
+    urls: list[HttpUrl] = Field(default_factory=list)
+    sitemap_url: HttpUrl | None = None
+    concurrency: int | None = Field(default=None, ge=1)
+    per_host_concurrency: int | None = Field(default=None, ge=1)
+    record_history: bool = False
+
+    @model_validator(mode="after")
+    def require_source(self) -> "BatchAnalyzeRequest":
+        if not self.urls and self.sitemap_url is None:
+            raise ValueError("Provide either urls or sitemap_url.")
+        return self
+
+
+class BatchAnalyzeResult(BaseModel):
+    url: str
+    status_code: int | None = None
+    load_time_ms: float | None = None
+    seo_tags: SEOTags | None = None
+    issues: list[str] = Field(default_factory=list)
+    findings: list[SEOFinding] = Field(default_factory=list)
+    error: str | None = None
+
+
+class CrawlRequest(BaseModel):
+    url: HttpUrl
+    max_depth: int | None = Field(default=None, ge=0)
+    max_pages: int | None = Field(default=None, ge=1)
+    concurrency: int | None = Field(default=None, ge=1)
+    record_history: bool = False
+
+
+class CrawlPageResult(BatchAnalyzeResult):
+    depth: int
+    links_found: int = 0
+
+
+class SiteFinding(BaseModel):
+    rule_id: str
+    severity: str
+    message: str
+    urls: list[str]
+
+
+class CrawlSummary(BaseModel):
+    pages: int
+    errors: int
+    disallowed: int
+    site_findings: list[SiteFinding]
+
+
+class RuleInfo(BaseModel):
+    id: str
+    severity: str
+    description: str
+    requires: list[str]
+    calls: int
+    total_ms: float
+    avg_ms: float | None = None
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    stage: str
+    error: str | None = None
+    result: AnalyzeResponse | None = None
 
 
 class RecentSite(BaseModel):
@@ -56,19 +161,52 @@ class RecentSite(BaseModel):
     last_load_time_ms: float | None = None
 
 
+class AnalysisPoint(BaseModel):
+    analyzed_at: datetime
+    status_code: int | None = None
+    load_time_ms: float | None = None
+    timings: FetchTimings | None = None
+    issue_ids: list[str]
+    issue_count: int
+    tag_hash: str | None = None
+
+
+class DailyLoadStats(BaseModel):
+    day: date
+    samples: int
+    p50_load_time_ms: float | None = None
+    p95_load_time_ms: float | None = None
+    avg_issue_count: float | None = None
+
+
 class TracerouteRequest(BaseModel):
     url: HttpUrl
+    include_asset_hosts: bool = False
+
+
+class TracerouteStreamRequest(BaseModel):
+    urls: list[HttpUrl] = Field(min_length=1)
+    include_asset_hosts: bool = False
 
 
 class TracerouteHop(BaseModel):
     hop: int
     details: str
+    address: str | None = None
+    hostname: str | None = None
+    rtts_ms: list[float | None] = Field(default_factory=list)
+    min_ms: float | None = None
+    avg_ms: float | None = None
+    loss: float | None = None
 
 
 class TracerouteResponse(BaseModel):
     target: str
     hops: list[TracerouteHop]
     raw_output: str
+    cached: bool = False
+    asset_traces: list["TracerouteResponse"] = Field(default_factory=list)
+    asset_errors: dict[str, str] = Field(default_factory=dict)
 
 
 class ErrorResponse(BaseModel):
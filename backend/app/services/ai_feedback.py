@@ -1,24 +1,118 @@
+import asyncio
+import hashlib
 import json
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator
 from functools import lru_cache
+from threading import Lock
+from time import monotonic, perf_counter
 from typing import Any
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAIError
 
 from ..config import get_settings
 from ..schemas import SEOTags
+from .feedback_cache import Feedback, get_feedback_cache
 from .fetcher import FetchResult
+from .metrics import collect_server_timing, merge_server_timing, observe_stage, span
+from .previews import build_previews
+from .singleflight import SingleFlight
 
 
 class AIClientError(RuntimeError):
     """Raised when the OpenAI client cannot be initialised or used."""
 
 
+class AIBudgetExceededError(AIClientError):
+    """Raised when OPENAI_CALLS_PER_MINUTE completions were already started."""
+
+
+AI_DISABLED_FEEDBACK = "AI feedback is disabled; previews were generated locally."
+AI_OVER_BUDGET_FEEDBACK = (
+    "AI feedback was skipped because the OpenAI call budget is used up; "
+    "previews were generated locally."
+)
+
+
+SYSTEM_PROMPT = (
+    "You are an SEO expert. Analyse the provided metrics and tags, "
+    "write concise feedback, and craft realistic previews. "
+    "Respond strictly as JSON with fields: ai_feedback (string), "
+    "google_preview (object with title, snippet), "
+    "social_preview (object with title, description). "
+    "The previews should use fallbacks when tags are missing."
+)
+# Used when previews are built locally (AI_PREVIEWS off), so no tokens go on them.
+FEEDBACK_ONLY_SYSTEM_PROMPT = (
+    "You are an SEO expert. Analyse the provided metrics and tags "
+    "and write concise feedback. "
+    "Respond strictly as JSON with one field: ai_feedback (string)."
+)
+
+# Completions currently in progress, keyed by feedback cache key, so concurrent
+# analyses that would share a cache entry also share one upstream call. Each
+# carries its stage timings so every waiter can report them.
+_completions: SingleFlight[str, tuple[Feedback, dict[str, float]]] = SingleFlight()
+
+
+def completions_in_flight() -> int:
+    """Distinct completions currently waiting on OpenAI."""
+    return len(_completions)
+
+
 @lru_cache
-def get_openai_client() -> OpenAI:
+def get_openai_client() -> AsyncOpenAI:
     settings = get_settings()
     if not settings.openai_api_key:
         raise AIClientError("OPENAI_API_KEY is not configured.")
-    return OpenAI(api_key=settings.openai_api_key)
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        timeout=settings.openai_timeout,
+        max_retries=settings.openai_max_retries,
+    )
+
+
+@lru_cache
+def _completion_semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(get_settings().openai_max_concurrency)
+
+
+class CallBudget:
+    """Allow at most ``per_minute`` calls in any rolling 60 second window."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.per_minute = per_minute
+        self._calls: deque[float] = deque()
+        self._lock = Lock()
+
+    def try_acquire(self) -> bool:
+        if self.per_minute <= 0:
+            return True
+        now = monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] >= 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.per_minute:
+                return False
+            self._calls.append(now)
+            return True
+
+
+@lru_cache
+def get_call_budget() -> CallBudget:
+    return CallBudget(get_settings().openai_calls_per_minute)
+
+
+def ai_feedback_available() -> bool:
+    """Whether AI feedback is switched on and an API key is configured."""
+    settings = get_settings()
+    return settings.ai_feedback_enabled and bool(settings.openai_api_key)
+
+
+def local_feedback(seo_tags: SEOTags, url: str, message: str) -> Feedback:
+    """Feedback made without an LLM call: a fixed message and local previews."""
+    google_preview, social_preview = build_previews(seo_tags, url)
+    return message, google_preview, social_preview
 
 
 def _prepare_prompt(seo_tags: SEOTags, fetch_result: FetchResult, issues: list[str]) -> str:
@@ -32,82 +126,273 @@ def _prepare_prompt(seo_tags: SEOTags, fetch_result: FetchResult, issues: list[s
     return json.dumps(data, ensure_ascii=False, indent=2)
 
 
-def generate_feedback(
-    seo_tags: SEOTags,
-    fetch_result: FetchResult,
-    issues: list[str],
-) -> tuple[str, dict[str, str], dict[str, str]]:
-    """Call OpenAI Chat Completions to produce SEO feedback and previews."""
+def feedback_cache_key(
+    seo_tags: SEOTags, fetch_result: FetchResult, issues: list[str], *, stream: bool = False
+) -> str:
+    """Return a stable hash of the inputs that determine the feedback.
+
+    The raw load time is left out because it differs on every fetch; a slow
+    page is still distinguished through the load-time issue it triggers.
+    Streamed feedback comes from a different prompt, so ``stream`` gives it
+    its own key.
+    """
+    tags = {
+        name: value.strip() if isinstance(value, str) else value
+        for name, value in seo_tags.model_dump().items()
+    }
+    data = {
+        "system_prompt": _system_prompt(stream=stream),
+        "url": fetch_result.url,
+        "status_code": fetch_result.status_code,
+        "issues": issues,
+        "seo_tags": tags,
+    }
+    encoded = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def _request_completion(payload: str) -> dict[str, Any]:
     client = get_openai_client()
-    payload = _prepare_prompt(seo_tags, fetch_result, issues)
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        temperature=0.4,
-        response_format={"type": "json_object"},
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are an SEO expert. Analyse the provided metrics and tags, "
-                    "write concise feedback, and craft realistic previews. "
-                    "Respond strictly as JSON with fields: ai_feedback (string), "
-                    "google_preview (object with title, snippet), "
-                    "social_preview (object with title, description). "
-                    "The previews should use fallbacks when tags are missing."
-                ),
-            },
-            {
-                "role": "user",
-                "content": (
-                    "Here are the website metrics and tags to analyse:\n"
-                    f"{payload}"
-                ),
-            },
-        ],
-    )
+    if not get_call_budget().try_acquire():
+        raise AIBudgetExceededError("OpenAI call budget exhausted.")
+    async with _completion_semaphore():
+        try:
+            with span("openai"):
+                response = await client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    temperature=0.4,
+                    response_format={"type": "json_object"},
+                    messages=[
+                        {"role": "system", "content": _system_prompt(stream=False)},
+                        {
+                            "role": "user",
+                            "content": (
+                                "Here are the website metrics and tags to analyse:\n"
+                                f"{payload}"
+                            ),
+                        },
+                    ],
+                )
+        except OpenAIError as exc:
+            raise AIClientError(f"OpenAI request failed: {exc}") from exc
 
     message = response.choices[0].message.content
     if not message:
         raise AIClientError("OpenAI returned an empty response.")
 
     try:
-        parsed = json.loads(message)
+        return json.loads(message)
     except json.JSONDecodeError as exc:
         raise AIClientError("Failed to parse OpenAI response as JSON.") from exc
 
-    ai_feedback = parsed.get("ai_feedback", "").strip()
-    google_preview = parsed.get("google_preview") or {}
-    social_preview = parsed.get("social_preview") or {}
-
-    def _coerce_preview(data: dict[str, Any], *, defaults: dict[str, str]) -> dict[str, str]:
-        return {
-            "title": str(data.get("title") or defaults["title"]),
-            "snippet" if "snippet" in defaults else "description": str(
-                data.get("snippet") or data.get("description") or defaults.get("snippet") or defaults.get("description")
-            ),
-        }
-
-    google_preview = _coerce_preview(
-        google_preview,
-        defaults={
-            "title": seo_tags.title or "Website",
-            "snippet": seo_tags.meta_description or "No meta description provided.",
-        },
-    )
 
-    social_preview = _coerce_preview(
-        social_preview,
-        defaults={
-            "title": seo_tags.og_title or seo_tags.title or "Website",
-            "description": seo_tags.og_description
-            or seo_tags.twitter_description
-            or seo_tags.meta_description
-            or "No social description available.",
-        },
-    )
+def _finalize_feedback(seo_tags: SEOTags, url: str, parsed: dict[str, Any]) -> Feedback:
+    """Combine the model's feedback with the page's previews.
 
-    if not ai_feedback:
-        ai_feedback = "No feedback generated."
+    Previews are generated locally unless ``AI_PREVIEWS`` is set, in which
+    case the model's previews are used and any missing field falls back to
+    the local one.
+    """
+    ai_feedback = str(parsed.get("ai_feedback") or "").strip() or "No feedback generated."
+    google_preview, social_preview = build_previews(seo_tags, url)
+
+    if get_settings().ai_previews:
+
+        def _coerce_preview(data: Any, *, defaults: dict[str, str]) -> dict[str, str]:
+            if not isinstance(data, dict):
+                return defaults
+            return {field: str(data.get(field) or default) for field, default in defaults.items()}
+
+        google_preview = _coerce_preview(parsed.get("google_preview"), defaults=google_preview)
+        social_preview = _coerce_preview(parsed.get("social_preview"), defaults=social_preview)
 
     return ai_feedback, google_preview, social_preview
+
+
+async def generate_feedback(
+    seo_tags: SEOTags,
+    fetch_result: FetchResult,
+    issues: list[str],
+    *,
+    use_ai: bool = True,
+) -> tuple[str, dict[str, str], dict[str, str]]:
+    """Call OpenAI Chat Completions to produce SEO feedback and previews.
+
+    Without an LLM call (``use_ai`` off, AI feedback disabled, or the call
+    budget used up) a fixed message and local previews are returned instead.
+    """
+    if not use_ai or not ai_feedback_available():
+        return local_feedback(seo_tags, fetch_result.url, AI_DISABLED_FEEDBACK)
+
+    cache = get_feedback_cache()
+    cache_key = feedback_cache_key(seo_tags, fetch_result, issues)
+    cached = await asyncio.to_thread(cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    async def _complete() -> tuple[Feedback, dict[str, float]]:
+        with collect_server_timing() as timings:
+            payload = _prepare_prompt(seo_tags, fetch_result, issues)
+            parsed = await _request_completion(payload)
+            feedback = _finalize_feedback(seo_tags, fetch_result.url, parsed)
+            await asyncio.to_thread(cache.put, cache_key, feedback)
+        return feedback, timings
+
+    try:
+        feedback, timings = await _completions.run(cache_key, _complete)
+    except AIBudgetExceededError:
+        return local_feedback(seo_tags, fetch_result.url, AI_OVER_BUDGET_FEEDBACK)
+    merge_server_timing(timings)
+    return feedback
+
+
+STREAM_PREVIEW_MARKER = "<<<PREVIEWS>>>"
+
+STREAM_SYSTEM_PROMPT = (
+    "You are an SEO expert. Analyse the provided metrics and tags. "
+    "First write concise feedback as plain text. Then, on a new line, write "
+    f"{STREAM_PREVIEW_MARKER} followed by a JSON object with fields "
+    "google_preview (object with title, snippet) and "
+    "social_preview (object with title, description). "
+    "The previews should use fallbacks when tags are missing."
+)
+STREAM_FEEDBACK_ONLY_SYSTEM_PROMPT = (
+    "You are an SEO expert. Analyse the provided metrics and tags "
+    "and write concise feedback as plain text."
+)
+
+
+def _system_prompt(*, stream: bool) -> str:
+    """The system prompt, asking for previews only when ``AI_PREVIEWS`` is set."""
+    if get_settings().ai_previews:
+        return STREAM_SYSTEM_PROMPT if stream else SYSTEM_PROMPT
+    return STREAM_FEEDBACK_ONLY_SYSTEM_PROMPT if stream else FEEDBACK_ONLY_SYSTEM_PROMPT
+
+
+class FeedbackStream:
+    """Streams feedback text as it is generated, then exposes the full result.
+
+    Iterate to receive ``ai_feedback`` text deltas; once iteration ends,
+    :attr:`result` holds the same tuple :func:`generate_feedback` returns.
+    Cached feedback, and the fixed message used when no LLM call is made, is
+    replayed as a single delta. Call :meth:`aclose` if iteration may stop
+    early, so the OpenAI connection and concurrency slot are released.
+    """
+
+    def __init__(
+        self,
+        seo_tags: SEOTags,
+        fetch_result: FetchResult,
+        issues: list[str],
+        *,
+        use_ai: bool = True,
+    ) -> None:
+        self.seo_tags = seo_tags
+        self.fetch_result = fetch_result
+        self.issues = issues
+        self.use_ai = use_ai
+        self.result: Feedback | None = None
+        self._deltas: AsyncGenerator[str, None] | None = None
+
+    async def aclose(self) -> None:
+        """Stop an unfinished completion; safe to call more than once."""
+        deltas, self._deltas = self._deltas, None
+        if deltas is not None:
+            await deltas.aclose()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        if not self.use_ai or not ai_feedback_available():
+            self.result = local_feedback(self.seo_tags, self.fetch_result.url, AI_DISABLED_FEEDBACK)
+            yield self.result[0]
+            return
+
+        cache = get_feedback_cache()
+        cache_key = feedback_cache_key(
+            self.seo_tags, self.fetch_result, self.issues, stream=True
+        )
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            self.result = cached
+            yield cached[0]
+            return
+
+        if not get_call_budget().try_acquire():
+            self.result = local_feedback(
+                self.seo_tags, self.fetch_result.url, AI_OVER_BUDGET_FEEDBACK
+            )
+            yield self.result[0]
+            return
+
+        feedback_parts: list[str] = []
+        previews_parts: list[str] = []
+        pending = ""
+        self._deltas = deltas = self._completion_deltas()
+        try:
+            async for delta in deltas:
+                if previews_parts:
+                    previews_parts.append(delta)
+                    continue
+                pending += delta
+                head, marker, tail = pending.partition(STREAM_PREVIEW_MARKER)
+                if marker:
+                    previews_parts.append(tail)
+                    pending = ""
+                else:
+                    # Hold back a possible partial marker at the end of the text.
+                    keep = len(STREAM_PREVIEW_MARKER) - 1
+                    head, pending = pending[:-keep], pending[-keep:]
+                if head:
+                    feedback_parts.append(head)
+                    yield head
+        finally:
+            await self.aclose()
+        if pending:
+            feedback_parts.append(pending)
+            yield pending
+
+        try:
+            parsed = json.loads("".join(previews_parts) or "{}")
+        except json.JSONDecodeError:
+            parsed = {}
+        if not isinstance(parsed, dict):
+            parsed = {}
+        parsed["ai_feedback"] = "".join(feedback_parts)
+        self.result = _finalize_feedback(self.seo_tags, self.fetch_result.url, parsed)
+        await asyncio.to_thread(cache.put, cache_key, self.result)
+
+    async def _completion_deltas(self) -> AsyncIterator[str]:
+        client = get_openai_client()
+        payload = _prepare_prompt(self.seo_tags, self.fetch_result, self.issues)
+        async with _completion_semaphore():
+            started = perf_counter()
+            stream = None
+            try:
+                stream = await client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    temperature=0.4,
+                    stream=True,
+                    messages=[
+                        {"role": "system", "content": _system_prompt(stream=True)},
+                        {
+                            "role": "user",
+                            "content": (
+                                "Here are the website metrics and tags to analyse:\n"
+                                f"{payload}"
+                            ),
+                        },
+                    ],
+                )
+                first = True
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if first:
+                            observe_stage("openai_first_token", perf_counter() - started)
+                            first = False
+                        yield chunk.choices[0].delta.content
+            except OpenAIError as exc:
+                raise AIClientError(f"OpenAI request failed: {exc}") from exc
+            finally:
+                # Covers the whole stream, including time the consumer spent between chunks.
+                observe_stage("openai", perf_counter() - started)
+                if stream is not None:
+                    await stream.close()
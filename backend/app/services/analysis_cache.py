@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from time import monotonic
+from typing import Generic, TypeVar
+
+from ..config import get_settings
+from .urls import normalize_url
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class CacheLookup(Generic[T]):
+    value: T
+    age_seconds: float
+    stale: bool
+
+
+class AnalysisCache(Generic[T]):
+    """In-memory LRU of analysis responses with stale-while-revalidate.
+
+    Entries younger than ``ttl_seconds`` are fresh. Up to ``stale_seconds``
+    beyond that they are still served but reported as stale so the caller can
+    refresh them in the background; older entries count as misses.
+    """
+
+    def __init__(self, *, ttl_seconds: float, stale_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, T]] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._lock = Lock()
+
+    def get(self, url: str) -> CacheLookup[T] | None:
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            age = monotonic() - stored_at
+            if age >= self.ttl_seconds + self.stale_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return CacheLookup(value=value, age_seconds=age, stale=age >= self.ttl_seconds)
+
+    def put(self, urls: Iterable[str], value: T) -> None:
+        """Store ``value`` under every given URL (e.g. requested and final URL)."""
+        now = monotonic()
+        with self._lock:
+            for key in {normalize_url(url) for url in urls}:
+                self._entries[key] = (now, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def begin_refresh(self, url: str) -> bool:
+        """Claim the background refresh for ``url``; ``False`` if one is running."""
+        key = normalize_url(url)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, url: str) -> None:
+        with self._lock:
+            self._refreshing.discard(normalize_url(url))
+
+
+@lru_cache
+def get_analysis_cache() -> AnalysisCache:
+    settings = get_settings()
+    return AnalysisCache(
+        ttl_seconds=settings.analysis_cache_ttl_seconds,
+        stale_seconds=settings.analysis_cache_stale_seconds,
+        max_entries=settings.analysis_cache_max_entries,
+    )
@@ -0,0 +1,193 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+
+from .fetcher import FetchError, FetchResult, fetch_html, iter_body
+from .parse_stage import parse_and_evaluate
+from .seo_rules import Finding
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+SITEMAP_INDEX_TAG = f"{SITEMAP_NS}sitemapindex"
+SITEMAP_ENTRY_TAGS = (f"{SITEMAP_NS}url", f"{SITEMAP_NS}sitemap")
+# The sitemaps protocol caps an uncompressed sitemap file at 50 MB.
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+# URLs read ahead per unit of concurrency while their host is busy.
+LOOKAHEAD_PER_WORKER = 4
+
+
+@dataclass(slots=True)
+class BatchItem:
+    url: str
+    status_code: int | None = None
+    load_time_ms: float | None = None
+    seo_tags: dict[str, str | None] | None = None
+    findings: list[Finding] = field(default_factory=list)
+    error: str | None = None
+    fetch_result: FetchResult | None = field(default=None, repr=False)
+
+
+async def analyze_url(url: str) -> BatchItem:
+    """Run fetch, tag parsing and rule evaluation for a single URL."""
+    try:
+        fetch_result = await fetch_html(url, head_only=True)
+    except FetchError as exc:
+        return BatchItem(url=url, status_code=exc.status_code, error=str(exc))
+
+    seo_data, findings = await parse_and_evaluate(fetch_result)
+    return BatchItem(
+        url=fetch_result.url,
+        status_code=fetch_result.status_code,
+        load_time_ms=fetch_result.load_time_ms,
+        seo_tags=seo_data,
+        findings=findings,
+        fetch_result=fetch_result,
+    )
+
+
+async def iter_batch_analysis(
+    urls: Iterable[str],
+    *,
+    concurrency: int,
+    per_host_concurrency: int,
+) -> AsyncIterator[BatchItem]:
+    """Analyse URLs concurrently and yield each result as soon as it completes.
+
+    ``urls`` is read lazily and duplicates are skipped. A new analysis only
+    starts once the caller has taken a finished one, so at most
+    ``concurrency`` are running or waiting to be consumed. Each host gets at
+    most ``per_host_concurrency`` of them; URLs for a busy host wait in a
+    buffer of ``LOOKAHEAD_PER_WORKER * concurrency`` URLs while other hosts
+    proceed, and reading ``urls`` pauses while that buffer is full.
+
+    ``ValueError`` is raised if either limit is below 1.
+    """
+    if concurrency < 1 or per_host_concurrency < 1:
+        raise ValueError("Batch concurrency limits must be at least 1.")
+    source = iter(urls)
+    exhausted = False
+    seen: set[str] = set()
+    waiting: dict[str, deque[str]] = {}
+    buffered = 0
+    lookahead = LOOKAHEAD_PER_WORKER * concurrency
+    host_active: dict[str, int] = {}
+    outstanding = 0
+    results: asyncio.Queue[BatchItem] = asyncio.Queue(maxsize=concurrency)
+    tasks: set[asyncio.Task[None]] = set()
+
+    def _has_room(host: str) -> bool:
+        return host_active.get(host, 0) < per_host_concurrency
+
+    def _next_url() -> str | None:
+        nonlocal buffered, exhausted
+        for host, queued in waiting.items():
+            if _has_room(host):
+                buffered -= 1
+                url = queued.popleft()
+                if not queued:
+                    del waiting[host]
+                return url
+        while not exhausted and buffered < lookahead:
+            url = next(source, None)
+            if url is None:
+                exhausted = True
+            elif url not in seen:
+                seen.add(url)
+                host = _host(url)
+                if _has_room(host):
+                    return url
+                waiting.setdefault(host, deque()).append(url)
+                buffered += 1
+        return None
+
+    async def _worker(url: str, host: str) -> None:
+        try:
+            item = await analyze_url(url)
+        except Exception as exc:  # noqa: BLE001 - one bad page must not end the batch
+            item = BatchItem(url=url, error=f"Analysis failed: {exc}")
+        finally:
+            host_active[host] -= 1
+            if not host_active[host]:
+                del host_active[host]
+        await results.put(item)
+
+    def _fill() -> None:
+        nonlocal outstanding
+        while outstanding < concurrency and (url := _next_url()) is not None:
+            host = _host(url)
+            host_active[host] = host_active.get(host, 0) + 1
+            outstanding += 1
+            task = asyncio.create_task(_worker(url, host))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    try:
+        _fill()
+        # Nothing is outstanding only once every URL has been read and analysed.
+        while outstanding:
+            item = await results.get()
+            outstanding -= 1
+            _fill()
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).hostname or ""
+
+
+async def _read_sitemap(url: str, *, limit: int) -> tuple[list[str], list[str]]:
+    """Return (page URLs, child sitemap URLs) from one sitemap document.
+
+    The XML is parsed as it downloads and each entry is discarded once its
+    ``<loc>`` is read, so memory stays small however large the file is.
+    Reading stops after ``limit`` page URLs.
+    """
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    root: ElementTree.Element | None = None
+    locations: list[str] = []
+    chunks = iter_body(url, max_bytes=SITEMAP_MAX_BYTES)
+    try:
+        async for chunk in chunks:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if root is None:
+                    root = element
+                elif event == "end" and element.tag == f"{SITEMAP_NS}loc":
+                    if element.text and element.text.strip():
+                        locations.append(element.text.strip())
+                elif event == "end" and element.tag in SITEMAP_ENTRY_TAGS:
+                    root.clear()
+            if root is not None and root.tag != SITEMAP_INDEX_TAG and len(locations) >= limit:
+                break
+        else:
+            parser.close()
+    except ElementTree.ParseError as exc:
+        raise FetchError(f"Sitemap is not valid XML: {exc}") from exc
+    finally:
+        await chunks.aclose()
+
+    if root is not None and root.tag == SITEMAP_INDEX_TAG:
+        return [], locations
+    return locations[:limit], []
+
+
+async def fetch_sitemap_urls(url: str, *, limit: int) -> list[str]:
+    """Collect up to ``limit`` page URLs from a sitemap or sitemap index."""
+    pending = [url]
+    visited: set[str] = set()
+    pages: list[str] = []
+    while pending and len(pages) < limit:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in visited:
+            continue
+        visited.add(sitemap_url)
+        page_urls, child_sitemaps = await _read_sitemap(sitemap_url, limit=limit - len(pages))
+        pages.extend(page_urls)
+        pending.extend(child_sitemaps)
+    return pages[:limit]
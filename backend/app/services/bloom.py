@@ -0,0 +1,50 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """A fixed-size set membership test with a bounded false-positive rate.
+
+    Memory is fixed when the filter is built: about 1.8 bytes per expected
+    item at a 1e-3 error rate. Membership tests may wrongly answer ``True``
+    (at most ``error_rate`` of the time once ``capacity`` items are in), but
+    never wrongly answer ``False``.
+    """
+
+    def __init__(self, capacity: int, *, error_rate: float = 1e-3) -> None:
+        if capacity < 1:
+            raise ValueError("Bloom filter capacity must be at least 1.")
+        if not 0 < error_rate < 1:
+            raise ValueError("Bloom filter error rate must be between 0 and 1.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Number of distinct items added (as far as the filter can tell)."""
+        return self._count
+
+    def _positions(self, item: str) -> list[int]:
+        # Double hashing: k positions from two independent 64-bit halves of one digest.
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.num_bits for index in range(self.num_hashes)]
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[bit >> 3] & (1 << (bit & 7)) for bit in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Add ``item``; return ``True`` if it was not (as far as we can tell) present."""
+        added = False
+        for bit in self._positions(item):
+            mask = 1 << (bit & 7)
+            if not self._bits[bit >> 3] & mask:
+                self._bits[bit >> 3] |= mask
+                added = True
+        if added:
+            self._count += 1
+        return added
@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+import math
+import re
+from collections.abc import AsyncIterator, Mapping
+from dataclasses import dataclass, field
+from time import monotonic
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from ..config import get_settings
+from .bloom import BloomFilter
+from .fetcher import FetchError, fetch_html, is_html_content_type
+from .parse_stage import parse_crawled_page
+from .seo_rules import Finding
+from .urls import DEFAULT_PORTS, normalize_url
+
+# RFC 9309 lets crawlers stop reading robots.txt after 500 KiB.
+ROBOTS_MAX_BYTES = 500 * 1024
+# urllib.robotparser only understands whole-second delays such as "Crawl-delay: 2".
+FRACTIONAL_DELAY_PATTERN = re.compile(r"^(\s*crawl-delay\s*:\s*)(\d*\.\d+)", re.IGNORECASE)
+
+# Site-wide duplicate checks: (rule id, severity, tag field, label for messages).
+DUPLICATE_TAG_CHECKS = (
+    ("duplicate-title", "warning", "title", "title"),
+    ("duplicate-meta-description", "warning", "meta_description", "meta description"),
+)
+DUPLICATE_CONTENT_RULE = "duplicate-content"
+MAX_QUOTED_CHARS = 80
+
+
+@dataclass(slots=True)
+class CrawlPage:
+    url: str
+    depth: int
+    status_code: int | None = None
+    load_time_ms: float | None = None
+    seo_tags: dict[str, str | None] | None = None
+    findings: list[Finding] = field(default_factory=list)
+    links_found: int = 0
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class SiteFinding:
+    """A problem shared by several crawled pages, with the pages involved."""
+
+    rule_id: str
+    severity: str
+    message: str
+    urls: list[str]
+
+
+@dataclass(slots=True)
+class CrawlSummary:
+    pages: int = 0
+    errors: int = 0
+    disallowed: int = 0
+    site_findings: list[SiteFinding] = field(default_factory=list)
+
+
+def _normalize_text(value: str | None) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class SiteIndex:
+    """Groups crawled pages by a hash of their title, description and body.
+
+    Each page is hashed once per check, so duplicates are found in a single
+    pass instead of comparing every pair of pages. Titles and descriptions
+    are compared case-insensitively with whitespace collapsed; bodies must
+    be byte-for-byte identical.
+    """
+
+    def __init__(self) -> None:
+        self._groups: dict[tuple[str, bytes], list[str]] = {}
+        self._samples: dict[tuple[str, bytes], str] = {}
+
+    def _add(self, key: tuple[str, bytes], url: str, sample: str) -> None:
+        self._groups.setdefault(key, []).append(url)
+        self._samples.setdefault(key, sample)
+
+    def add(self, url: str, seo_tags: Mapping[str, str | None], body_hash: str | None) -> None:
+        for rule_id, _, tag_field, _ in DUPLICATE_TAG_CHECKS:
+            text = _normalize_text(seo_tags.get(tag_field))
+            if text:
+                self._add((rule_id, _digest(text)), url, " ".join(seo_tags[tag_field].split()))
+        if body_hash:
+            self._add((DUPLICATE_CONTENT_RULE, bytes.fromhex(body_hash)), url, "")
+
+    def findings(self) -> list[SiteFinding]:
+        labels = {
+            rule_id: (severity, label) for rule_id, severity, _, label in DUPLICATE_TAG_CHECKS
+        }
+        findings = []
+        for key, urls in self._groups.items():
+            if len(urls) < 2:
+                continue
+            rule_id = key[0]
+            if rule_id == DUPLICATE_CONTENT_RULE:
+                severity = "info"
+                message = f"{len(urls)} pages serve identical HTML."
+            else:
+                severity, label = labels[rule_id]
+                sample = self._samples[key]
+                if len(sample) > MAX_QUOTED_CHARS:
+                    sample = sample[: MAX_QUOTED_CHARS - 3] + "..."
+                message = f'{len(urls)} pages share the {label} "{sample}".'
+            findings.append(SiteFinding(rule_id, severity, message, urls))
+        return findings
+
+
+async def fetch_robots(origin: str, *, user_agent: str | None = None) -> RobotFileParser:
+    """Load an origin's robots.txt as RFC 9309 describes.
+
+    A missing file (any 4xx other than 429) allows everything; an unreachable
+    one (5xx, 429, a network error or any other failure to load it)
+    disallows everything. Fractional
+    ``Crawl-delay`` values are rounded up to whole seconds.
+    """
+    robots = RobotFileParser(f"{origin}/robots.txt")
+    try:
+        result = await fetch_html(
+            robots.url, max_bytes=ROBOTS_MAX_BYTES, user_agent=user_agent
+        )
+    except FetchError as exc:
+        robots.parse([])
+        if exc.status_code is None or exc.status_code == 429 or exc.status_code >= 500:
+            robots.disallow_all = True
+        return robots
+    except Exception:  # noqa: BLE001 - e.g. httpx.InvalidURL; cached for the whole crawl
+        robots.parse([])
+        robots.disallow_all = True
+        return robots
+    robots.parse(
+        FRACTIONAL_DELAY_PATTERN.sub(
+            lambda match: f"{match.group(1)}{math.ceil(float(match.group(2)))}", line
+        )
+        for line in result.html.splitlines()
+    )
+    return robots
+
+
+def robots_delay(robots: RobotFileParser, user_agent: str) -> float:
+    """Seconds to wait between requests, from ``Crawl-delay`` or ``Request-rate``."""
+    delay = float(robots.crawl_delay(user_agent) or 0)
+    rate = robots.request_rate(user_agent)
+    if rate and rate.requests:
+        delay = max(delay, rate.seconds / rate.requests)
+    return delay
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class SiteCrawl:
+    """Crawls a site breadth-first from a seed URL, yielding pages as they finish.
+
+    Links are followed on the seed's host (and the host it redirects to), up
+    to ``max_depth`` links away and ``max_pages`` fetched pages. Each origin's
+    robots.txt is read before its first page: disallowed URLs, and redirects
+    to disallowed or off-site URLs, are skipped, and its ``Crawl-delay``
+    spaces out requests. Seen URLs are kept in a Bloom
+    filter, so memory stays fixed however many links the site has. Once
+    iteration ends, :attr:`summary` holds the counts and site-wide findings.
+    """
+
+    def __init__(self, seed: str, *, max_depth: int, max_pages: int, concurrency: int) -> None:
+        self.seed = normalize_url(seed)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.summary = CrawlSummary()
+
+    async def __aiter__(self) -> AsyncIterator[CrawlPage]:
+        settings = get_settings()
+        user_agent = settings.crawl_user_agent
+        hosts = {urlsplit(self.seed).hostname}
+        seen = BloomFilter(settings.crawl_seen_capacity)
+        index = SiteIndex()
+        frontier: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
+        pages: asyncio.Queue[CrawlPage | None] = asyncio.Queue()
+        robots: dict[str, asyncio.Task[RobotFileParser]] = {}
+        # Per origin: the earliest time the next request may start.
+        next_start: dict[str, float] = {}
+        claimed = 0
+
+        def _enqueue(url: str, depth: int) -> None:
+            parts = urlsplit(url)
+            if parts.scheme not in DEFAULT_PORTS or parts.hostname not in hosts:
+                return
+            if frontier.qsize() < settings.crawl_max_frontier and seen.add(url):
+                frontier.put_nowait((url, depth))
+
+        async def _pace(origin: str, delay: float) -> None:
+            if not delay:
+                return
+            # Reserve a start time before sleeping so concurrent workers queue up behind it.
+            wait = next_start.get(origin, 0.0) - monotonic()
+            next_start[origin] = monotonic() + max(wait, 0.0) + delay
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        async def _robots(origin: str) -> RobotFileParser:
+            if origin not in robots:
+                robots[origin] = asyncio.ensure_future(
+                    fetch_robots(origin, user_agent=user_agent)
+                )
+            return await robots[origin]
+
+        async def _visit(url: str, depth: int) -> CrawlPage | None:
+            nonlocal claimed
+            # Checked before robots.txt too, so a full crawl stops fetching robots files.
+            if claimed >= self.max_pages:
+                return None
+            origin = _origin(url)
+            rules = await _robots(origin)
+            if not rules.can_fetch(user_agent, url):
+                self.summary.disallowed += 1
+                return None
+            if claimed >= self.max_pages:
+                return None
+            # Pages that end up not analysed give their slot back.
+            claimed += 1
+            await _pace(origin, robots_delay(rules, user_agent))
+
+            try:
+                fetch_result = await fetch_html(url, html_only=True, user_agent=user_agent)
+            except FetchError as exc:
+                claimed -= 1
+                return CrawlPage(url=url, depth=depth, status_code=exc.status_code, error=str(exc))
+            final_url = normalize_url(fetch_result.url)
+            if final_url != url:
+                final_host = urlsplit(final_url).hostname
+                if depth == 0:
+                    hosts.add(final_host)
+                elif final_host not in hosts:
+                    # A link on the site redirected off it.
+                    claimed -= 1
+                    return None
+                if not seen.add(final_url):
+                    # Another link already led to the redirect target.
+                    claimed -= 1
+                    return None
+                if not (await _robots(_origin(final_url))).can_fetch(user_agent, final_url):
+                    claimed -= 1
+                    self.summary.disallowed += 1
+                    return None
+            page = CrawlPage(
+                url=fetch_result.url,
+                depth=depth,
+                status_code=fetch_result.status_code,
+                load_time_ms=fetch_result.load_time_ms,
+            )
+            if not is_html_content_type(fetch_result.content_type):
+                claimed -= 1
+                page.error = f"Not an HTML page ({fetch_result.content_type})."
+                return page
+
+            page.seo_tags, page.findings, links = await parse_crawled_page(fetch_result)
+            page.links_found = len(links)
+            index.add(page.url, page.seo_tags, fetch_result.body_hash)
+            if depth < self.max_depth:
+                for link in links:
+                    _enqueue(normalize_url(link), depth + 1)
+            return page
+
+        async def _worker() -> None:
+            while True:
+                url, depth = await frontier.get()
+                try:
+                    page = await _visit(url, depth)
+                except Exception as exc:  # noqa: BLE001 - one bad page must not end the crawl
+                    page = CrawlPage(url=url, depth=depth, error=f"Analysis failed: {exc}")
+                # Queue the page before marking it done so it precedes the end marker.
+                if page is not None:
+                    pages.put_nowait(page)
+                frontier.task_done()
+
+        async def _finish() -> None:
+            await frontier.join()
+            pages.put_nowait(None)
+
+        seen.add(self.seed)
+        frontier.put_nowait((self.seed, 0))
+        tasks = [asyncio.create_task(_worker()) for _ in range(self.concurrency)]
+        tasks.append(asyncio.create_task(_finish()))
+        try:
+            while (page := await pages.get()) is not None:
+                self.summary.pages += 1
+                if page.error:
+                    self.summary.errors += 1
+                yield page
+        finally:
+            for task in (*tasks, *robots.values()):
+                task.cancel()
+            await asyncio.gather(*tasks, *robots.values(), return_exceptions=True)
+        self.summary.site_findings = index.findings()
@@ -0,0 +1,257 @@
+"""Stream the analysis history as a gzip-compressed CSV or a Parquet file.
+
+Every SEO tag becomes its own column, and the rule ids of a row's issues
+are packed into the ``issue_bits`` integer. Bit ``i`` is set when the
+``i``-th rule of :func:`issue_rule_ids` was found; that order is the rule
+registration order, the same as ``GET /rules``, so new rules take new bits.
+Rows are read and written ``chunk_rows`` at a time, so memory use does not
+grow with the history.
+
+Run from the ``backend`` directory::
+
+    python -m app.services.export -o history.parquet --format parquet
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from ..config import get_settings
+from .parser import SEO_FIELDS
+from .seo_rules import get_rule_plan
+
+EXPORT_FORMATS = ("csv", "parquet")
+MEDIA_TYPES = {"csv": "application/gzip", "parquet": "application/vnd.apache.parquet"}
+FILE_EXTENSIONS = {"csv": ".csv.gz", "parquet": ".parquet"}
+
+RECORD_COLUMNS = (
+    "analyzed_at",
+    "url",
+    "status_code",
+    "load_time_ms",
+    "connect_ms",
+    "tls_ms",
+    "ttfb_ms",
+    "download_ms",
+    "issue_count",
+    "issue_bits",
+    "tag_hash",
+)
+COLUMNS = RECORD_COLUMNS + SEO_FIELDS
+# issue_bits is a signed 64-bit column in Parquet.
+MAX_ISSUE_BITS = 63
+GZIP_LEVEL = 6
+
+
+class ExportUnavailableError(RuntimeError):
+    """Raised when the requested export format cannot be produced here."""
+
+
+def issue_rule_ids() -> list[str]:
+    """Rule ids in bit order for ``issue_bits``."""
+    return [step.rule.id for step in get_rule_plan().steps]
+
+
+def issue_bitset(issue_ids: Iterable[str], positions: dict[str, int]) -> int:
+    """Pack rule ids into an integer; ids of rules no longer registered are dropped."""
+    bits = 0
+    for rule_id in issue_ids:
+        position = positions.get(rule_id)
+        if position is not None:
+            bits |= 1 << position
+    return bits
+
+
+def _flatten(rows: Sequence[Any], positions: dict[str, int]) -> list[tuple[Any, ...]]:
+    flat = []
+    for row in rows:
+        tags = row.seo_tags or {}
+        flat.append(
+            (
+                row.analyzed_at,
+                row.url,
+                row.status_code,
+                row.load_time_ms,
+                row.connect_ms,
+                row.tls_ms,
+                row.ttfb_ms,
+                row.download_ms,
+                row.issue_count,
+                issue_bitset(row.issue_ids or (), positions),
+                row.tag_hash,
+                *(tags.get(field) for field in SEO_FIELDS),
+            )
+        )
+    return flat
+
+
+def _iter_csv_gzip(chunks: Iterable[list[tuple[Any, ...]]]) -> Iterator[bytes]:
+    # wbits=31 writes a gzip container rather than a bare zlib stream.
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in chunks:
+        writer.writerows((row[0].isoformat(), *row[1:]) for row in chunk)
+        data = compressor.compress(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate()
+        if data:
+            yield data
+    yield compressor.compress(buffer.getvalue().encode("utf-8")) + compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """A write-only file that hands back what was written since the last drain."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema(rule_ids: list[str]) -> Any:
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("analyzed_at", pa.timestamp("us")),
+            ("url", pa.string()),
+            ("status_code", pa.int32()),
+            ("load_time_ms", pa.float64()),
+            ("connect_ms", pa.float64()),
+            ("tls_ms", pa.float64()),
+            ("ttfb_ms", pa.float64()),
+            ("download_ms", pa.float64()),
+            ("issue_count", pa.int32()),
+            ("issue_bits", pa.int64()),
+            ("tag_hash", pa.string()),
+            *((field, pa.string()) for field in SEO_FIELDS),
+        ],
+        metadata={"issue_rule_ids": json.dumps(rule_ids)},
+    )
+
+
+def _iter_parquet(
+    chunks: Iterable[list[tuple[Any, ...]]], rule_ids: list[str]
+) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(rule_ids)
+    sink = _ChunkSink()
+    # Each chunk becomes one row group, written out before the next is read.
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema,
+                )
+            )
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def export_history(
+    export_format: str,
+    *,
+    url: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Iterator[bytes]:
+    """Return an iterator over the bytes of a history export.
+
+    The format is checked up front, so :class:`ExportUnavailableError` and
+    ``ValueError`` are raised before anything is read from the database.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format {export_format!r}; expected one of {EXPORT_FORMATS}."
+        )
+    if export_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ExportUnavailableError(
+                "Parquet export needs pyarrow; install it with `pip install pyarrow`."
+            ) from exc
+    rule_ids = issue_rule_ids()
+    if len(rule_ids) > MAX_ISSUE_BITS:
+        raise ExportUnavailableError(
+            f"{len(rule_ids)} rules do not fit the {MAX_ISSUE_BITS}-bit issue bitset."
+        )
+    positions = {rule_id: index for index, rule_id in enumerate(rule_ids)}
+
+    def _chunks() -> Iterator[list[tuple[Any, ...]]]:
+        # Imported here so the database engine is only created once an export runs.
+        from .storage import SessionLocal, iter_analysis_export
+
+        with SessionLocal() as session:
+            for rows in iter_analysis_export(
+                session,
+                url=url,
+                since=since,
+                until=until,
+                chunk_rows=get_settings().export_chunk_rows,
+            ):
+                yield _flatten(rows, positions)
+
+    if export_format == "csv":
+        return _iter_csv_gzip(_chunks())
+    return _iter_parquet(_chunks(), rule_ids)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--url", help="Only export analyses of this URL.")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="ISO date or datetime.")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="ISO date or datetime.")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="File to write (default: analysis_history.csv.gz or .parquet).",
+    )
+    args = parser.parse_args(argv)
+
+    output = args.output or f"analysis_history{FILE_EXTENSIONS[args.format]}"
+    try:
+        chunks = export_history(args.format, url=args.url, since=args.since, until=args.until)
+    except (ExportUnavailableError, ValueError) as exc:
+        parser.exit(1, f"{exc}\n")
+    with open(output, "wb") as handle:
+        for data in chunks:
+            handle.write(data)
+    legend = ", ".join(f"{bit}={rule_id}" for bit, rule_id in enumerate(issue_rule_ids()))
+    print(f"Wrote {output}. issue_bits: {legend}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
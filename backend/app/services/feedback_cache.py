@@ -0,0 +1,140 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from threading import Lock
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import FeedbackCacheEntry
+from .storage import SessionLocal, upsert
+
+Feedback = tuple[str, dict[str, str], dict[str, str]]
+# The database tier is trimmed after every max_entries / TRIM_FRACTION writes.
+TRIM_FRACTION = 100
+
+
+@dataclass(slots=True)
+class FeedbackCacheStats:
+    memory_hits: int = 0
+    database_hits: int = 0
+    misses: int = 0
+
+
+class FeedbackCache:
+    """Two-tier AI feedback cache: an in-process LRU in front of a database table.
+
+    Both tiers expire entries after ``ttl_seconds``. The database tier keeps at
+    most ``max_entries`` rows and evicts the least recently used ones. Rows are
+    counted once every ``trim_interval`` writes rather than on each one, so
+    the table may briefly hold up to that many extra rows.
+    """
+
+    def __init__(self, *, ttl_seconds: int, max_entries: int, memory_entries: int) -> None:
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.trim_interval = max(1, max_entries // TRIM_FRACTION)
+        self.stats = FeedbackCacheStats()
+        self._writes_since_trim = 0
+        self._memory: OrderedDict[str, tuple[datetime, Feedback]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Feedback | None:
+        now = datetime.utcnow()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                stored_at, value = cached
+                if now - stored_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+        with SessionLocal() as session:
+            entry = session.get(FeedbackCacheEntry, key)
+            if entry is None or now - entry.created_at >= self.ttl:
+                with self._lock:
+                    self.stats.misses += 1
+                return None
+            entry.last_used_at = now
+            value = (entry.ai_feedback, entry.google_preview, entry.social_preview)
+            stored_at = entry.created_at
+            session.commit()
+
+        with self._lock:
+            self.stats.database_hits += 1
+            self._remember(key, stored_at, value)
+        return value
+
+    def put(self, key: str, value: Feedback) -> None:
+        now = datetime.utcnow()
+        ai_feedback, google_preview, social_preview = value
+        with SessionLocal() as session:
+            # Concurrent analyses may store the same key; the last write wins.
+            upsert(
+                session,
+                FeedbackCacheEntry,
+                [
+                    {
+                        "key": key,
+                        "ai_feedback": ai_feedback,
+                        "google_preview": google_preview,
+                        "social_preview": social_preview,
+                        "created_at": now,
+                        "last_used_at": now,
+                    }
+                ],
+                key="key",
+                update=(
+                    "ai_feedback",
+                    "google_preview",
+                    "social_preview",
+                    "created_at",
+                    "last_used_at",
+                ),
+            )
+            with self._lock:
+                self._writes_since_trim += 1
+                trim = self._writes_since_trim >= self.trim_interval
+                if trim:
+                    self._writes_since_trim = 0
+            if trim:
+                self._trim(session)
+            session.commit()
+
+        with self._lock:
+            self._remember(key, now, value)
+
+    def _trim(self, session: Session) -> None:
+        overflow = session.scalar(select(func.count()).select_from(FeedbackCacheEntry))
+        overflow -= self.max_entries
+        if overflow > 0:
+            stale_keys = (
+                select(FeedbackCacheEntry.key)
+                .order_by(FeedbackCacheEntry.last_used_at)
+                .limit(overflow)
+                .scalar_subquery()
+            )
+            session.execute(
+                delete(FeedbackCacheEntry).where(FeedbackCacheEntry.key.in_(stale_keys))
+            )
+
+    def _remember(self, key: str, stored_at: datetime, value: Feedback) -> None:
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+@lru_cache
+def get_feedback_cache() -> FeedbackCache:
+    settings = get_settings()
+    return FeedbackCache(
+        ttl_seconds=settings.feedback_cache_ttl_seconds,
+        max_entries=settings.feedback_cache_max_entries,
+        memory_entries=settings.feedback_cache_memory_entries,
+    )
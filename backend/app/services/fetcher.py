@@ -1,9 +1,17 @@
-from dataclasses import dataclass
+import asyncio
+import contextlib
+import hashlib
+import re
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 from time import perf_counter
 from typing import Any
 
 import httpx
 
+from ..config import get_settings
+from .metrics import observe_stage
+
 
 class FetchError(Exception):
     """Raised when fetching a URL fails."""
@@ -13,31 +21,343 @@ class FetchError(Exception):
         self.status_code = status_code
 
 
+@dataclass(slots=True)
+class FetchTimings:
+    """Per-phase timings for a fetch, summed across any redirects."""
+
+    connect_ms: float = 0.0
+    tls_ms: float = 0.0
+    ttfb_ms: float = 0.0
+    download_ms: float = 0.0
+
+
+@dataclass(slots=True)
+class ResourceTiming:
+    """One entry of a page's resource waterfall.
+
+    ``start_ms`` is relative to the start of the waterfall. ``size_bytes`` is
+    the transfer size: ``Content-Length`` when sent, otherwise the bytes
+    actually read.
+    """
+
+    url: str
+    kind: str
+    render_blocking: bool = False
+    status_code: int | None = None
+    content_type: str | None = None
+    content_encoding: str | None = None
+    size_bytes: int | None = None
+    start_ms: float = 0.0
+    duration_ms: float = 0.0
+    timings: FetchTimings = field(default_factory=FetchTimings)
+    error: str | None = None
+
+    @property
+    def compressed(self) -> bool:
+        return self.content_encoding not in (None, "", "identity")
+
+
 @dataclass(slots=True)
 class FetchResult:
     url: str
     status_code: int
     load_time_ms: float
     html: str
+    timings: FetchTimings = field(default_factory=FetchTimings)
+    etag: str | None = None
+    last_modified: str | None = None
+    body_hash: str | None = None
+    not_modified: bool = False
+    bytes_read: int = 0
+    truncated: bool = False
+    content_type: str | None = None
+    resources: list[ResourceTiming] | None = None
+
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+HEAD_END_PATTERN = re.compile(rb"</head\s*>", re.IGNORECASE)
+# Bytes kept from the previous chunk so a split "</head >" is still found.
+HEAD_END_OVERLAP = 16
+
+
+_client: httpx.AsyncClient | None = None
+_host_slots: dict[str, "_HostSlots"] = {}
+
+
+def open_fetch_client() -> httpx.AsyncClient:
+    """Create the shared fetch client if it does not exist yet."""
+    global _client
+    if _client is None:
+        settings = get_settings()
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=settings.fetch_timeout,
+            http2=settings.fetch_http2,
+            limits=httpx.Limits(
+                max_connections=settings.fetch_max_connections,
+                max_keepalive_connections=settings.fetch_max_connections,
+            ),
+        )
+    return _client
+
+
+async def close_fetch_client() -> None:
+    """Close the shared fetch client and drop its connection pool."""
+    global _client
+    client, _client = _client, None
+    _host_slots.clear()
+    if client is not None:
+        await client.aclose()
+
+
+@dataclass(slots=True)
+class _HostSlots:
+    semaphore: asyncio.Semaphore
+    # Requests holding or waiting for a slot; the entry is dropped at zero.
+    users: int = 0
+
+
+@contextlib.asynccontextmanager
+async def _host_slot(host: str) -> AsyncIterator[None]:
+    """Hold one of ``host``'s connection slots for the duration of the block.
+
+    A host's entry only exists while requests to it are in flight, so the
+    table does not grow with every host ever fetched.
+    """
+    slots = _host_slots.get(host)
+    if slots is None:
+        limit = get_settings().fetch_max_connections_per_host
+        slots = _host_slots[host] = _HostSlots(asyncio.Semaphore(limit))
+    slots.users += 1
+    try:
+        async with slots.semaphore:
+            yield
+    finally:
+        slots.users -= 1
+        if not slots.users and _host_slots.get(host) is slots:
+            del _host_slots[host]
+
 
+def is_html_content_type(content_type: str | None) -> bool:
+    """Whether a ``Content-Type`` header denotes HTML; a missing header counts as HTML."""
+    return not content_type or content_type.split(";")[0].strip().lower() in HTML_CONTENT_TYPES
 
-async def fetch_html(url: str, *, timeout: float = 15.0) -> FetchResult:
-    """Fetch HTML content for the provided URL and measure load time."""
-    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout) as client:
+
+class _PhaseTracer:
+    """httpcore trace hook that accumulates connect/TLS/TTFB durations."""
+
+    _PHASES = {
+        "connection.connect_tcp": "connect_ms",
+        "connection.start_tls": "tls_ms",
+        "http11.receive_response_headers": "ttfb_ms",
+        "http2.receive_response_headers": "ttfb_ms",
+    }
+
+    def __init__(self, timings: FetchTimings) -> None:
+        self.timings = timings
+        self._started: dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: dict[str, Any]) -> None:
+        phase, _, state = event_name.rpartition(".")
+        attr = self._PHASES.get(phase)
+        if attr is None:
+            return
+        if state == "started":
+            self._started[phase] = perf_counter()
+        elif phase in self._started:
+            elapsed = (perf_counter() - self._started.pop(phase)) * 1000
+            setattr(self.timings, attr, getattr(self.timings, attr) + elapsed)
+
+
+async def _read_body(
+    response: httpx.Response, *, max_bytes: int, head_only: bool
+) -> tuple[bytes, bool]:
+    """Read a streamed body in chunks, returning ``(body, truncated)``."""
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        search_from = max(len(body) - HEAD_END_OVERLAP, 0)
+        body += chunk
+        if len(body) >= max_bytes:
+            return bytes(body[:max_bytes]), True
+        if head_only:
+            match = HEAD_END_PATTERN.search(body, search_from)
+            if match:
+                return bytes(body[: match.end()]), True
+    return bytes(body), False
+
+
+async def iter_body(url: str, *, max_bytes: int | None = None) -> AsyncIterator[bytes]:
+    """Stream a URL's body in chunks, stopping after ``max_bytes``.
+
+    Nothing is buffered, so large documents can be parsed as they arrive and
+    the download stops as soon as the caller closes the iterator.
+    """
+    if max_bytes is None:
+        max_bytes = get_settings().fetch_max_bytes
+    client = open_fetch_client()
+    async with _host_slot(httpx.URL(url).host):
+        try:
+            async with client.stream("GET", url) as response:
+                if response.status_code >= 400:
+                    raise FetchError(
+                        f"Received HTTP {response.status_code} from URL.",
+                        status_code=response.status_code,
+                    )
+                remaining = max_bytes
+                async for chunk in response.aiter_bytes():
+                    chunk = chunk[:remaining]
+                    remaining -= len(chunk)
+                    yield chunk
+                    if not remaining:
+                        return
+        except httpx.RequestError as exc:
+            raise FetchError(f"Failed to fetch URL: {exc}") from exc
+
+
+async def fetch_html(
+    url: str,
+    *,
+    timeout: float | None = None,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    max_bytes: int | None = None,
+    head_only: bool = False,
+    html_only: bool = False,
+    user_agent: str | None = None,
+) -> FetchResult:
+    """Fetch HTML content for the provided URL and measure load time.
+
+    When ``etag`` or ``last_modified`` is given the request is conditional; a
+    304 answer yields a result with ``not_modified`` set and an empty body.
+
+    The body is streamed and reading stops after ``max_bytes`` (defaulting to
+    the ``FETCH_MAX_BYTES`` setting) or, with ``head_only``, once ``</head>``
+    has arrived. Either cutoff sets ``truncated`` on the result. With
+    ``html_only``, a response whose ``Content-Type`` is not HTML is closed
+    without reading its body and returned with empty ``html``.
+    ``user_agent`` replaces the client's default ``User-Agent`` header.
+    """
+    if max_bytes is None:
+        max_bytes = get_settings().fetch_max_bytes
+    client = open_fetch_client()
+    timings = FetchTimings()
+    headers: dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    if user_agent:
+        headers["User-Agent"] = user_agent
+    request = client.build_request(
+        "GET",
+        url,
+        headers=headers,
+        timeout=timeout if timeout is not None else client.timeout,
+        extensions={"trace": _PhaseTracer(timings)},
+    )
+
+    async with _host_slot(request.url.host):
         start_time = perf_counter()
         try:
-            response = await client.get(url)
+            response = await client.send(request, stream=True)
+            try:
+                body_start = perf_counter()
+                if html_only and not is_html_content_type(response.headers.get("content-type")):
+                    body, truncated = b"", True
+                else:
+                    body, truncated = await _read_body(
+                        response, max_bytes=max_bytes, head_only=head_only
+                    )
+                timings.download_ms = (perf_counter() - body_start) * 1000
+            finally:
+                await response.aclose()
         except httpx.RequestError as exc:
             raise FetchError(f"Failed to fetch URL: {exc}") from exc
         load_time_ms = (perf_counter() - start_time) * 1000
-        if response.status_code >= 400:
-            raise FetchError(
-                f"Received HTTP {response.status_code} from URL.",
-                status_code=response.status_code,
-            )
-        return FetchResult(
-            url=str(response.url),
+
+    observe_stage("fetch", load_time_ms / 1000)
+    for phase in ("connect", "tls", "ttfb", "download"):
+        # Reused connections skip connect and TLS; leave those out.
+        phase_ms = getattr(timings, f"{phase}_ms")
+        if phase_ms:
+            observe_stage(f"fetch_{phase}", phase_ms / 1000)
+
+    if response.status_code >= 400:
+        raise FetchError(
+            f"Received HTTP {response.status_code} from URL.",
             status_code=response.status_code,
-            load_time_ms=load_time_ms,
-            html=response.text,
         )
+    not_modified = response.status_code == 304
+    return FetchResult(
+        url=str(response.url),
+        status_code=response.status_code,
+        load_time_ms=load_time_ms,
+        html="" if not_modified else body.decode(response.encoding or "utf-8", errors="replace"),
+        timings=timings,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+        body_hash=None if not_modified else hashlib.sha256(body).hexdigest(),
+        not_modified=not_modified,
+        bytes_read=len(body),
+        truncated=truncated,
+        content_type=response.headers.get("content-type"),
+    )
+
+
+async def fetch_resource(
+    resource: ResourceTiming,
+    *,
+    origin: float,
+    read_body: bool = False,
+    max_bytes: int | None = None,
+) -> bytes:
+    """Fetch a page sub-resource over the shared client, filling in ``resource``.
+
+    Only the headers are awaited when they carry a ``Content-Length``, unless
+    ``read_body`` asks for the (decoded) body, which is returned. ``origin``
+    is the ``perf_counter()`` value that ``start_ms`` is measured from.
+    Failures are recorded in ``resource.error`` rather than raised.
+    """
+    if max_bytes is None:
+        max_bytes = get_settings().fetch_max_bytes
+    client = open_fetch_client()
+    try:
+        request = client.build_request(
+            "GET", resource.url, extensions={"trace": _PhaseTracer(resource.timings)}
+        )
+    except httpx.InvalidURL as exc:
+        resource.error = f"Invalid URL: {exc}"
+        return b""
+
+    body = b""
+    async with _host_slot(request.url.host):
+        start_time = perf_counter()
+        resource.start_ms = (start_time - origin) * 1000
+        try:
+            response = await client.send(request, stream=True)
+            try:
+                resource.status_code = response.status_code
+                resource.content_type = response.headers.get("content-type")
+                resource.content_encoding = response.headers.get("content-encoding")
+                content_length = response.headers.get("content-length")
+                body_start = perf_counter()
+                if read_body:
+                    body, _ = await _read_body(response, max_bytes=max_bytes, head_only=False)
+                elif content_length is None:
+                    async for _ in response.aiter_raw():
+                        if response.num_bytes_downloaded >= max_bytes:
+                            break
+                resource.timings.download_ms = (perf_counter() - body_start) * 1000
+                resource.size_bytes = (
+                    int(content_length)
+                    if content_length and content_length.isdigit()
+                    else response.num_bytes_downloaded
+                )
+            finally:
+                await response.aclose()
+        except httpx.HTTPError as exc:
+            resource.error = f"Failed to fetch resource: {exc}"
+        resource.duration_ms = (perf_counter() - start_time) * 1000
+
+    observe_stage("fetch_resource", resource.duration_ms / 1000)
+    return body
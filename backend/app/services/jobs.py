@@ -0,0 +1,217 @@
+import asyncio
+import contextlib
+import logging
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from ..models import AnalysisJob
+from .storage import (
+    SessionLocal,
+    claim_job,
+    create_job,
+    delete_finished_jobs,
+    get_job,
+    requeue_jobs,
+    update_job,
+)
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({"succeeded", "failed"})
+PRUNE_INTERVAL_SECONDS = 3600
+
+Progress = Callable[[str], None]
+JobRunner = Callable[[dict[str, Any], Progress], Awaitable[dict[str, Any]]]
+
+
+@dataclass(slots=True)
+class JobEvent:
+    job_id: str
+    status: str
+    stage: str
+    error: str | None = None
+    result: dict[str, Any] | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_job(cls, job: AnalysisJob) -> "JobEvent":
+        return cls(
+            job_id=job.id,
+            status=job.status,
+            stage=job.stage,
+            error=job.error,
+            result=job.result,
+        )
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+
+class JobQueue:
+    """Local queue of analysis jobs processed by a fixed number of workers.
+
+    Job rows live in the database, so anything still queued when the process
+    stopped is picked up again by :meth:`start`, as are running jobs that
+    have not been updated for ``stale_seconds``. A worker claims a job with a
+    conditional update before running it, so processes sharing the database
+    never run the same job twice. Progress is written to the row after every
+    stage, only while the job is still ``running``, and pushed to live
+    subscribers. Finished jobs are deleted once
+    ``retention_seconds`` have passed.
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        *,
+        workers: int,
+        stale_seconds: int,
+        retention_seconds: int,
+    ) -> None:
+        self.runner = runner
+        self.workers = workers
+        self.stale = timedelta(seconds=stale_seconds)
+        self.retention = timedelta(seconds=retention_seconds)
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task[None]] = []
+        self._subscribers: dict[str, set[asyncio.Queue[JobEvent]]] = {}
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        for job_id in await asyncio.to_thread(self._requeue):
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._prune()))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def submit(self, url: str, request: dict[str, Any]) -> JobEvent:
+        event = await asyncio.to_thread(self._create, uuid.uuid4().hex, url, request)
+        self._queue.put_nowait(event.job_id)
+        return event
+
+    def get(self, job_id: str) -> JobEvent | None:
+        with SessionLocal() as session:
+            job = get_job(session, job_id)
+            return JobEvent.from_job(job) if job else None
+
+    async def events(self, job_id: str) -> AsyncIterator[JobEvent]:
+        """Yield the job's current state, then every change until it finishes."""
+        updates: asyncio.Queue[JobEvent] = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(updates)
+        try:
+            event = await asyncio.to_thread(self.get, job_id)
+            if event is None:
+                return
+            yield event
+            while not event.finished:
+                event = await updates.get()
+                yield event
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(updates)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    def _requeue(self) -> list[str]:
+        with SessionLocal() as session:
+            return requeue_jobs(session, stale_before=datetime.utcnow() - self.stale)
+
+    def _create(self, job_id: str, url: str, request: dict[str, Any]) -> JobEvent:
+        with SessionLocal() as session:
+            return JobEvent.from_job(create_job(session, job_id=job_id, url=url, request=request))
+
+    def _claim(self, job_id: str) -> tuple[JobEvent, dict[str, Any]] | None:
+        with SessionLocal() as session:
+            job = claim_job(session, job_id)
+            return (JobEvent.from_job(job), dict(job.request)) if job else None
+
+    def _delete_finished(self) -> int:
+        with SessionLocal() as session:
+            return delete_finished_jobs(
+                session, finished_before=datetime.utcnow() - self.retention
+            )
+
+    def _write(self, job_id: str, changes: dict[str, Any]) -> JobEvent | None:
+        with SessionLocal() as session:
+            job = update_job(session, job_id, only_if_status="running", **changes)
+            return JobEvent.from_job(job) if job else None
+
+    def _publish(self, event: JobEvent) -> None:
+        for updates in self._subscribers.get(event.job_id, ()):
+            updates.put_nowait(event)
+
+    async def _update(self, job_id: str, **changes: Any) -> None:
+        event = await asyncio.to_thread(self._write, job_id, changes)
+        if event is not None:
+            self._publish(event)
+
+    async def _prune(self) -> None:
+        while True:
+            deleted = await asyncio.to_thread(self._delete_finished)
+            if deleted:
+                logger.info("Deleted %d finished analysis jobs.", deleted)
+            await asyncio.sleep(min(self.retention.total_seconds(), PRUNE_INTERVAL_SECONDS))
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str) -> None:
+        claimed = await asyncio.to_thread(self._claim, job_id)
+        if claimed is None:
+            # Finished, deleted, or claimed by another process.
+            return
+        event, request = claimed
+        self._publish(event)
+
+        # Stage writes run in a thread; chaining them keeps them in order.
+        stage_writes: asyncio.Future[None] | None = None
+
+        def _progress(stage: str) -> None:
+            nonlocal stage_writes
+            previous = stage_writes
+
+            async def _write_stage() -> None:
+                if previous is not None:
+                    await previous
+                await self._update(job_id, stage=stage)
+
+            stage_writes = asyncio.ensure_future(_write_stage())
+
+        try:
+            result = await self.runner(request, _progress)
+        except asyncio.CancelledError:
+            # Shutting down: leave the job queued so the next start picks it up. A stage
+            # write already in its thread cannot be stopped, but once the job is queued
+            # it no longer matches "running" and changes nothing.
+            if stage_writes is not None:
+                stage_writes.cancel()
+            await self._update(job_id, status="queued", stage="queued")
+            raise
+        except Exception as exc:  # noqa: BLE001 - failures are reported through the job
+            detail = getattr(exc, "detail", None) or str(exc) or type(exc).__name__
+            logger.info("Analysis job %s failed: %s", job_id, detail)
+            changes = {"status": "failed", "error": str(detail)}
+        else:
+            changes = {"status": "succeeded", "stage": "done", "result": result}
+        if stage_writes is not None:
+            await stage_writes
+        await self._update(job_id, **changes)
@@ -0,0 +1,197 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Histograms and counters are updated as requests run. Gauges and counters
+kept elsewhere (queue depths, cache statistics) are registered as collectors
+that are read at scrape time. :func:`span` times one stage of a request and
+also adds it to the request's ``Server-Timing`` breakdown when one is being
+collected. Work shared between requests collects its own breakdown, which
+each request then adds with :func:`merge_server_timing`.
+"""
+
+import math
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+Labels = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics: dict[str, "Histogram | Counter | Collector"] = {}
+_server_timing: ContextVar[dict[str, float] | None] = ContextVar(
+    "server_timing", default=None
+)
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _register(metric: "Histogram | Counter | Collector") -> None:
+    if metric.name in _metrics:
+        raise ValueError(f"Metric {metric.name!r} is already registered.")
+    _metrics[metric.name] = metric
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        *,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = (*sorted(buckets), math.inf)
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+        self._lock = Lock()
+        _register(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple((name, str(labels[name])) for name in self.labelnames)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            total[0] += value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [
+                (key, list(counts), total[0]) for key, (counts, total) in self._series.items()
+            ]
+        for key, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = (("le", _format_value(bound)),)
+                yield f"{self.name}_bucket{_format_labels(key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(key)} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, *, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[Labels, float] = {}
+        self._lock = Lock()
+        _register(self)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple((name, str(labels[name])) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+Samples = Iterable[tuple[dict[str, str], float]]
+
+
+class Collector:
+    """A gauge or counter whose samples are produced by ``collect`` on every scrape."""
+
+    def __init__(
+        self, name: str, documentation: str, *, kind: str, collect: Callable[[], Samples]
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.collect = collect
+        _register(self)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in self.collect():
+            yield f"{self.name}{_format_labels(tuple(labels.items()))} {_format_value(value)}"
+
+
+def register_gauge(name: str, documentation: str, value: Callable[[], float]) -> Collector:
+    """Expose a single unlabelled value read at scrape time."""
+    return Collector(name, documentation, kind="gauge", collect=lambda: [({}, value())])
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in _metrics.values():
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram(
+    "seo_analyzer_stage_seconds",
+    "Time spent in each stage of an analysis.",
+    labelnames=("stage",),
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block as ``stage``."""
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, perf_counter() - started)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration that was measured elsewhere."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _server_timing.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def collect_server_timing() -> Iterator[dict[str, float]]:
+    """Gather the stages run in this context (and tasks it starts) into a dict."""
+    timings: dict[str, float] = {}
+    token = _server_timing.set(timings)
+    try:
+        yield timings
+    finally:
+        _server_timing.reset(token)
+
+
+def merge_server_timing(timings: dict[str, float]) -> None:
+    """Add stages collected in another context, such as a shared task, to this one's."""
+    collected = _server_timing.get()
+    if collected is not None:
+        for stage, seconds in timings.items():
+            collected[stage] = collected.get(stage, 0.0) + seconds
+
+
+def format_server_timing(timings: dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
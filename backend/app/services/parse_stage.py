@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import multiprocessing
+from collections.abc import Callable, Collection
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from ..config import get_settings
+from .fetcher import FetchResult
+from .metrics import span
+from .parser import extract_links, parse_seo_tags
+from .resources import Resource, discover_resources
+from .seo_rules import Finding, RuleReport, evaluate_rules, record_rule_timings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+EXECUTOR_KINDS = ("process", "thread", "inline")
+
+
+class ParseStage:
+    """Runs CPU-bound page work off the event loop on a bounded pool.
+
+    At most ``workers + max_pending`` jobs are admitted at once; further callers
+    wait for a slot, so a burst of large pages queues in the event loop instead
+    of piling up inside the executor. If a worker process dies, the process
+    pool is replaced and the job is retried once.
+    """
+
+    def __init__(self, *, kind: str, workers: int, max_pending: int) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown parse executor {kind!r}; expected one of {EXECUTOR_KINDS}.")
+        self.kind = kind
+        self.workers = workers
+        self._executor = self._new_executor()
+        self._slots = asyncio.Semaphore(workers + max_pending)
+        self.active = 0
+
+    def _new_executor(self) -> Executor | None:
+        if self.kind == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        if self.kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parse")
+        return None
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            return func(*args)
+        self.active += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                executor = self._executor
+                try:
+                    return await loop.run_in_executor(executor, func, *args)
+                except BrokenProcessPool:
+                    # Jobs failing together on one broken pool replace it only once.
+                    if self._executor is executor:
+                        logger.warning("Parse worker process died; restarting the pool.")
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        self._executor = self._new_executor()
+                    return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.active -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_stage: ParseStage | None = None
+
+
+def open_parse_stage() -> ParseStage:
+    """Create the shared parse stage from settings if it does not exist yet."""
+    global _stage
+    if _stage is None:
+        settings = get_settings()
+        workers = settings.parse_workers or multiprocessing.cpu_count()
+        _stage = ParseStage(
+            kind=settings.parse_executor,
+            workers=workers,
+            max_pending=settings.parse_max_pending,
+        )
+    return _stage
+
+
+def parse_stage_active() -> int:
+    """Jobs running on or waiting for the parse stage."""
+    return _stage.active if _stage is not None else 0
+
+
+def close_parse_stage() -> None:
+    """Shut down the shared parse stage's worker pool."""
+    global _stage
+    stage, _stage = _stage, None
+    if stage is not None:
+        stage.shutdown()
+
+
+def _parse_and_evaluate(
+    fetch_result: FetchResult,
+    enabled: Collection[str] | None,
+    disabled: Collection[str],
+) -> tuple[dict[str, str | None], RuleReport]:
+    seo_data = parse_seo_tags(fetch_result.html)
+    report = evaluate_rules(
+        seo_data, fetch_result=fetch_result, enabled=enabled, disabled=disabled
+    )
+    return seo_data, report
+
+
+async def parse_and_evaluate(
+    fetch_result: FetchResult,
+    *,
+    enabled: Collection[str] | None = None,
+    disabled: Collection[str] = (),
+) -> tuple[dict[str, str | None], list[Finding]]:
+    """Parse SEO tags and evaluate rules for a fetched page on the parse stage."""
+    with span("parse"):
+        seo_data, report = await open_parse_stage().run(
+            _parse_and_evaluate,
+            fetch_result,
+            frozenset(enabled) if enabled is not None else None,
+            frozenset(disabled),
+        )
+    # Rules may have run in a worker process, so timings are recorded here.
+    record_rule_timings(report.timings_ms)
+    return seo_data, report.findings
+
+
+def _parse_evaluate_and_link(
+    fetch_result: FetchResult,
+) -> tuple[dict[str, str | None], RuleReport, list[str]]:
+    seo_data, report = _parse_and_evaluate(fetch_result, None, frozenset())
+    return seo_data, report, extract_links(fetch_result.html, fetch_result.url)
+
+
+async def parse_crawled_page(
+    fetch_result: FetchResult,
+) -> tuple[dict[str, str | None], list[Finding], list[str]]:
+    """Parse tags, run the rules and collect the page's links on the parse stage."""
+    with span("parse"):
+        seo_data, report, links = await open_parse_stage().run(
+            _parse_evaluate_and_link, fetch_result
+        )
+    record_rule_timings(report.timings_ms)
+    return seo_data, report.findings, links
+
+
+async def parse_tags(html: str) -> dict[str, str | None]:
+    """Parse SEO tags only, without running rules, on the parse stage."""
+    with span("parse"):
+        return await open_parse_stage().run(parse_seo_tags, html)
+
+
+async def discover_page_resources(html: str, base_url: str) -> list[Resource]:
+    """Find the page's stylesheets, scripts, images and fonts on the parse stage."""
+    with span("discover"):
+        return await open_parse_stage().run(discover_resources, html, base_url)
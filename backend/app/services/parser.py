@@ -1,21 +1,62 @@
 from collections.abc import Mapping
-from typing import Any
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urldefrag, urljoin
 
-from bs4 import BeautifulSoup
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
+META_NAME_FIELDS = {
+    "description": "meta_description",
+    "twitter:card": "twitter_card",
+    "twitter:title": "twitter_title",
+    "twitter:description": "twitter_description",
+    "twitter:image": "twitter_image",
+}
+META_PROPERTY_FIELDS = {
+    "og:title": "og_title",
+    "og:description": "og_description",
+    "og:image": "og_image",
+    "og:url": "og_url",
+}
+SEO_FIELDS = (
+    "title",
+    "meta_description",
+    "canonical_url",
+    "og_title",
+    "og_description",
+    "og_image",
+    "og_url",
+    "twitter_card",
+    "twitter_title",
+    "twitter_description",
+    "twitter_image",
+)
 
-def _get_meta_content(soup: BeautifulSoup, name: str) -> str | None:
+# Elements allowed before the document body starts; any other start tag means
+# the head is over.
+HEAD_ELEMENTS = frozenset(
+    {"html", "head", "title", "meta", "link", "base", "style", "script", "noscript", "template"}
+)
+# Head elements whose children are not themselves evidence of body content.
+OPAQUE_HEAD_ELEMENTS = frozenset({"noscript", "template"})
+
+
+def _get_meta_content(soup: "BeautifulSoup", name: str) -> str | None:
     tag = soup.find("meta", attrs={"name": name})
     return tag.get("content") if tag else None
 
 
-def _get_property_content(soup: BeautifulSoup, prop: str) -> str | None:
+def _get_property_content(soup: "BeautifulSoup", prop: str) -> str | None:
     tag = soup.find("meta", attrs={"property": prop})
     return tag.get("content") if tag else None
 
 
-def parse_seo_tags(html: str) -> dict[str, str | None]:
-    """Extract relevant SEO tags from HTML."""
+def _parse_with_soup(html: str) -> dict[str, str | None]:
+    """Extract SEO tags by building a full BeautifulSoup tree."""
+    # Imported on first use: most documents never need the fallback parser.
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
 
     title_tag = soup.find("title")
@@ -36,3 +77,141 @@ def parse_seo_tags(html: str) -> dict[str, str | None]:
     }
 
     return seo_data
+
+
+class _HeadComplete(Exception):
+    """Raised from parser callbacks to stop once the head has been read."""
+
+
+class _HeadTagExtractor(HTMLParser):
+    """Collect SEO tags in a single pass, stopping at the end of ``<head>``."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.found: dict[str, str | None] = {}
+        self.saw_structure = False
+        self.title_parts: list[str] | None = None
+        self._opaque_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in ("html", "head"):
+            self.saw_structure = True
+        elif tag == "body":
+            self.saw_structure = True
+            raise _HeadComplete
+        elif tag in OPAQUE_HEAD_ELEMENTS:
+            self._opaque_depth += 1
+        elif self._opaque_depth:
+            return
+        elif tag not in HEAD_ELEMENTS:
+            raise _HeadComplete
+
+        if tag == "title" and "title" not in self.found:
+            self.title_parts = []
+        elif tag in ("meta", "link"):
+            self._handle_void(tag, {name: value or "" for name, value in attrs})
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag in OPAQUE_HEAD_ELEMENTS:
+            self._opaque_depth -= 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self.saw_structure = True
+            raise _HeadComplete
+        if tag in OPAQUE_HEAD_ELEMENTS and self._opaque_depth:
+            self._opaque_depth -= 1
+        elif tag == "title" and self.title_parts is not None:
+            self.found["title"] = "".join(self.title_parts).strip()
+            self.title_parts = None
+
+    def handle_data(self, data: str) -> None:
+        if self.title_parts is not None:
+            self.title_parts.append(data)
+
+    def _handle_void(self, tag: str, attrs: Mapping[str, str]) -> None:
+        if tag == "link":
+            if "canonical_url" not in self.found and any(
+                token in ("canonical", "Canonical") for token in attrs.get("rel", "").split()
+            ):
+                self.found["canonical_url"] = attrs.get("href")
+            return
+
+        field = META_NAME_FIELDS.get(attrs.get("name", ""))
+        if field is None:
+            field = META_PROPERTY_FIELDS.get(attrs.get("property", ""))
+        if field is not None and field not in self.found:
+            self.found[field] = attrs.get("content")
+
+
+def _parse_head_streaming(html: str) -> dict[str, str | None] | None:
+    """Single-pass head extraction; ``None`` means the document needs the full parser."""
+    extractor = _HeadTagExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except _HeadComplete:
+        pass
+    except Exception:  # noqa: BLE001 - any tokenizer failure falls back to BeautifulSoup
+        return None
+
+    if not extractor.saw_structure:
+        return None
+    if extractor.title_parts is not None:
+        # Unterminated <title>: let the full parser decide what belongs to it.
+        return None
+    return {field: extractor.found.get(field) for field in SEO_FIELDS}
+
+
+def parse_seo_tags(html: str) -> dict[str, str | None]:
+    """Extract relevant SEO tags from HTML.
+
+    The document is scanned once and parsing stops at the end of ``<head>``.
+    Documents without any recognizable html/head/body structure are handed to
+    BeautifulSoup so tags placed anywhere are still found.
+    """
+    seo_data = _parse_head_streaming(html)
+    if seo_data is None:
+        seo_data = _parse_with_soup(html)
+    return seo_data
+
+
+class _LinkExtractor(HTMLParser):
+    """Collect followable ``<a href>`` targets, honouring ``<base>`` and nofollow."""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.links: dict[str, None] = {}
+        self.nofollow = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        values = {name: value or "" for name, value in attrs}
+        if tag == "base" and values.get("href"):
+            self.base_url = urljoin(self.base_url, values["href"])
+        elif tag == "meta" and values.get("name", "").lower() == "robots":
+            directives = {token.strip() for token in values.get("content", "").lower().split(",")}
+            self.nofollow = self.nofollow or bool(directives & {"nofollow", "none"})
+        elif tag in ("a", "area") and values.get("href"):
+            if "nofollow" in values.get("rel", "").lower().split():
+                return
+            url, _ = urldefrag(urljoin(self.base_url, values["href"].strip()))
+            self.links[url] = None
+
+
+def extract_links(html: str, base_url: str) -> list[str]:
+    """Return the absolute URLs a page links to, without fragments or duplicates.
+
+    Links marked ``rel="nofollow"`` are skipped, and a ``<meta name="robots">``
+    with ``nofollow`` or ``none`` means none are returned.
+    """
+    extractor = _LinkExtractor(base_url)
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:  # noqa: BLE001 - keep whatever was found before the markup broke
+        pass
+    if extractor.nofollow:
+        return []
+    return list(extractor.links)
@@ -0,0 +1,148 @@
+import re
+import unicodedata
+from urllib.parse import urlsplit
+
+from ..schemas import SEOTags
+
+# Arial advance widths in 1/1000 em for printable ASCII; Google renders
+# result titles and snippets in Arial, so this is close enough to predict
+# where it cuts text off.
+_ARIAL_WIDTHS = {
+    char: width
+    for width, chars in {
+        191: "'",
+        222: "ijl",
+        260: "|",
+        278: " !,./:;I[\\]ft",
+        333: "()-`r",
+        334: "{}",
+        355: '"',
+        389: "*",
+        469: "^",
+        500: "Jcksvxyz",
+        556: "#$0123456789?L_abdeghnopqu",
+        584: "+<=>~",
+        611: "FTZ",
+        667: "&ABEKPSVXY",
+        722: "CDHNRUw",
+        778: "GOQ",
+        833: "Mm",
+        889: "%",
+        944: "W",
+        1015: "@",
+    }.items()
+    for char in chars
+}
+_DEFAULT_WIDTH = 556
+_WIDE_WIDTH = 1000
+
+ELLIPSIS = "..."
+
+# Desktop result limits: titles at 20px up to 600px, snippets at 14px up to 920px.
+GOOGLE_TITLE_FONT_PX = 20
+GOOGLE_TITLE_MAX_PX = 600
+GOOGLE_SNIPPET_FONT_PX = 14
+GOOGLE_SNIPPET_MAX_PX = 920
+# Link cards on social networks show roughly two lines of each.
+SOCIAL_TITLE_FONT_PX = 16
+SOCIAL_TITLE_MAX_PX = 1000
+SOCIAL_DESCRIPTION_FONT_PX = 14
+SOCIAL_DESCRIPTION_MAX_PX = 1000
+
+NO_SNIPPET = "No meta description provided."
+NO_SOCIAL_DESCRIPTION = "No social description available."
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _char_width(char: str) -> int:
+    width = _ARIAL_WIDTHS.get(char)
+    if width is not None:
+        return width
+    if unicodedata.combining(char):
+        return 0
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return _WIDE_WIDTH
+    return _DEFAULT_WIDTH
+
+
+def text_width_px(text: str, font_px: float) -> float:
+    """Approximate rendered width of ``text`` in Arial at ``font_px``."""
+    return sum(_char_width(char) for char in text) * font_px / 1000
+
+
+def truncate_to_width(text: str, max_px: float, font_px: float) -> str:
+    """Collapse whitespace and cut ``text`` to fit ``max_px``, as search results do.
+
+    Text that does not fit is cut at the last word boundary that leaves room
+    for a trailing ellipsis; a single over-long word is cut mid-word.
+    """
+    text = _WHITESPACE.sub(" ", text).strip()
+    budget = max_px * 1000 / font_px
+    if sum(_char_width(char) for char in text) <= budget:
+        return text
+
+    budget -= sum(_char_width(char) for char in ELLIPSIS)
+    used = 0
+    cut = 0
+    for index, char in enumerate(text):
+        used += _char_width(char)
+        if used > budget:
+            break
+        cut = index + 1
+    head = text[:cut]
+    if cut < len(text) and text[cut] != " " and " " in head:
+        head = head.rsplit(" ", 1)[0]
+    return head.rstrip(" ,;:-") + ELLIPSIS
+
+
+def _first(*values: str | None) -> str | None:
+    for value in values:
+        if value and value.strip():
+            return value
+    return None
+
+
+def _site_name(url: str) -> str:
+    return urlsplit(url).hostname or "Website"
+
+
+def build_google_preview(seo_tags: SEOTags, url: str) -> dict[str, str]:
+    """Google result preview, falling back to Open Graph and Twitter tags."""
+    title = _first(seo_tags.title, seo_tags.og_title, seo_tags.twitter_title) or _site_name(url)
+    snippet = (
+        _first(
+            seo_tags.meta_description,
+            seo_tags.og_description,
+            seo_tags.twitter_description,
+        )
+        or NO_SNIPPET
+    )
+    return {
+        "title": truncate_to_width(title, GOOGLE_TITLE_MAX_PX, GOOGLE_TITLE_FONT_PX),
+        "snippet": truncate_to_width(snippet, GOOGLE_SNIPPET_MAX_PX, GOOGLE_SNIPPET_FONT_PX),
+    }
+
+
+def build_social_preview(seo_tags: SEOTags, url: str) -> dict[str, str]:
+    """Link card preview, preferring Open Graph, then Twitter, then plain tags."""
+    title = _first(seo_tags.og_title, seo_tags.twitter_title, seo_tags.title) or _site_name(url)
+    description = (
+        _first(
+            seo_tags.og_description,
+            seo_tags.twitter_description,
+            seo_tags.meta_description,
+        )
+        or NO_SOCIAL_DESCRIPTION
+    )
+    return {
+        "title": truncate_to_width(title, SOCIAL_TITLE_MAX_PX, SOCIAL_TITLE_FONT_PX),
+        "description": truncate_to_width(
+            description, SOCIAL_DESCRIPTION_MAX_PX, SOCIAL_DESCRIPTION_FONT_PX
+        ),
+    }
+
+
+def build_previews(seo_tags: SEOTags, url: str) -> tuple[dict[str, str], dict[str, str]]:
+    """Return the Google and social previews for a page without calling the LLM."""
+    return build_google_preview(seo_tags, url), build_social_preview(seo_tags, url)
@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from ..config import get_settings
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+
+class RecentSiteRecorder:
+    """Write-behind recorder for ``recent_sites``.
+
+    Updates are queued in memory (only the latest per URL is kept) and a
+    background task flushes them as one upsert every ``flush_interval``
+    seconds, or sooner once ``max_batch`` URLs are pending.
+    """
+
+    def __init__(
+        self, *, flush_interval: float, max_batch: int, use_async_engine: bool = False
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.use_async_engine = use_async_engine
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._async_engine: Any = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, *, url: str, status_code: int | None, load_time_ms: float | None) -> None:
+        """Queue a recent-site update; never blocks on the database."""
+        self._pending[url] = {
+            "url": url,
+            "last_analyzed_at": datetime.utcnow(),
+            "last_status_code": status_code,
+            "last_load_time_ms": load_time_ms,
+        }
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if len(self._pending) >= self.max_batch:
+            self._wake.set()
+
+    async def flush(self) -> bool:
+        """Write all queued updates now; return False if the write failed.
+
+        Rows from a failed or cancelled write are queued again unless a newer
+        update for the same URL has arrived in the meantime.
+        """
+        if not self._pending:
+            return True
+        rows, self._pending = list(self._pending.values()), {}
+        try:
+            if self.use_async_engine:
+                await self._flush_async(rows)
+            else:
+                await asyncio.to_thread(self._flush_sync, rows)
+        except asyncio.CancelledError:
+            self._requeue(rows)
+            raise
+        except Exception:  # noqa: BLE001 - keep the recorder alive and retry on the next flush
+            logger.exception("Failed to flush %d recent-site updates; will retry.", len(rows))
+            self._requeue(rows)
+            return False
+        storage.recent_sites_snapshot.invalidate()
+        return True
+
+    async def stop(self) -> None:
+        """Stop the background task and write everything still queued."""
+        task, self._task = self._task, None
+        if task is not None:
+            # Let an in-progress flush finish rather than cancelling it midway.
+            self._stopping = True
+            self._wake.set()
+            await task
+            self._stopping = False
+        while self._pending:
+            if not await self.flush():
+                logger.error("Dropping %d recent-site updates at shutdown.", len(self._pending))
+                self._pending.clear()
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+
+    def open_async_engine(self) -> None:
+        """Create the asyncio engine, failing clearly if its driver is missing."""
+        if self._async_engine is not None:
+            return
+        url = get_settings().resolved_async_database_url
+        try:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            self._async_engine = create_async_engine(url)
+        except ImportError as exc:
+            raise RuntimeError(
+                "DATABASE_ASYNC=true needs an asyncio database driver: "
+                'pip install "sqlalchemy[asyncio]" aiosqlite (or asyncpg for PostgreSQL).'
+            ) from exc
+
+    def _requeue(self, rows: list[dict[str, Any]]) -> None:
+        for row in rows:
+            self._pending.setdefault(row["url"], row)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            self._wake.clear()
+            await self.flush()
+
+    @staticmethod
+    def _flush_sync(rows: list[dict[str, Any]]) -> None:
+        with storage.engine.begin() as connection:
+            storage.upsert_recent_sites(connection, rows)
+
+    async def _flush_async(self, rows: list[dict[str, Any]]) -> None:
+        self.open_async_engine()
+        async with self._async_engine.begin() as connection:
+            await connection.run_sync(storage.upsert_recent_sites, rows)
+
+
+@lru_cache
+def get_recent_site_recorder() -> RecentSiteRecorder:
+    settings = get_settings()
+    return RecentSiteRecorder(
+        flush_interval=settings.recent_flush_interval,
+        max_batch=settings.recent_flush_max_batch,
+        use_async_engine=settings.database_async,
+    )
@@ -0,0 +1,163 @@
+import asyncio
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from time import perf_counter
+from urllib.parse import urljoin, urlsplit
+
+from ..config import get_settings
+from .fetcher import ResourceTiming, fetch_resource
+from .parser import HEAD_ELEMENTS
+
+# <link rel="preload" as="..."> values and the resource kind they load.
+PRELOAD_KINDS = {"style": "stylesheet", "script": "script", "image": "image", "font": "font"}
+# Media queries that apply on screen, so a stylesheet with them blocks rendering.
+BLOCKING_MEDIA = {"", "all", "screen"}
+
+FONT_EXTENSIONS = (".woff2", ".woff", ".ttf", ".otf", ".eot")
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""", re.IGNORECASE)
+CSS_IMPORT_PATTERN = re.compile(
+    r"""@import\s+(?:url\(\s*)?(['"]?)([^'");\s]+)\1""", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Resource:
+    url: str
+    kind: str
+    render_blocking: bool = False
+
+
+class _ResourceExtractor(HTMLParser):
+    """Collect the stylesheets, scripts, images and fonts a document loads."""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.resources: dict[str, Resource] = {}
+        self.inline_css: list[str] = []
+        self._in_head = True
+        self._in_style = False
+
+    def add(self, url: str | None, kind: str, *, render_blocking: bool = False) -> None:
+        if not url or not url.strip():
+            return
+        absolute = urljoin(self.base_url, url.strip())
+        if urlsplit(absolute).scheme not in ("http", "https"):
+            return
+        existing = self.resources.get(absolute)
+        if existing is None or (render_blocking and not existing.render_blocking):
+            self.resources[absolute] = Resource(absolute, kind, render_blocking)
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        values = {name: value or "" for name, value in attrs}
+        if tag == "body":
+            self._in_head = False
+        elif tag == "base" and values.get("href"):
+            self.base_url = urljoin(self.base_url, values["href"])
+        elif tag == "style":
+            self._in_style = True
+        elif tag == "link":
+            rel = values.get("rel", "").lower().split()
+            if "stylesheet" in rel:
+                blocking = (
+                    self._in_head
+                    and "disabled" not in values
+                    and values.get("media", "").strip().lower() in BLOCKING_MEDIA
+                )
+                self.add(values.get("href"), "stylesheet", render_blocking=blocking)
+            elif "preload" in rel and values.get("as", "").lower() in PRELOAD_KINDS:
+                self.add(values.get("href"), PRELOAD_KINDS[values["as"].lower()])
+        elif tag == "script" and values.get("src"):
+            blocking = (
+                self._in_head
+                and "async" not in values
+                and "defer" not in values
+                and values.get("type", "").lower() != "module"
+            )
+            self.add(values["src"], "script", render_blocking=blocking)
+        elif tag == "img":
+            self._in_head = False
+            self.add(values.get("src"), "image")
+        elif tag not in HEAD_ELEMENTS:
+            # Body content without a <body> tag still ends the head.
+            self._in_head = False
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self._in_head = False
+        elif tag == "style":
+            self._in_style = False
+
+    def handle_data(self, data: str) -> None:
+        if self._in_style:
+            self.inline_css.append(data)
+
+
+def css_resources(css: str, base_url: str, *, render_blocking: bool) -> list[Resource]:
+    """Fonts referenced by ``url()`` and stylesheets pulled in by ``@import``."""
+    resources = [
+        Resource(urljoin(base_url, match.group(2).strip()), "stylesheet", render_blocking)
+        for match in CSS_IMPORT_PATTERN.finditer(css)
+    ]
+    for match in CSS_URL_PATTERN.finditer(css):
+        url = urljoin(base_url, match.group(2).strip())
+        if urlsplit(url).path.lower().endswith(FONT_EXTENSIONS):
+            resources.append(Resource(url, "font"))
+    return [
+        resource for resource in resources if urlsplit(resource.url).scheme in ("http", "https")
+    ]
+
+
+def discover_resources(html: str, base_url: str) -> list[Resource]:
+    """Return the sub-resources of a page, in document order, without duplicates."""
+    extractor = _ResourceExtractor(base_url)
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:  # noqa: BLE001 - keep whatever was found before the markup broke
+        pass
+    for css in extractor.inline_css:
+        for resource in css_resources(css, extractor.base_url, render_blocking=False):
+            extractor.add(resource.url, resource.kind, render_blocking=resource.render_blocking)
+    return list(extractor.resources.values())
+
+
+async def build_waterfall(resources: Iterable[Resource]) -> list[ResourceTiming]:
+    """Fetch a page's resources concurrently and return their timings by start time.
+
+    Stylesheet bodies are read so the fonts and imports they reference are
+    fetched as soon as each stylesheet arrives, as a browser would. At most
+    ``DEEP_MAX_RESOURCES`` resources are fetched.
+    """
+    settings = get_settings()
+    origin = perf_counter()
+    seen: set[str] = set()
+    entries: list[ResourceTiming] = []
+
+    def _claim(resource: Resource) -> bool:
+        if resource.url in seen or len(seen) >= settings.deep_max_resources:
+            return False
+        seen.add(resource.url)
+        return True
+
+    async def _fetch(resource: Resource) -> None:
+        entry = ResourceTiming(
+            url=resource.url, kind=resource.kind, render_blocking=resource.render_blocking
+        )
+        entries.append(entry)
+        is_css = resource.kind == "stylesheet"
+        body = await fetch_resource(
+            entry,
+            origin=origin,
+            read_body=is_css,
+            max_bytes=settings.deep_resource_max_bytes,
+        )
+        if is_css and body:
+            css = body.decode("utf-8", errors="replace")
+            found = css_resources(css, resource.url, render_blocking=resource.render_blocking)
+            await asyncio.gather(*(_fetch(child) for child in found if _claim(child)))
+
+    await asyncio.gather(*(_fetch(resource) for resource in resources if _claim(resource)))
+    return sorted(entries, key=lambda entry: entry.start_ms)
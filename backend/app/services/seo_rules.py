@@ -1,4 +1,8 @@
-from collections.abc import Iterable
+from collections.abc import Callable, Collection, Iterable, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter_ns
 
 from .fetcher import FetchResult
 
@@ -6,6 +10,346 @@ MAX_TITLE_LENGTH = 60
 MIN_TITLE_LENGTH = 10
 MAX_DESCRIPTION_LENGTH = 160
 MIN_DESCRIPTION_LENGTH = 50
+MAX_LOAD_TIME_MS = 3000
+# Transfer sizes above which a single asset is flagged, per resource kind.
+MAX_ASSET_BYTES = {"image": 300_000, "script": 250_000, "stylesheet": 100_000, "font": 100_000}
+# Text assets smaller than this gain little from compression.
+MIN_COMPRESSIBLE_BYTES = 1_400
+COMPRESSIBLE_KINDS = ("script", "stylesheet")
+# How many offending URLs a resource finding names before summarising the rest.
+MAX_LISTED_RESOURCES = 3
+
+FETCH_FIELD_PREFIX = "fetch."
+# Only filled in by deep mode; rules reading it run in a second pass.
+RESOURCES_FIELD = "fetch.resources"
+
+Tags = Mapping[str, str | None]
+RuleCheck = Callable[[Tags, FetchResult | None], str | None]
+
+
+class UnknownRuleError(ValueError):
+    """Raised when a request enables or disables a rule id that is not registered."""
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    """A single SEO check.
+
+    ``requires`` names the tags (e.g. ``"title"``) or fetch fields (e.g.
+    ``"fetch.load_time_ms"``) the check reads; the rule is skipped when any of
+    them is absent.
+    """
+
+    id: str
+    severity: str
+    description: str
+    check: RuleCheck
+    requires: tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class Finding:
+    rule_id: str
+    severity: str
+    message: str
+
+
+@dataclass(slots=True)
+class RuleReport:
+    findings: list[Finding] = field(default_factory=list)
+    timings_ms: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def messages(self) -> list[str]:
+        return [finding.message for finding in self.findings]
+
+
+@dataclass(slots=True)
+class RuleStats:
+    calls: int = 0
+    total_ms: float = 0.0
+
+
+RULES: dict[str, Rule] = {}
+
+
+def rule(
+    rule_id: str, *, severity: str, description: str, requires: Iterable[str] = ()
+) -> Callable[[RuleCheck], RuleCheck]:
+    """Register a check function in the rule registry, in declaration order."""
+
+    def decorator(check: RuleCheck) -> RuleCheck:
+        if rule_id in RULES:
+            raise ValueError(f"Rule {rule_id!r} is already registered.")
+        RULES[rule_id] = Rule(
+            id=rule_id,
+            severity=severity,
+            description=description,
+            check=check,
+            requires=tuple(requires),
+        )
+        return check
+
+    return decorator
+
+
+@rule("title-missing", severity="error", description="Page has a <title> tag.")
+def _title_missing(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    return None if tags.get("title") else "Title tag is missing."
+
+
+@rule(
+    "title-too-short",
+    severity="warning",
+    description=f"Title is at least {MIN_TITLE_LENGTH} characters.",
+    requires=("title",),
+)
+def _title_too_short(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    if len(tags["title"]) < MIN_TITLE_LENGTH:
+        return "Title is shorter than recommended 10 characters."
+    return None
+
+
+@rule(
+    "title-too-long",
+    severity="warning",
+    description=f"Title is at most {MAX_TITLE_LENGTH} characters.",
+    requires=("title",),
+)
+def _title_too_long(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    if len(tags["title"]) > MAX_TITLE_LENGTH:
+        return "Title is longer than 60 characters."
+    return None
+
+
+@rule(
+    "meta-description-missing",
+    severity="error",
+    description="Page has a meta description.",
+)
+def _description_missing(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    return None if tags.get("meta_description") else "Meta description is missing."
+
+
+@rule(
+    "meta-description-too-short",
+    severity="warning",
+    description=f"Meta description is at least {MIN_DESCRIPTION_LENGTH} characters.",
+    requires=("meta_description",),
+)
+def _description_too_short(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    if len(tags["meta_description"]) < MIN_DESCRIPTION_LENGTH:
+        return "Meta description is shorter than 50 characters."
+    return None
+
+
+@rule(
+    "meta-description-too-long",
+    severity="warning",
+    description=f"Meta description is at most {MAX_DESCRIPTION_LENGTH} characters.",
+    requires=("meta_description",),
+)
+def _description_too_long(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    if len(tags["meta_description"]) > MAX_DESCRIPTION_LENGTH:
+        return "Meta description exceeds 160 characters."
+    return None
+
+
+@rule(
+    "open-graph-missing",
+    severity="warning",
+    description="Page has Open Graph title and description tags.",
+)
+def _open_graph_missing(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    if not tags.get("og_title") or not tags.get("og_description"):
+        return "Open Graph title/description tags are missing."
+    return None
+
+
+@rule("twitter-card-missing", severity="info", description="Page has a twitter:card tag.")
+def _twitter_card_missing(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    return None if tags.get("twitter_card") else "Twitter card meta tag is missing."
+
+
+@rule(
+    "slow-page-load",
+    severity="warning",
+    description=f"HTML loads in under {MAX_LOAD_TIME_MS} ms.",
+    requires=("fetch.load_time_ms",),
+)
+def _slow_page_load(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    if fetch_result.load_time_ms > MAX_LOAD_TIME_MS:
+        return "Page load time exceeds 3 seconds; consider performance optimizations."
+    return None
+
+
+def _list_resources(labels: list[str]) -> str:
+    listed = ", ".join(labels[:MAX_LISTED_RESOURCES])
+    if len(labels) > MAX_LISTED_RESOURCES:
+        listed += f" and {len(labels) - MAX_LISTED_RESOURCES} more"
+    return listed
+
+
+@rule(
+    "render-blocking-resources",
+    severity="warning",
+    description="No synchronous scripts or screen stylesheets in <head> (deep mode).",
+    requires=(RESOURCES_FIELD,),
+)
+def _render_blocking_resources(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    blocking = [resource.url for resource in fetch_result.resources if resource.render_blocking]
+    if blocking:
+        return (
+            f"{len(blocking)} render-blocking resource(s) delay the first paint: "
+            f"{_list_resources(blocking)}."
+        )
+    return None
+
+
+@rule(
+    "oversized-assets",
+    severity="warning",
+    description="Images, scripts, stylesheets and fonts stay under their size budgets (deep mode).",
+    requires=(RESOURCES_FIELD,),
+)
+def _oversized_assets(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    oversized = [
+        f"{resource.url} ({resource.size_bytes // 1024} KB)"
+        for resource in fetch_result.resources
+        if resource.size_bytes is not None
+        and resource.size_bytes > MAX_ASSET_BYTES.get(resource.kind, float("inf"))
+    ]
+    if oversized:
+        return (
+            f"{len(oversized)} asset(s) exceed the recommended size: "
+            f"{_list_resources(oversized)}."
+        )
+    return None
+
+
+@rule(
+    "uncompressed-text-assets",
+    severity="info",
+    description="Scripts and stylesheets are served compressed (deep mode).",
+    requires=(RESOURCES_FIELD,),
+)
+def _uncompressed_text_assets(tags: Tags, fetch_result: FetchResult | None) -> str | None:
+    uncompressed = [
+        resource.url
+        for resource in fetch_result.resources
+        if resource.kind in COMPRESSIBLE_KINDS
+        and resource.error is None
+        and not resource.compressed
+        and (resource.size_bytes or 0) >= MIN_COMPRESSIBLE_BYTES
+    ]
+    if uncompressed:
+        return (
+            f"{len(uncompressed)} text asset(s) are served without compression: "
+            f"{_list_resources(uncompressed)}."
+        )
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class _PlannedRule:
+    rule: Rule
+    tag_inputs: tuple[str, ...]
+    fetch_inputs: tuple[str, ...]
+
+
+class RulePlan:
+    """The registered rules, resolved once into a flat evaluation plan."""
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.steps = tuple(
+            _PlannedRule(
+                rule=item,
+                tag_inputs=tuple(r for r in item.requires if not r.startswith(FETCH_FIELD_PREFIX)),
+                fetch_inputs=tuple(
+                    r.removeprefix(FETCH_FIELD_PREFIX)
+                    for r in item.requires
+                    if r.startswith(FETCH_FIELD_PREFIX)
+                ),
+            )
+            for item in rules
+        )
+        self.rule_ids = frozenset(step.rule.id for step in self.steps)
+        self.resource_rule_ids = frozenset(
+            step.rule.id for step in self.steps if RESOURCES_FIELD in step.rule.requires
+        )
+
+    def validate(self, rule_ids: Iterable[str]) -> None:
+        unknown = sorted(set(rule_ids) - self.rule_ids)
+        if unknown:
+            raise UnknownRuleError(f"Unknown rule ids: {', '.join(unknown)}.")
+
+    def evaluate(
+        self,
+        seo_tags: Tags,
+        *,
+        fetch_result: FetchResult | None = None,
+        enabled: Collection[str] | None = None,
+        disabled: Collection[str] = (),
+    ) -> RuleReport:
+        report = RuleReport()
+        for step in self.steps:
+            rule_id = step.rule.id
+            if (enabled is not None and rule_id not in enabled) or rule_id in disabled:
+                continue
+            if any(not seo_tags.get(name) for name in step.tag_inputs):
+                continue
+            if step.fetch_inputs and (
+                fetch_result is None
+                or any(getattr(fetch_result, name, None) is None for name in step.fetch_inputs)
+            ):
+                continue
+
+            started = perf_counter_ns()
+            message = step.rule.check(seo_tags, fetch_result)
+            report.timings_ms[rule_id] = (perf_counter_ns() - started) / 1_000_000
+            if message:
+                report.findings.append(
+                    Finding(rule_id=rule_id, severity=step.rule.severity, message=message)
+                )
+        return report
+
+
+@lru_cache
+def get_rule_plan() -> RulePlan:
+    """Return the evaluation plan for the registered rules, built on first use."""
+    return RulePlan(RULES.values())
+
+
+_stats: dict[str, RuleStats] = {}
+_stats_lock = Lock()
+
+
+def record_rule_timings(timings_ms: Mapping[str, float]) -> None:
+    """Accumulate per-rule execution times reported by an evaluation."""
+    with _stats_lock:
+        for rule_id, elapsed in timings_ms.items():
+            stats = _stats.setdefault(rule_id, RuleStats())
+            stats.calls += 1
+            stats.total_ms += elapsed
+
+
+def rule_stats() -> dict[str, RuleStats]:
+    """Return a snapshot of accumulated per-rule timing statistics."""
+    with _stats_lock:
+        return {rule_id: RuleStats(s.calls, s.total_ms) for rule_id, s in _stats.items()}
+
+
+def evaluate_rules(
+    seo_tags: Tags,
+    *,
+    fetch_result: FetchResult | None = None,
+    enabled: Collection[str] | None = None,
+    disabled: Collection[str] = (),
+) -> RuleReport:
+    """Evaluate the registered rules and return structured findings with timings."""
+    return get_rule_plan().evaluate(
+        seo_tags, fetch_result=fetch_result, enabled=enabled, disabled=disabled
+    )
 
 
 def evaluate_seo_issues(
@@ -14,36 +358,6 @@ def evaluate_seo_issues(
     fetch_result: FetchResult | None = None,
 ) -> list[str]:
     """Return human-readable SEO issues based on simple heuristics."""
-    issues: list[str] = []
-
-    title = seo_tags.get("title")
-    description = seo_tags.get("meta_description")
-
-    if not title:
-        issues.append("Title tag is missing.")
-    else:
-        length = len(title)
-        if length < MIN_TITLE_LENGTH:
-            issues.append("Title is shorter than recommended 10 characters.")
-        if length > MAX_TITLE_LENGTH:
-            issues.append("Title is longer than 60 characters.")
-
-    if not description:
-        issues.append("Meta description is missing.")
-    else:
-        length = len(description)
-        if length < MIN_DESCRIPTION_LENGTH:
-            issues.append("Meta description is shorter than 50 characters.")
-        if length > MAX_DESCRIPTION_LENGTH:
-            issues.append("Meta description exceeds 160 characters.")
-
-    if not seo_tags.get("og_title") or not seo_tags.get("og_description"):
-        issues.append("Open Graph title/description tags are missing.")
-
-    if not seo_tags.get("twitter_card"):
-        issues.append("Twitter card meta tag is missing.")
-
-    if fetch_result and fetch_result.load_time_ms > 3000:
-        issues.append("Page load time exceeds 3 seconds; consider performance optimizations.")
-
-    return issues
+    report = evaluate_rules(seo_tags, fetch_result=fetch_result)
+    record_rule_timings(report.timings_ms)
+    return report.messages
@@ -1,26 +1,113 @@
+import hashlib
+import json
+from collections.abc import Callable, Collection, Iterator, Mapping, Sequence
 from datetime import datetime
+from threading import Lock
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    Row,
+    case,
+    delete,
+    event,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy import insert as sa_insert
+from sqlalchemy import update as sa_update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
 from ..config import get_settings
-from ..models import Base, RecentSite
+from ..models import AnalysisJob, AnalysisRecord, Base, PageSnapshot, RecentSite, TagSet
 
 
 settings = get_settings()
 
 from sqlalchemy import create_engine
 
+IS_SQLITE = "sqlite" in settings.resolved_database_url
+
 engine = create_engine(
     settings.resolved_database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.resolved_database_url else {},
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **(
+        {}
+        if IS_SQLITE
+        else {
+            "pool_size": settings.database_pool_size,
+            "max_overflow": settings.database_max_overflow,
+            "pool_pre_ping": True,
+        }
+    ),
 )
 
+if IS_SQLITE:
+
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_wal(dbapi_connection: Any, connection_record: Any) -> None:
+        # WAL lets readers proceed while a writer holds the lock.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
+class RecentSitesSnapshot:
+    """In-memory copy of the ``/recent`` rows plus an ETag for them.
+
+    Writers call :meth:`invalidate`; the next read reloads from the database.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._value: tuple[str, list[dict[str, Any]]] | None = None
+
+    def get(self, load: Callable[[], list[dict[str, Any]]]) -> tuple[str, list[dict[str, Any]]]:
+        with self._lock:
+            if self._value is None:
+                rows = load()
+                encoded = json.dumps(rows, default=str, separators=(",", ":"))
+                etag = '"' + hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32] + '"'
+                self._value = (etag, rows)
+            return self._value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+
+
+recent_sites_snapshot = RecentSitesSnapshot()
+
+
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add indexes introduced later.
+    for index in RecentSite.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    _add_missing_columns()
+
+
+def _add_missing_columns() -> None:
+    """Add nullable columns introduced after a table was first created."""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                )
 
 
 def get_session() -> Session:
@@ -54,9 +141,359 @@ def record_recent_site(
         )
         session.add(instance)
     session.commit()
+    recent_sites_snapshot.invalidate()
+
+
+# Dialects with a native INSERT ... ON CONFLICT; others use update-then-insert.
+UPSERT_INSERTS: dict[str, Callable[..., Any]] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert(
+    executor: Session | Connection,
+    model: type[Base],
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    key: str,
+    update: Collection[str] = (),
+) -> None:
+    """Insert ``rows``, updating the ``update`` columns of rows whose ``key`` already exists.
+
+    With no ``update`` columns existing rows are left as they are. On
+    PostgreSQL and SQLite this is one ``INSERT ... ON CONFLICT`` statement;
+    other dialects update each row first and insert it only if it was missing.
+    """
+    if not rows:
+        return
+    key_column = getattr(model, key)
+    bind = executor if isinstance(executor, Connection) else executor.get_bind()
+    insert = UPSERT_INSERTS.get(bind.dialect.name)
+    if insert is not None:
+        stmt = insert(model).values(list(rows))
+        if update:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[key_column],
+                set_={name: stmt.excluded[name] for name in update},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[key_column])
+        executor.execute(stmt)
+        return
+
+    for row in rows:
+        changes = {name: row[name] for name in update}
+        match = key_column == row[key]
+        if changes and executor.execute(sa_update(model).where(match).values(changes)).rowcount:
+            continue
+        if not changes and executor.execute(select(key_column).where(match)).first():
+            continue
+        try:
+            with executor.begin_nested():
+                executor.execute(sa_insert(model).values(dict(row)))
+        except IntegrityError:
+            # A concurrent writer inserted the row first; apply our update on top of it.
+            if changes:
+                executor.execute(sa_update(model).where(match).values(changes))
+
+
+def upsert_recent_sites(
+    connection: Connection, rows: Sequence[Mapping[str, Any]]
+) -> None:
+    """Write a batch of recent-site rows in a single statement."""
+    upsert(
+        connection,
+        RecentSite,
+        rows,
+        key="url",
+        update=("last_analyzed_at", "last_status_code", "last_load_time_ms"),
+    )
 
 
 def fetch_recent_sites(session: Session, *, limit: int = 20) -> list[RecentSite]:
     """Return recent sites ordered by most recent analysis."""
     stmt = select(RecentSite).order_by(RecentSite.last_analyzed_at.desc()).limit(limit)
     return list(session.scalars(stmt).all())
+
+
+def fetch_recent_site_rows(session: Session, *, limit: int = 20) -> list[dict[str, Any]]:
+    """Column-only variant of :func:`fetch_recent_sites` that skips ORM instances."""
+    stmt = (
+        select(
+            RecentSite.url,
+            RecentSite.last_analyzed_at,
+            RecentSite.last_status_code,
+            RecentSite.last_load_time_ms,
+        )
+        .order_by(RecentSite.last_analyzed_at.desc())
+        .limit(limit)
+    )
+    return [dict(row) for row in session.execute(stmt).mappings()]
+
+
+def get_page_snapshot(session: Session, url: str) -> PageSnapshot | None:
+    """Return the stored snapshot for a URL, if one exists."""
+    return session.get(PageSnapshot, url)
+
+
+def save_page_snapshot(
+    session: Session,
+    *,
+    url: str,
+    status_code: int,
+    etag: str | None,
+    last_modified: str | None,
+    body_hash: str,
+    seo_tags: dict[str, str | None],
+    findings: list[dict[str, str]],
+) -> None:
+    """Insert or replace the snapshot used for conditional re-fetching."""
+    columns = {
+        "status_code": status_code,
+        "etag": etag,
+        "last_modified": last_modified,
+        "body_hash": body_hash,
+        "seo_tags": seo_tags,
+        "findings": findings,
+        "fetched_at": datetime.utcnow(),
+    }
+    # Concurrent analyses of one URL both write; the last one wins.
+    upsert(session, PageSnapshot, [{"url": url, **columns}], key="url", update=columns)
+    session.commit()
+
+
+def hash_seo_tags(seo_tags: Mapping[str, str | None]) -> str:
+    """Return a stable SHA-256 hex digest of a tag dict."""
+    encoded = json.dumps(seo_tags, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def record_analysis(
+    session: Session,
+    *,
+    url: str,
+    status_code: int | None,
+    load_time_ms: float | None,
+    timings: Mapping[str, float] | None,
+    issue_ids: Sequence[str],
+    seo_tags: Mapping[str, str | None] | None,
+) -> None:
+    """Append an analysis to the history table, storing its tags once per distinct set."""
+    timings = timings or {}
+    tag_hash = hash_seo_tags(seo_tags) if seo_tags is not None else None
+    if tag_hash is not None:
+        upsert(session, TagSet, [{"tag_hash": tag_hash, "seo_tags": dict(seo_tags)}], key="tag_hash")
+    session.add(
+        AnalysisRecord(
+            url=url,
+            analyzed_at=datetime.utcnow(),
+            status_code=status_code,
+            load_time_ms=load_time_ms,
+            connect_ms=timings.get("connect_ms"),
+            tls_ms=timings.get("tls_ms"),
+            ttfb_ms=timings.get("ttfb_ms"),
+            download_ms=timings.get("download_ms"),
+            issue_ids=list(issue_ids),
+            issue_count=len(issue_ids),
+            tag_hash=tag_hash,
+        )
+    )
+    session.commit()
+
+
+def iter_analysis_export(
+    session: Session,
+    *,
+    url: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    chunk_rows: int = 10_000,
+) -> Iterator[Sequence[Row[Any]]]:
+    """Yield history rows joined with their tags, oldest first, ``chunk_rows`` at a time.
+
+    Rows are streamed from the database cursor, so memory use does not depend
+    on the size of the history. Rows recorded before tags were stored have
+    ``seo_tags`` set to ``None``.
+    """
+    record = AnalysisRecord
+    stmt = select(
+        record.analyzed_at,
+        record.url,
+        record.status_code,
+        record.load_time_ms,
+        record.connect_ms,
+        record.tls_ms,
+        record.ttfb_ms,
+        record.download_ms,
+        record.issue_count,
+        record.issue_ids,
+        record.tag_hash,
+        TagSet.seo_tags,
+    ).outerjoin(TagSet, TagSet.tag_hash == record.tag_hash)
+    if url is not None:
+        stmt = stmt.where(AnalysisRecord.url == url)
+    if since is not None:
+        stmt = stmt.where(AnalysisRecord.analyzed_at >= since)
+    if until is not None:
+        stmt = stmt.where(AnalysisRecord.analyzed_at < until)
+    stmt = stmt.order_by(AnalysisRecord.id).execution_options(yield_per=chunk_rows)
+    yield from session.execute(stmt).partitions()
+
+
+def fetch_analysis_history(
+    session: Session,
+    url: str,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = 500,
+) -> list[AnalysisRecord]:
+    """Return a URL's analyses in chronological order, newest ``limit`` rows."""
+    stmt = select(AnalysisRecord).where(AnalysisRecord.url == url)
+    if since is not None:
+        stmt = stmt.where(AnalysisRecord.analyzed_at >= since)
+    if until is not None:
+        stmt = stmt.where(AnalysisRecord.analyzed_at < until)
+    stmt = stmt.order_by(AnalysisRecord.analyzed_at.desc()).limit(limit)
+    return list(reversed(session.scalars(stmt).all()))
+
+
+def _nearest_rank(samples: ColumnElement[int], percent: int) -> ColumnElement[int]:
+    """SQL expression for the nearest-rank position of a percentile (ceil(p * n))."""
+    return (samples * percent + 99) // 100
+
+
+def fetch_daily_load_stats(
+    session: Session,
+    url: str,
+    *,
+    since: datetime | None = None,
+) -> list[tuple[Any, int, float | None, float | None, float | None]]:
+    """Return per-day (day, samples, p50, p95, avg issue count) rows for a URL.
+
+    Percentiles use the nearest-rank method with window functions so the
+    aggregation runs entirely in the database on both SQLite and PostgreSQL.
+    """
+    day = func.date(AnalysisRecord.analyzed_at)
+    conditions = [AnalysisRecord.url == url, AnalysisRecord.load_time_ms.is_not(None)]
+    if since is not None:
+        conditions.append(AnalysisRecord.analyzed_at >= since)
+
+    ranked = (
+        select(
+            day.label("day"),
+            AnalysisRecord.load_time_ms,
+            AnalysisRecord.issue_count,
+            func.row_number()
+            .over(partition_by=day, order_by=AnalysisRecord.load_time_ms)
+            .label("position"),
+            func.count().over(partition_by=day).label("samples"),
+        )
+        .where(*conditions)
+        .subquery()
+    )
+    stmt = (
+        select(
+            ranked.c.day,
+            func.max(ranked.c.samples),
+            func.max(
+                case(
+                    (ranked.c.position == _nearest_rank(ranked.c.samples, 50), ranked.c.load_time_ms)
+                )
+            ),
+            func.max(
+                case(
+                    (ranked.c.position == _nearest_rank(ranked.c.samples, 95), ranked.c.load_time_ms)
+                )
+            ),
+            func.avg(ranked.c.issue_count),
+        )
+        .group_by(ranked.c.day)
+        .order_by(ranked.c.day)
+    )
+    return [tuple(row) for row in session.execute(stmt)]
+
+
+def create_job(session: Session, *, job_id: str, url: str, request: Mapping[str, Any]) -> AnalysisJob:
+    """Persist a new queued analysis job."""
+    now = datetime.utcnow()
+    job = AnalysisJob(
+        id=job_id,
+        url=url,
+        request=dict(request),
+        status="queued",
+        stage="queued",
+        created_at=now,
+        updated_at=now,
+    )
+    session.add(job)
+    session.commit()
+    return job
+
+
+def update_job(
+    session: Session, job_id: str, *, only_if_status: str | None = None, **changes: Any
+) -> AnalysisJob | None:
+    """Apply ``changes`` to a job row and bump its ``updated_at``.
+
+    With ``only_if_status`` the row is only changed while it has that status,
+    checked in the same ``UPDATE``. ``None`` is returned when nothing changed.
+    """
+    stmt = sa_update(AnalysisJob).where(AnalysisJob.id == job_id)
+    if only_if_status is not None:
+        stmt = stmt.where(AnalysisJob.status == only_if_status)
+    updated = session.execute(stmt.values(**changes, updated_at=datetime.utcnow())).rowcount
+    session.commit()
+    return session.get(AnalysisJob, job_id) if updated else None
+
+
+def get_job(session: Session, job_id: str) -> AnalysisJob | None:
+    return session.get(AnalysisJob, job_id)
+
+
+def claim_job(session: Session, job_id: str) -> AnalysisJob | None:
+    """Move a queued job to ``running``; return ``None`` if it is no longer queued.
+
+    The status check and the change are one ``UPDATE``, so when several
+    processes pick up the same job exactly one of them gets it.
+    """
+    claimed = session.execute(
+        sa_update(AnalysisJob)
+        .where(AnalysisJob.id == job_id, AnalysisJob.status == "queued")
+        .values(status="running", stage="started", updated_at=datetime.utcnow())
+    ).rowcount
+    session.commit()
+    return session.get(AnalysisJob, job_id) if claimed else None
+
+
+def requeue_jobs(session: Session, *, stale_before: datetime) -> list[str]:
+    """Return the ids of queued jobs, oldest first, for picking up at startup.
+
+    Running jobs not updated since ``stale_before`` are treated as abandoned
+    by a stopped process and queued again first.
+    """
+    session.execute(
+        sa_update(AnalysisJob)
+        .where(AnalysisJob.status == "running", AnalysisJob.updated_at < stale_before)
+        .values(status="queued", stage="queued", updated_at=datetime.utcnow())
+    )
+    session.commit()
+    stmt = (
+        select(AnalysisJob.id)
+        .where(AnalysisJob.status == "queued")
+        .order_by(AnalysisJob.created_at)
+    )
+    return list(session.scalars(stmt).all())
+
+
+def delete_finished_jobs(session: Session, *, finished_before: datetime) -> int:
+    """Delete succeeded and failed jobs last updated before ``finished_before``."""
+    deleted = session.execute(
+        delete(AnalysisJob).where(
+            AnalysisJob.status.in_(("succeeded", "failed")),
+            AnalysisJob.updated_at < finished_before,
+        )
+    ).rowcount
+    session.commit()
+    return deleted
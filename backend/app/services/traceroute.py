@@ -1,8 +1,17 @@
 import asyncio
+import ipaddress
 import platform
 import re
 import shutil
-from dataclasses import dataclass
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from time import monotonic
+from urllib.parse import urlsplit
+
+from ..config import get_settings
+from .urls import url_hosts
 
 
 class TracerouteError(RuntimeError):
@@ -17,14 +26,294 @@ class TracerouteTimeoutError(TracerouteError):
     """Raised when the traceroute command exceeds the allowed timeout."""
 
 
+@dataclass(slots=True)
+class Hop:
+    """One traceroute line: the responding router and its probe round-trip times.
+
+    ``rtts_ms`` has one entry per probe, ``None`` for probes that got no
+    answer. ``loss`` is the fraction of unanswered probes.
+    """
+
+    hop: int
+    details: str
+    address: str | None = None
+    hostname: str | None = None
+    rtts_ms: tuple[float | None, ...] = ()
+    min_ms: float | None = None
+    avg_ms: float | None = None
+    loss: float | None = None
+
+
 @dataclass(slots=True)
 class TracerouteResult:
     target: str
-    hops: list[tuple[int, str]]
+    hops: list[Hop]
     raw_output: str
+    cached: bool = False
+
 
+@dataclass(slots=True)
+class TracerouteEvent:
+    """One step of a multi-target trace: a hop, the end of a trace, or its failure."""
+
+    target: str
+    kind: str
+    hop: Hop | None = None
+    cached: bool = False
+    error: str | None = None
+
+
+# Tags whose URLs may point at hosts other than the page's own (CDNs, image hosts).
+ASSET_URL_FIELDS = ("og_image", "twitter_image", "og_url", "canonical_url")
 
 HOP_PATTERN = re.compile(r"^\s*(\d+)\s+(.*)$")
+# A probe is either "*" (no answer) or a time such as "12.345 ms" or "<1 ms" (tracert).
+PROBE_PATTERN = re.compile(r"(?<![\w.])(?:\*(?![\w.])|<?(\d+(?:\.\d+)?)\s*ms\b)")
+# "host.example (192.0.2.1)" on Unix, "host.example [192.0.2.1]" from tracert.
+NAMED_ADDRESS_PATTERN = re.compile(r"([^\s()\[\]]+)\s+[(\[]([0-9A-Fa-f:.]+)[)\]]")
+
+
+def _is_ip(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_hop(line: str) -> Hop | None:
+    """Parse one line of traceroute/tracert output; ``None`` if it is not a hop."""
+    match = HOP_PATTERN.match(line)
+    if not match:
+        return None
+    details = match.group(2).strip()
+
+    address = hostname = None
+    named = NAMED_ADDRESS_PATTERN.search(details)
+    if named and _is_ip(named.group(2)):
+        address = named.group(2)
+        hostname = named.group(1) if named.group(1) != address else None
+    else:
+        address = next((token for token in details.split() if _is_ip(token)), None)
+
+    rtts_ms = tuple(
+        float(probe.group(1)) if probe.group(1) is not None else None
+        for probe in PROBE_PATTERN.finditer(details)
+    )
+    answered = [rtt for rtt in rtts_ms if rtt is not None]
+    return Hop(
+        hop=int(match.group(1)),
+        details=details,
+        address=address,
+        hostname=hostname,
+        rtts_ms=rtts_ms,
+        min_ms=min(answered) if answered else None,
+        avg_ms=round(sum(answered) / len(answered), 3) if answered else None,
+        loss=round(1 - len(answered) / len(rtts_ms), 3) if rtts_ms else None,
+    )
+
+
+def asset_hosts(page_url: str, seo_tags: Mapping[str, str | None]) -> list[str]:
+    """Hosts referenced by the page's tags, other than the page's own host."""
+    page_host = (urlsplit(page_url).hostname or "").lower()
+    hosts = url_hosts((seo_tags.get(field) for field in ASSET_URL_FIELDS), base=page_url)
+    return [host for host in hosts if host != page_host]
+
+
+@lru_cache
+def _traceroute_command() -> tuple[str, str | None, str]:
+    """Locate the traceroute binary once: (name, path or None, max-hops flag)."""
+    if platform.system().lower() == "windows":
+        return "tracert", shutil.which("tracert"), "-h"
+    return "traceroute", shutil.which("traceroute"), "-m"
+
+
+@lru_cache
+def _process_slots() -> asyncio.Semaphore:
+    return asyncio.Semaphore(get_settings().traceroute_max_processes)
+
+
+class TracerouteCache:
+    """Recent traceroute results per host and hop limit, kept for ``ttl_seconds``."""
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, int], tuple[float, TracerouteResult]] = (
+            OrderedDict()
+        )
+
+    def get(self, host: str, max_hops: int) -> TracerouteResult | None:
+        key = (host.lower(), max_hops)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return replace(result, cached=True)
+
+    def put(self, result: TracerouteResult, max_hops: int) -> None:
+        key = (result.target.lower(), max_hops)
+        self._entries[key] = (monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@lru_cache
+def get_traceroute_cache() -> TracerouteCache:
+    settings = get_settings()
+    return TracerouteCache(
+        ttl_seconds=settings.traceroute_cache_ttl_seconds,
+        max_entries=settings.traceroute_cache_max_entries,
+    )
+
+
+class _LiveTrace:
+    """One running traceroute whose hops any number of streams can follow.
+
+    The trace is cancelled once every follower has gone; a successful result
+    is cached before the trace finishes.
+    """
+
+    def __init__(self, host: str, *, max_hops: int, timeout: float) -> None:
+        self.hops: list[Hop] = []
+        self.followers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.create_task(_trace(host, max_hops, timeout, self._add))
+        self.task.add_done_callback(lambda _: self._changed.set())
+
+    def _add(self, hop: Hop) -> None:
+        self.hops.append(hop)
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[Hop]:
+        """Yield every hop so far, then each new one, until the trace ends."""
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.hops):
+                yield self.hops[index]
+                index += 1
+            if self.task.done():
+                return
+            await changed.wait()
+
+
+# Traces currently running, keyed by host and hop limit, so simultaneous
+# requests for one host (streamed or not) share a process.
+_live_traces: dict[tuple[str, int], _LiveTrace] = {}
+
+
+def _live_trace(host: str, *, max_hops: int, timeout: float) -> _LiveTrace:
+    key = (host.lower(), max_hops)
+    live = _live_traces.get(key)
+    if live is None:
+        live = _live_traces[key] = _LiveTrace(host, max_hops=max_hops, timeout=timeout)
+
+        def _forget(_: asyncio.Task[TracerouteResult]) -> None:
+            if _live_traces.get(key) is live:
+                del _live_traces[key]
+
+        live.task.add_done_callback(_forget)
+    return live
+
+
+class TracerouteStream:
+    """Yields parsed :class:`Hop` records as traceroute prints them.
+
+    Once iteration ends, :attr:`result` holds the complete trace, which is
+    also cached. A cached trace is replayed without starting a process, and
+    streams for a host that is already being traced follow that trace. At
+    most ``TRACEROUTE_MAX_PROCESSES`` traces run at once across the server.
+    The process is read by a background task, so a slow consumer never keeps
+    it (or its slot) alive longer than the trace itself takes.
+    """
+
+    def __init__(self, host: str, *, max_hops: int = 20, timeout: float = 25.0) -> None:
+        self.host = host
+        self.max_hops = max_hops
+        self.timeout = timeout
+        self.result: TracerouteResult | None = None
+
+    async def __aiter__(self) -> AsyncIterator[Hop]:
+        cached = get_traceroute_cache().get(self.host, self.max_hops)
+        if cached is not None:
+            self.result = cached
+            for hop in cached.hops:
+                yield hop
+            return
+
+        live = _live_trace(self.host, max_hops=self.max_hops, timeout=self.timeout)
+        live.followers += 1
+        try:
+            async for hop in live.follow():
+                yield hop
+            self.result = await asyncio.shield(live.task)
+        finally:
+            live.followers -= 1
+            if not live.followers and not live.task.done():
+                live.task.cancel()
+
+
+async def _trace(
+    host: str, max_hops: int, timeout: float, on_hop: Callable[[Hop], None]
+) -> TracerouteResult:
+    """Run the command, passing each hop to ``on_hop``, and cache the result."""
+    name, executable, max_hops_flag = _traceroute_command()
+    if not executable:
+        raise TracerouteUnavailableError(f"{name} command not found.")
+    command = [executable, max_hops_flag, str(max_hops), host]
+
+    async with _process_slots():
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as exc:
+            raise TracerouteError(f"Could not run {name}: {exc}") from exc
+        # Read stderr alongside stdout so a full stderr pipe cannot stall the process.
+        stderr_read = asyncio.ensure_future(process.stderr.read())
+        try:
+            lines: list[str] = []
+            parsed: list[Hop] = []
+            deadline = asyncio.get_running_loop().time() + timeout
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), remaining)
+                except asyncio.TimeoutError as exc:
+                    raise TracerouteTimeoutError("Traceroute command timed out.") from exc
+                if not line:
+                    break
+                decoded = line.decode("utf-8", errors="ignore")
+                lines.append(decoded)
+                hop = parse_hop(decoded)
+                if hop is not None:
+                    parsed.append(hop)
+                    on_hop(hop)
+            stderr = await stderr_read
+            await process.wait()
+        finally:
+            stderr_read.cancel()
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    if process.returncode not in (0, 1):
+        # Some traceroute binaries return 1 when the trace is incomplete; treat as warning.
+        message = stderr.decode("utf-8", errors="ignore").strip()
+        raise TracerouteError(message or "Traceroute command failed.")
+
+    result = TracerouteResult(target=host, hops=parsed, raw_output="".join(lines))
+    get_traceroute_cache().put(result, max_hops)
+    return result
 
 
 async def run_traceroute(
@@ -34,42 +323,49 @@ async def run_traceroute(
     timeout: float = 25.0,
 ) -> TracerouteResult:
     """Execute traceroute/tracert command and parse its output."""
-    system = platform.system().lower()
-    if system == "windows":
-        executable = shutil.which("tracert")
-        if not executable:
-            raise TracerouteUnavailableError("tracert command not found.")
-        command = [executable, "-h", str(max_hops), host]
-    else:
-        executable = shutil.which("traceroute")
-        if not executable:
-            raise TracerouteUnavailableError("traceroute command not found.")
-        command = [executable, "-m", str(max_hops), host]
-
-    process = await asyncio.create_subprocess_exec(
-        *command,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
+    stream = TracerouteStream(host, max_hops=max_hops, timeout=timeout)
+    async for _ in stream:
+        pass
+    return stream.result
 
-    try:
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-    except asyncio.TimeoutError as exc:
-        process.kill()
-        raise TracerouteTimeoutError("Traceroute command timed out.") from exc
 
-    if process.returncode not in (0, 1):
-        # Some traceroute binaries return 1 when the trace is incomplete; treat as warning.
-        message = stderr.decode("utf-8", errors="ignore").strip()
-        raise TracerouteError(message or "Traceroute command failed.")
+async def iter_traceroutes(
+    hosts: Iterable[str],
+    *,
+    max_hops: int = 20,
+    timeout: float = 25.0,
+) -> AsyncIterator[TracerouteEvent]:
+    """Trace several hosts concurrently, yielding hops in the order they arrive.
 
-    raw_output = stdout.decode("utf-8", errors="ignore")
-    hops: list[tuple[int, str]] = []
-    for line in raw_output.splitlines():
-        match = HOP_PATTERN.match(line)
-        if match:
-            hop_number = int(match.group(1))
-            details = match.group(2).strip()
-            hops.append((hop_number, details))
+    Every host ends with a ``complete`` or ``error`` event; failures of one
+    host do not stop the others.
+    """
+    events: asyncio.Queue[TracerouteEvent | None] = asyncio.Queue()
 
-    return TracerouteResult(target=host, hops=hops, raw_output=raw_output)
+    async def _trace(host: str) -> None:
+        stream = TracerouteStream(host, max_hops=max_hops, timeout=timeout)
+        try:
+            async for hop in stream:
+                events.put_nowait(TracerouteEvent(target=host, kind="hop", hop=hop))
+        except TracerouteError as exc:
+            events.put_nowait(TracerouteEvent(target=host, kind="error", error=str(exc)))
+        else:
+            events.put_nowait(
+                TracerouteEvent(target=host, kind="complete", cached=stream.result.cached)
+            )
+        finally:
+            events.put_nowait(None)
+
+    tasks = [asyncio.create_task(_trace(host)) for host in dict.fromkeys(hosts)]
+    try:
+        running = len(tasks)
+        while running:
+            event = await events.get()
+            if event is None:
+                running -= 1
+            else:
+                yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
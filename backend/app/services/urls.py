@@ -0,0 +1,41 @@
+from collections.abc import Iterable
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Return a canonical form of ``url`` for use as a cache or dedup key.
+
+    Scheme and host are lower-cased, default ports and fragments dropped, and
+    an empty path becomes ``/``. Query strings are kept as-is.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        # urlsplit drops the brackets around IPv6 literals; the netloc needs them.
+        host = f"[{host}]"
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username or parts.password:
+        userinfo = parts.username or ""
+        if parts.password:
+            userinfo += f":{parts.password}"
+        host = f"{userinfo}@{host}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+def url_hosts(urls: Iterable[str | None], *, base: str) -> list[str]:
+    """Return the distinct lower-cased hosts of ``urls``, resolved against ``base``.
+
+    Empty values and non-HTTP URLs (``data:``, ``mailto:``...) are skipped.
+    """
+    hosts: dict[str, None] = {}
+    for url in urls:
+        if not url:
+            continue
+        parts = urlsplit(urljoin(base, url.strip()))
+        if parts.scheme in DEFAULT_PORTS and parts.hostname:
+            hosts[parts.hostname.lower()] = None
+    return list(hosts)
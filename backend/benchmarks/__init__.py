@@ -0,0 +1 @@
+"""Benchmarks for the SEO Analyzer backend services."""
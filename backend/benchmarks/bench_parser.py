@@ -0,0 +1,30 @@
+"""Compare the streaming head extractor with the full BeautifulSoup parse.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_parser
+"""
+
+import timeit
+
+from app.services.parser import _parse_with_soup, parse_seo_tags
+
+from .fixtures import build_page
+
+
+def main() -> None:
+    print(f"{'page size':>12} {'soup ms':>10} {'stream ms':>10} {'speedup':>8}")
+    for blocks in (10, 1_000, 10_000):
+        html = build_page(blocks)
+        assert parse_seo_tags(html) == _parse_with_soup(html)
+        runs = max(3, 3_000 // blocks)
+        soup_ms = timeit.timeit(lambda: _parse_with_soup(html), number=runs) / runs * 1000
+        stream_ms = timeit.timeit(lambda: parse_seo_tags(html), number=runs) / runs * 1000
+        print(
+            f"{len(html) / 1024:>10.0f}KB {soup_ms:>10.2f} {stream_ms:>10.3f} "
+            f"{soup_ms / stream_ms:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Micro-benchmarks for the service functions on the /analyze path.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_services -o services.json
+
+Database benchmarks use a throwaway SQLite file, never the app database.
+"""
+
+import argparse
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from .fixtures import FIXTURE_BLOCKS, fixture_html
+from .report import BenchResult, add_output_argument, measure, write_report
+
+# Calls per benchmark at --scale 1; the huge page gets fewer.
+DEFAULT_ITERATIONS = 200
+HUGE_ITERATIONS = 10
+UPSERT_BATCH = 500
+
+
+def run(iterations: int) -> list[BenchResult]:
+    # Imported here so DATABASE_URL is set before the engine is created.
+    from app.schemas import SEOTags
+    from app.services.ai_feedback import feedback_cache_key
+    from app.services.fetcher import FetchResult
+    from app.services.parser import parse_seo_tags
+    from app.services.previews import build_previews
+    from app.services.seo_rules import evaluate_seo_issues, get_rule_plan
+    from app.services.storage import (
+        SessionLocal,
+        engine,
+        init_db,
+        record_recent_site,
+        upsert_recent_sites,
+    )
+    from app.services.urls import normalize_url
+
+    init_db()
+    results = []
+    for name in FIXTURE_BLOCKS:
+        html = fixture_html(name)
+        results.append(
+            measure(
+                f"parse_seo_tags[{name}]",
+                lambda html=html: parse_seo_tags(html),
+                iterations=HUGE_ITERATIONS if name == "huge" else iterations,
+            )
+        )
+
+    html = fixture_html("small")
+    seo_data = parse_seo_tags(html)
+    seo_tags = SEOTags(**seo_data)
+    fetch_result = FetchResult(
+        url="https://example.com/bench",
+        status_code=200,
+        load_time_ms=850.0,
+        html=html,
+    )
+    issues = evaluate_seo_issues(seo_data, fetch_result=fetch_result)
+    plan = get_rule_plan()
+
+    results += [
+        measure(
+            "evaluate_seo_issues",
+            lambda: evaluate_seo_issues(seo_data, fetch_result=fetch_result),
+            iterations=iterations * 10,
+        ),
+        measure(
+            "rule_plan.evaluate",
+            lambda: plan.evaluate(seo_data, fetch_result=fetch_result),
+            iterations=iterations * 10,
+        ),
+        measure(
+            "build_previews",
+            lambda: build_previews(seo_tags, fetch_result.url),
+            iterations=iterations * 10,
+        ),
+        measure(
+            "feedback_cache_key",
+            lambda: feedback_cache_key(seo_tags, fetch_result, issues),
+            iterations=iterations * 10,
+        ),
+        measure(
+            "normalize_url",
+            lambda: normalize_url("HTTPS://Example.COM:443/a/b?q=1#frag"),
+            iterations=iterations * 10,
+        ),
+    ]
+
+    counter = iter(range(10**9))
+
+    def _record_new_site() -> None:
+        with SessionLocal() as session:
+            record_recent_site(
+                session,
+                url=f"https://example.com/{next(counter)}",
+                status_code=200,
+                load_time_ms=850.0,
+            )
+
+    def _upsert_batch() -> None:
+        batch = next(counter)
+        rows = [
+            {
+                "url": f"https://example.com/batch/{batch}/{index}",
+                "last_analyzed_at": datetime.utcnow(),
+                "last_status_code": 200,
+                "last_load_time_ms": 850.0,
+            }
+            for index in range(UPSERT_BATCH)
+        ]
+        with engine.begin() as connection:
+            upsert_recent_sites(connection, rows)
+
+    results += [
+        measure("record_recent_site", _record_new_site, iterations=iterations),
+        measure(
+            f"upsert_recent_sites[{UPSERT_BATCH}]",
+            _upsert_batch,
+            iterations=max(1, iterations // 10),
+        ),
+    ]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply the number of iterations per benchmark.",
+    )
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    iterations = max(1, int(DEFAULT_ITERATIONS * args.scale))
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'bench.db'}"
+        results = run(iterations)
+    write_report("services", results, args.output, parameters={"iterations": iterations})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare two benchmark reports written by the other benchmark modules.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+COLUMNS = ("throughput_per_s", "p50_ms", "p99_ms", "peak_memory_kb")
+
+
+def _load(path: str) -> dict[str, dict]:
+    report = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {result["name"]: result for result in report["results"]}
+
+
+def _change(before: float | None, after: float | None) -> str:
+    if before is None or after is None:
+        return "n/a"
+    if not before:
+        return f"{after:.4g}"
+    return f"{after:.4g} ({(after - before) / before:+.1%})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    before, after = _load(args.before), _load(args.after)
+    width = max(map(len, before | after), default=4)
+    print(f"{'name':<{width}}  " + "  ".join(f"{column:>24}" for column in COLUMNS))
+    for name in sorted(before | after):
+        if name not in before or name not in after:
+            print(f"{name:<{width}}  only in {'after' if name in after else 'before'}")
+            continue
+        cells = (_change(before[name][column], after[name][column]) for column in COLUMNS)
+        print(f"{name:<{width}}  " + "  ".join(f"{cell:>24}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
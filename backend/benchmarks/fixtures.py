@@ -0,0 +1,38 @@
+"""HTML pages used by the benchmarks, from a few KB up to several MB."""
+
+from functools import lru_cache
+
+HEAD = """<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Benchmark page title for the parser</title>
+  <meta name="description" content="A page used to benchmark SEO tag extraction.">
+  <link rel="canonical" href="https://example.com/bench">
+  <meta property="og:title" content="Benchmark page">
+  <meta property="og:description" content="Open Graph description.">
+  <meta property="og:image" content="https://example.com/og.png">
+  <meta property="og:url" content="https://example.com/bench">
+  <meta name="twitter:card" content="summary_large_image">
+  <meta name="twitter:title" content="Benchmark page">
+  <meta name="twitter:description" content="Twitter description.">
+  <meta name="twitter:image" content="https://example.com/tw.png">
+</head>
+"""
+
+BODY_BLOCK = """<div class="card"><h2>Section heading</h2>
+<p>Lorem ipsum dolor sit amet, <a href="/link">consectetur</a> adipiscing elit.</p>
+<img src="/img.png" alt="illustration"><ul><li>One</li><li>Two</li></ul></div>
+"""
+
+# Number of body blocks per fixture: roughly 5 KB, 200 KB and 10 MB pages.
+FIXTURE_BLOCKS = {"small": 10, "medium": 1_000, "huge": 50_000}
+
+
+def build_page(body_blocks: int) -> str:
+    return HEAD + "<body>" + BODY_BLOCK * body_blocks + "</body></html>"
+
+
+@lru_cache
+def fixture_html(name: str) -> str:
+    return build_page(FIXTURE_BLOCKS[name])
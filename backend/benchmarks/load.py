@@ -0,0 +1,201 @@
+"""End-to-end load test of POST /analyze.
+
+The app runs in-process against a local stub site serving the fixture pages
+and a fake OpenAI endpoint, so no network access or API key is needed. Run
+from the ``backend`` directory::
+
+    python -m benchmarks.load --requests 500 --concurrency 20 -o load.json
+
+Each fixture size gets its own result. URLs carry a unique query string so
+every request misses the caches; pass ``--repeat-urls`` to measure the
+cached path instead.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from .fixtures import FIXTURE_BLOCKS, fixture_html
+from .report import BenchResult, add_output_argument, write_report
+
+FAKE_FEEDBACK = {
+    "ai_feedback": "Benchmark feedback.",
+    "google_preview": {"title": "Benchmark page", "snippet": "Benchmark snippet."},
+    "social_preview": {"title": "Benchmark page", "description": "Benchmark description."},
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Serves ``/<fixture>.html`` pages and a minimal chat completions API."""
+
+    protocol_version = "HTTP/1.1"
+    ai_latency_s = 0.0
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        name = Path(urlsplit(self.path).path).stem
+        if name not in FIXTURE_BLOCKS:
+            self._send(404, b"not found", "text/plain")
+            return
+        self._send(200, fixture_html(name).encode("utf-8"), "text/html; charset=utf-8")
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, b"not found", "text/plain")
+            return
+        time.sleep(self.ai_latency_s)
+        body = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(FAKE_FEEDBACK)},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+        self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        # The fetcher hangs up once it has read past </head> or FETCH_MAX_BYTES.
+        with contextlib.suppress(ConnectionError):
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_stub_server(ai_latency_ms: float) -> ThreadingHTTPServer:
+    handler = type("StubHandler", (_StubHandler,), {"ai_latency_s": ai_latency_ms / 1000})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _peak_rss_kb() -> float:
+    # ru_maxrss is in KB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if os.uname().sysname == "Darwin" else float(peak)
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    name: str,
+    page_url: str,
+    *,
+    requests: int,
+    concurrency: int,
+    repeat_urls: bool,
+) -> BenchResult:
+    counter = iter(range(requests))
+    samples_ms: list[float] = []
+    errors = 0
+
+    async def _worker() -> None:
+        nonlocal errors
+        for index in counter:
+            url = page_url if repeat_urls else f"{page_url}?n={index}"
+            started = perf_counter()
+            response = await client.post("/analyze", json={"url": url})
+            samples_ms.append((perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    started = perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    return BenchResult.from_samples(
+        f"analyze[{name}]",
+        samples_ms,
+        total_s=perf_counter() - started,
+        peak_memory_kb=_peak_rss_kb(),
+        errors=errors,
+    )
+
+
+async def run(args: argparse.Namespace, stub_url: str) -> list[BenchResult]:
+    # Imported here so the environment points the app at the stubs first.
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        return [
+            await _drive(
+                client,
+                name,
+                f"{stub_url}/{name}.html",
+                requests=args.requests,
+                concurrency=args.concurrency,
+                repeat_urls=args.repeat_urls,
+            )
+            for name in args.fixtures
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per fixture.")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--fixtures",
+        nargs="+",
+        choices=list(FIXTURE_BLOCKS),
+        default=list(FIXTURE_BLOCKS),
+    )
+    parser.add_argument(
+        "--ai-latency-ms",
+        type=float,
+        default=0.0,
+        help="Delay added by the fake OpenAI endpoint.",
+    )
+    parser.add_argument(
+        "--repeat-urls",
+        action="store_true",
+        help="Request the same URL each time so the caches are hit.",
+    )
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.ai_latency_ms)
+    stub_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.environ.update(
+                DATABASE_URL=f"sqlite:///{Path(workdir) / 'bench.db'}",
+                OPENAI_API_KEY="benchmark",
+                OPENAI_BASE_URL=f"{stub_url}/v1",
+                AI_FEEDBACK_ENABLED="true",
+            )
+            results = asyncio.run(run(args, stub_url))
+    finally:
+        server.shutdown()
+
+    parameters = {name: value for name, value in vars(args).items() if name != "output"}
+    write_report("load", results, args.output, parameters=parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Measurement helpers and the JSON report format shared by the benchmarks.
+
+Every benchmark writes one JSON document::
+
+    {"benchmark": "services", "python": "3.12.1", "git_revision": "a1b2c3d",
+     "created_at": "...", "results": [{"name": ..., "p50_ms": ..., ...}]}
+
+Results are sorted by name so two reports can be diffed directly, or
+compared with ``python -m benchmarks.compare``.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+
+@dataclass(slots=True)
+class BenchResult:
+    name: str
+    iterations: int
+    total_s: float
+    throughput_per_s: float
+    p50_ms: float
+    p99_ms: float
+    peak_memory_kb: float | None
+    errors: int = 0
+
+    @classmethod
+    def from_samples(
+        cls,
+        name: str,
+        samples_ms: Sequence[float],
+        *,
+        total_s: float,
+        peak_memory_kb: float | None,
+        errors: int = 0,
+    ) -> "BenchResult":
+        return cls(
+            name=name,
+            iterations=len(samples_ms),
+            total_s=round(total_s, 4),
+            throughput_per_s=round(len(samples_ms) / total_s, 2) if total_s else 0.0,
+            p50_ms=round(percentile(samples_ms, 50), 4),
+            p99_ms=round(percentile(samples_ms, 99), 4),
+            peak_memory_kb=round(peak_memory_kb, 1) if peak_memory_kb is not None else None,
+            errors=errors,
+        )
+
+
+def percentile(samples: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile, matching ``/history/daily``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def measure(name: str, func: Callable[[], Any], *, iterations: int) -> BenchResult:
+    """Time ``iterations`` calls of ``func``, then trace one more for peak memory.
+
+    Memory is traced in a separate call because tracemalloc slows down
+    allocation-heavy code enough to distort the timings.
+    """
+    func()
+    samples_ms = []
+    started = perf_counter()
+    for _ in range(iterations):
+        call_started = perf_counter()
+        func()
+        samples_ms.append((perf_counter() - call_started) * 1000)
+    total_s = perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchResult.from_samples(
+        name, samples_ms, total_s=total_s, peak_memory_kb=peak / 1024
+    )
+
+
+def _git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def add_output_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="Write the JSON report to this file instead of stdout.",
+    )
+
+
+def write_report(
+    benchmark: str,
+    results: Sequence[BenchResult],
+    output: str,
+    *,
+    parameters: dict[str, Any] | None = None,
+) -> None:
+    report = {
+        "benchmark": benchmark,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git_revision": _git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "parameters": parameters or {},
+        "results": [asdict(result) for result in sorted(results, key=lambda r: r.name)],
+    }
+    encoded = json.dumps(report, indent=2) + "\n"
+    if output == "-":
+        sys.stdout.write(encoded)
+    else:
+        Path(output).write_text(encoded, encoding="utf-8")
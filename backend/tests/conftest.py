@@ -0,0 +1,23 @@
+"""Shared test setup: the suite runs against a throwaway SQLite database."""
+
+import os
+import tempfile
+
+import pytest
+
+# Set before the app is imported, since the engine is created at import time.
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="seo-analyzer-tests-"), "test.db"
+)
+
+
+@pytest.fixture
+def db():
+    """The storage module with a created schema; every table is emptied afterwards."""
+    from app.services import storage
+
+    storage.init_db()
+    yield storage
+    with storage.engine.begin() as connection:
+        for table in reversed(storage.Base.metadata.sorted_tables):
+            connection.execute(table.delete())
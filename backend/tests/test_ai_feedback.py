@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import get_settings
+from app.schemas import SEOTags
+from app.services import ai_feedback
+from app.services.ai_feedback import FeedbackStream, feedback_cache_key
+from app.services.fetcher import FetchResult
+from app.services.metrics import collect_server_timing
+
+FETCH_RESULT = FetchResult(url="https://example.com/", status_code=200, load_time_ms=10, html="")
+
+
+class _FakeStream:
+    def __init__(self, deltas: list[str]) -> None:
+        self.deltas = deltas
+        self.closed = False
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def openai_stream(db, monkeypatch):
+    """Stream completions from a fake client with a single concurrency slot."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(settings, "ai_feedback_enabled", True)
+    monkeypatch.setattr(settings, "openai_max_concurrency", 1)
+    monkeypatch.setattr(settings, "feedback_cache_memory_entries", 0)
+    ai_feedback._completion_semaphore.cache_clear()
+    ai_feedback.get_feedback_cache.cache_clear()
+    streams: list[_FakeStream] = []
+
+    async def _create(**kwargs):
+        streams.append(_FakeStream(["Good ", "page ", "overall."]))
+        return streams[-1]
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_create)))
+    monkeypatch.setattr(ai_feedback, "get_openai_client", lambda: client)
+    yield streams
+    ai_feedback._completion_semaphore.cache_clear()
+    ai_feedback.get_feedback_cache.cache_clear()
+
+
+def _stream(title: str) -> FeedbackStream:
+    return FeedbackStream(SEOTags(title=title), FETCH_RESULT, [])
+
+
+def test_streamed_feedback_has_its_own_cache_key():
+    tags = SEOTags(title="Example")
+
+    assert feedback_cache_key(tags, FETCH_RESULT, [], stream=True) != feedback_cache_key(
+        tags, FETCH_RESULT, []
+    )
+
+
+def test_stream_records_openai_time_and_caches_the_result(openai_stream):
+    async def scenario():
+        stream = _stream("Complete")
+        with collect_server_timing() as timings:
+            deltas = [delta async for delta in stream]
+        return stream, deltas, timings
+
+    stream, deltas, timings = asyncio.run(scenario())
+
+    assert "".join(deltas) == "Good page overall."
+    assert "openai" in timings
+    assert openai_stream[0].closed
+    cached = ai_feedback.get_feedback_cache().get(
+        feedback_cache_key(SEOTags(title="Complete"), FETCH_RESULT, [], stream=True)
+    )
+    assert cached == stream.result
+
+
+def test_aclose_releases_the_completion_slot(openai_stream):
+    async def scenario():
+        abandoned = _stream("Abandoned")
+        iterator = abandoned.__aiter__()
+        await anext(iterator)
+        # The client went away: nothing will iterate this stream again.
+        await abandoned.aclose()
+        return await asyncio.wait_for(_collect(_stream("Next")), timeout=1)
+
+    async def _collect(stream: FeedbackStream) -> str:
+        return "".join([delta async for delta in stream])
+
+    assert asyncio.run(scenario()) == "Good page overall."
+    assert openai_stream[0].closed
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app import main
+from app.schemas import AnalyzeRequest
+from app.services.fetcher import FetchResult
+from app.services.metrics import collect_server_timing, span
+
+URL = "https://example.com/"
+HTML = "<html><head><title>Example</title></head><body></body></html>"
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Queue the FetchResults that fetch_html returns, in order."""
+    queued: list[FetchResult] = []
+
+    async def _fetch_html(url, **kwargs):
+        return queued.pop(0)
+
+    monkeypatch.setattr(main, "fetch_html", _fetch_html)
+    return queued
+
+
+def _analyze(db) -> tuple[FetchResult, list[str]]:
+    payload = AnalyzeRequest(url=URL, include_ai_feedback=False)
+    with db.SessionLocal() as session:
+        fetch_result, _, findings = asyncio.run(main._analyze_page(payload, session))
+    return fetch_result, [finding.rule_id for finding in findings]
+
+
+def test_not_modified_page_is_judged_on_the_new_fetch(db, fetches):
+    fetches.append(
+        FetchResult(
+            url=URL, status_code=200, load_time_ms=5000, html=HTML, etag='"v1"', body_hash="a" * 64
+        )
+    )
+    fetches.append(
+        FetchResult(url=URL, status_code=304, load_time_ms=50, html="", not_modified=True)
+    )
+
+    _, first = _analyze(db)
+    fetch_result, second = _analyze(db)
+
+    assert "slow-page-load" in first
+    assert "slow-page-load" not in second
+    assert fetch_result.status_code == 200
+    assert set(first) - {"slow-page-load"} == set(second)
+
+
+def test_not_modified_without_a_snapshot_is_a_bad_gateway(db, fetches):
+    fetches.append(
+        FetchResult(url=URL, status_code=304, load_time_ms=50, html="", not_modified=True)
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        _analyze(db)
+
+    assert exc_info.value.status_code == 502
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/analyze/https://x.com/p?id=1&sort=desc", "https://x.com/p?id=1&sort=desc"),
+        ("/analyze/https:/x.com/p?id=1&refresh=true", "https://x.com/p?id=1"),
+        ("/analyze/x.com/p", "https://x.com/p"),
+        ("/analyze/http://[2001:db8::1]:8080/", "http://[2001:db8::1]:8080/"),
+    ],
+)
+def test_path_route_rebuilds_the_target_url(path, expected, monkeypatch):
+    analysed: list[str] = []
+
+    async def _analyze_shared(request):
+        analysed.append(str(request.url))
+        raise HTTPException(status_code=418)
+
+    monkeypatch.setattr(main, "_analyze_shared", _analyze_shared)
+    monkeypatch.setattr(main, "get_analysis_cache", lambda: _NoCache())
+
+    TestClient(main.app).get(path)
+
+    assert analysed == [expected]
+
+
+class _NoCache:
+    def get(self, url):
+        return None
+
+
+def test_coalesced_requests_all_get_the_shared_stage_timings(monkeypatch):
+    calls = 0
+
+    async def _run_analysis(payload, session):
+        nonlocal calls
+        calls += 1
+        with span("fetch"):
+            await asyncio.sleep(0.01)
+        return "result"
+
+    monkeypatch.setattr(main, "_run_analysis", _run_analysis)
+    payload = AnalyzeRequest(url=URL, include_ai_feedback=False)
+
+    async def _request() -> dict[str, float]:
+        with collect_server_timing() as timings:
+            assert await main._analyze_shared(payload) == "result"
+        return timings
+
+    async def scenario():
+        return await asyncio.gather(_request(), _request())
+
+    first, second = asyncio.run(scenario())
+
+    assert calls == 1
+    assert first.keys() == second.keys() == {"fetch"}
+    assert first == second
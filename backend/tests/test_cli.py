@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from app.cli import main
+from app.services.batch import iter_batch_analysis
+
+
+@pytest.mark.parametrize("flag", ["--concurrency", "--per-host-concurrency"])
+@pytest.mark.parametrize("value", ["0", "-1", "many"])
+def test_concurrency_flags_must_be_positive(flag, value, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main([flag, value])
+
+    assert exit_info.value.code == 2
+    assert "at least 1" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("limits", [(0, 1), (1, 0)])
+def test_batch_rejects_limits_below_one(limits):
+    concurrency, per_host_concurrency = limits
+
+    async def scenario():
+        async for _ in iter_batch_analysis(
+            ["https://example.com/"],
+            concurrency=concurrency,
+            per_host_concurrency=per_host_concurrency,
+        ):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
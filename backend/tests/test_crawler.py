@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import crawler
+from app.services.crawler import SiteCrawl, fetch_robots
+from app.services.fetcher import FetchResult
+
+ROBOTS = "User-agent: *\nDisallow: /private/\n"
+# Where each URL ends up after redirects.
+REDIRECTS = {
+    "https://site.test/to-private": "https://site.test/private/page",
+    "https://site.test/to-other": "https://other.test/page",
+}
+LINKS = {"https://site.test/": ["https://site.test/to-private", "https://site.test/to-other"]}
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Serve the site above and record every URL fetched."""
+    fetched: list[str] = []
+
+    async def _fetch_html(url, **kwargs):
+        fetched.append(url)
+        final_url = REDIRECTS.get(url, url)
+        html = ROBOTS if url.endswith("/robots.txt") else "<html></html>"
+        return FetchResult(
+            url=final_url,
+            status_code=200,
+            load_time_ms=1.0,
+            html=html,
+            content_type="text/html",
+        )
+
+    async def _parse_crawled_page(fetch_result):
+        return {"title": fetch_result.url}, [], LINKS.get(fetch_result.url, [])
+
+    monkeypatch.setattr(crawler, "fetch_html", _fetch_html)
+    monkeypatch.setattr(crawler, "parse_crawled_page", _parse_crawled_page)
+    return fetched
+
+
+def _crawl(seed: str) -> tuple[list[str], SiteCrawl]:
+    crawl = SiteCrawl(seed, max_depth=2, max_pages=10, concurrency=2)
+
+    async def scenario():
+        return [page.url async for page in crawl]
+
+    return asyncio.run(scenario()), crawl
+
+
+def test_redirects_to_disallowed_or_off_site_pages_are_skipped(fetches):
+    pages, crawl = _crawl("https://site.test/")
+
+    assert pages == ["https://site.test/"]
+    assert crawl.summary.disallowed == 1
+    # The off-site target's robots.txt is never needed.
+    assert "https://other.test/robots.txt" not in fetches
+
+
+def test_robots_that_cannot_be_loaded_disallow_everything(monkeypatch):
+    async def _fetch_html(url, **kwargs):
+        raise httpx.InvalidURL("bad host")
+
+    monkeypatch.setattr(crawler, "fetch_html", _fetch_html)
+
+    robots = asyncio.run(fetch_robots("https://site.test"))
+
+    assert not robots.can_fetch("*", "https://site.test/")
@@ -0,0 +1,133 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from app.config import get_settings
+from app.services.export import (
+    COLUMNS,
+    ExportUnavailableError,
+    export_history,
+    issue_bitset,
+    issue_rule_ids,
+)
+
+
+def _decode_bits(bits: int, rule_ids: list[str]) -> set[str]:
+    return {rule_id for position, rule_id in enumerate(rule_ids) if bits >> position & 1}
+
+
+def test_issue_bitset_sets_one_bit_per_rule():
+    positions = {"a": 0, "b": 1, "c": 5}
+
+    assert issue_bitset([], positions) == 0
+    assert issue_bitset(["a"], positions) == 0b1
+    assert issue_bitset(["c", "a"], positions) == 0b100001
+    assert issue_bitset(["b", "b"], positions) == 0b10
+
+
+def test_issue_bitset_drops_unknown_rules():
+    assert issue_bitset(["retired-rule", "a"], {"a": 0}) == 1
+
+
+def test_issue_bits_round_trip_through_registered_rules():
+    rule_ids = issue_rule_ids()
+    positions = {rule_id: index for index, rule_id in enumerate(rule_ids)}
+    chosen = {rule_ids[0], rule_ids[-1]}
+
+    assert _decode_bits(issue_bitset(chosen, positions), rule_ids) == chosen
+
+
+def test_unknown_format_is_rejected_up_front():
+    with pytest.raises(ValueError):
+        export_history("xlsx")
+
+
+@pytest.fixture
+def history(db, monkeypatch):
+    """Three recorded analyses, exported two rows per chunk."""
+    monkeypatch.setattr(get_settings(), "export_chunk_rows", 2)
+    rule_ids = issue_rule_ids()
+    rows = [
+        ("https://a.example/", [rule_ids[0]], {"title": "A", "meta_description": "About A"}),
+        ("https://b.example/", [], {"title": "B, with a comma", "meta_description": None}),
+        (
+            "https://a.example/",
+            [rule_ids[0], rule_ids[1]],
+            {"title": "A", "meta_description": "About A"},
+        ),
+    ]
+    with db.SessionLocal() as session:
+        for url, issue_ids, seo_tags in rows:
+            db.record_analysis(
+                session,
+                url=url,
+                status_code=200,
+                load_time_ms=12.5,
+                timings={"connect_ms": 1.0, "tls_ms": 2.0, "ttfb_ms": 3.0, "download_ms": 4.0},
+                issue_ids=issue_ids,
+                seo_tags=seo_tags,
+            )
+    return rows
+
+
+def test_csv_export_round_trip(history):
+    data = gzip.decompress(b"".join(export_history("csv")))
+    records = list(csv.DictReader(io.StringIO(data.decode("utf-8"))))
+
+    assert list(records[0]) == list(COLUMNS)
+    assert len(records) == len(history)
+    rule_ids = issue_rule_ids()
+    for record, (url, issue_ids, seo_tags) in zip(records, history):
+        assert record["url"] == url
+        assert record["status_code"] == "200"
+        assert float(record["ttfb_ms"]) == 3.0
+        assert record["issue_count"] == str(len(issue_ids))
+        assert _decode_bits(int(record["issue_bits"]), rule_ids) == set(issue_ids)
+        assert record["title"] == seo_tags["title"]
+        assert record["meta_description"] == (seo_tags["meta_description"] or "")
+    # Identical tags are stored once and shared through tag_hash.
+    assert records[0]["tag_hash"] == records[2]["tag_hash"] != records[1]["tag_hash"]
+
+
+def test_csv_export_filters_by_url(history):
+    data = gzip.decompress(b"".join(export_history("csv", url="https://b.example/")))
+    records = list(csv.DictReader(io.StringIO(data.decode("utf-8"))))
+
+    assert [record["url"] for record in records] == ["https://b.example/"]
+
+
+def test_parquet_export_round_trip(history):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(export_history("parquet"))))
+    table = parquet.read()
+
+    # One row group per chunk of export_chunk_rows.
+    assert parquet.num_row_groups == 2
+    assert table.column_names == list(COLUMNS)
+    rule_ids = json.loads(table.schema.metadata[b"issue_rule_ids"])
+    assert rule_ids == issue_rule_ids()
+    rows = table.to_pylist()
+    for row, (url, issue_ids, seo_tags) in zip(rows, history):
+        assert row["url"] == url
+        assert _decode_bits(row["issue_bits"], rule_ids) == set(issue_ids)
+        assert row["title"] == seo_tags["title"]
+        assert row["meta_description"] == seo_tags["meta_description"]
+
+
+def test_parquet_export_without_pyarrow(monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def _no_pyarrow(name, *args, **kwargs):
+        if name == "pyarrow" or name.startswith("pyarrow."):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", _no_pyarrow)
+    with pytest.raises(ExportUnavailableError):
+        export_history("parquet")
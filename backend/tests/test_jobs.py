@@ -0,0 +1,50 @@
+import asyncio
+
+from app.services.jobs import JobQueue
+
+
+def _queue(runner) -> JobQueue:
+    return JobQueue(runner, workers=1, stale_seconds=600, retention_seconds=3600)
+
+
+def test_job_runs_to_completion(db):
+    async def runner(request, progress):
+        progress("fetched")
+        return {"url": request["url"]}
+
+    async def scenario():
+        queue = _queue(runner)
+        await queue.start()
+        submitted = await queue.submit("https://example.com/", {"url": "https://example.com/"})
+        events = [event async for event in queue.events(submitted.job_id)]
+        await queue.stop()
+        return events
+
+    events = asyncio.run(scenario())
+
+    assert events[-1].status == "succeeded"
+    assert events[-1].result == {"url": "https://example.com/"}
+
+
+def test_stage_writes_after_a_cancelled_job_is_requeued_change_nothing(db):
+    async def scenario():
+        running = asyncio.Event()
+
+        async def runner(request, progress):
+            progress("fetched")
+            running.set()
+            await asyncio.sleep(60)
+
+        queue = _queue(runner)
+        await queue.start()
+        submitted = await queue.submit("https://example.com/", {"url": "https://example.com/"})
+        await running.wait()
+        await queue.stop()
+        # A stage write that was still in its thread when the job was requeued.
+        late = await asyncio.to_thread(queue._write, submitted.job_id, {"stage": "parsed"})
+        return late, queue.get(submitted.job_id)
+
+    late, job = asyncio.run(scenario())
+
+    assert late is None
+    assert (job.status, job.stage) == ("queued", "queued")
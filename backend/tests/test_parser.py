@@ -0,0 +1,95 @@
+import pytest
+
+from app.services.parser import (
+    SEO_FIELDS,
+    _parse_head_streaming,
+    _parse_with_soup,
+    parse_seo_tags,
+)
+from benchmarks.fixtures import fixture_html
+
+pytest.importorskip("bs4")
+
+# Documents with a recognisable head, which the streaming parser handles itself.
+STRUCTURED_DOCUMENTS = {
+    "benchmark fixture": fixture_html("small"),
+    "entities": (
+        "<html><head><title> Caf&eacute; &amp; Bar  </title>"
+        '<meta name="description" content="Fish &amp; chips &quot;fresh&quot;">'
+        "</head><body></body></html>"
+    ),
+    "upper-case markup": (
+        '<HTML><HEAD><TITLE>Upper</TITLE><META NAME="description" CONTENT="up">'
+        '<LINK REL="canonical" HREF="/c"></HEAD><BODY>x</BODY></HTML>'
+    ),
+    "unquoted attributes": (
+        "<html><head><meta property=og:title content=Unquoted>"
+        "<link rel=canonical href=https://example.com/u></head></html>"
+    ),
+    "first duplicate wins": (
+        "<html><head><title>First</title><title>Second</title>"
+        '<meta name="description" content="one"><meta name="description" content="two">'
+        "</head></html>"
+    ),
+    "noscript and script in head": (
+        '<html><head><noscript><img src="x.gif"></noscript><script>var a="<body>";</script>'
+        '<meta name="twitter:card" content="summary"></head><body><p>x</p></body></html>'
+    ),
+    "self-closing noscript": (
+        '<html><head><noscript/><meta name="description" content="after"></head></html>'
+    ),
+    "several rel tokens": (
+        '<html><head><link rel="alternate canonical" href="/multi"></head></html>'
+    ),
+    "missing and empty content": (
+        '<html><head><meta name="description"><meta property="og:image" content=""></head></html>'
+    ),
+    "implicit head": (
+        '<!doctype html><html><title>No head tag</title><meta name="description" content="d">'
+        "<p>body starts</p></html>"
+    ),
+    "multi-line title": "<html><head><title>\n  Line one\n  line two \n</title></head></html>",
+    "every field": (
+        "<html><head><title>T</title>"
+        '<meta name="description" content="D"><link rel="canonical" href="https://e.com/">'
+        '<meta property="og:title" content="OT"><meta property="og:description" content="OD">'
+        '<meta property="og:image" content="https://e.com/o.png">'
+        '<meta property="og:url" content="https://e.com/o">'
+        '<meta name="twitter:card" content="summary"><meta name="twitter:title" content="TT">'
+        '<meta name="twitter:description" content="TD">'
+        '<meta name="twitter:image" content="https://e.com/t.png"></head><body></body></html>'
+    ),
+}
+
+# Documents the streaming parser hands to BeautifulSoup.
+FALLBACK_DOCUMENTS = {
+    "fragment without structure": '<title>Fragment</title><meta name="description" content="f">',
+    "unterminated title": "<html><head><title>Never closed",
+}
+
+
+@pytest.mark.parametrize("html", STRUCTURED_DOCUMENTS.values(), ids=STRUCTURED_DOCUMENTS.keys())
+def test_streaming_parser_matches_beautifulsoup(html):
+    streamed = _parse_head_streaming(html)
+
+    assert streamed is not None
+    assert streamed == _parse_with_soup(html)
+    assert tuple(streamed) == SEO_FIELDS
+
+
+@pytest.mark.parametrize("html", FALLBACK_DOCUMENTS.values(), ids=FALLBACK_DOCUMENTS.keys())
+def test_unstructured_documents_fall_back_to_beautifulsoup(html):
+    assert _parse_head_streaming(html) is None
+    assert parse_seo_tags(html) == _parse_with_soup(html)
+
+
+def test_streaming_parser_stops_at_the_body():
+    html = (
+        "<html><head><title>Head title</title></head>"
+        '<body><meta name="description" content="in the body"></body></html>'
+    )
+
+    seo_data = parse_seo_tags(html)
+
+    assert seo_data["title"] == "Head title"
+    assert seo_data["meta_description"] is None
@@ -0,0 +1,49 @@
+import asyncio
+
+from app.services.recent_recorder import RecentSiteRecorder
+
+
+def _status_codes(storage) -> dict[str, int | None]:
+    with storage.SessionLocal() as session:
+        rows = storage.fetch_recent_site_rows(session)
+    return {row["url"]: row["last_status_code"] for row in rows}
+
+
+def test_failed_flush_is_retried_without_overwriting_newer_updates(db, monkeypatch):
+    recorder = RecentSiteRecorder(flush_interval=60, max_batch=1000)
+    write = RecentSiteRecorder._flush_sync
+    failures = [RuntimeError("database unavailable")]
+
+    def _flaky(rows):
+        if failures:
+            raise failures.pop()
+        write(rows)
+
+    monkeypatch.setattr(recorder, "_flush_sync", _flaky)
+
+    async def scenario():
+        recorder.record(url="https://a.example/", status_code=200, load_time_ms=1.0)
+        recorder.record(url="https://b.example/", status_code=200, load_time_ms=1.0)
+        assert not await recorder.flush()
+        assert recorder.pending == 2
+        # A newer update for a queued URL replaces the failed one.
+        recorder.record(url="https://a.example/", status_code=500, load_time_ms=1.0)
+        assert await recorder.flush()
+        await recorder.stop()
+
+    asyncio.run(scenario())
+
+    assert _status_codes(db) == {"https://a.example/": 500, "https://b.example/": 200}
+
+
+def test_stop_writes_everything_still_queued(db):
+    recorder = RecentSiteRecorder(flush_interval=60, max_batch=1000)
+
+    async def scenario():
+        for index in range(5):
+            recorder.record(url=f"https://{index}.example/", status_code=200, load_time_ms=1.0)
+        await recorder.stop()
+        return recorder.pending
+
+    assert asyncio.run(scenario()) == 0
+    assert len(_status_codes(db)) == 5
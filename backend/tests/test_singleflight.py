@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_task():
+    async def scenario():
+        flight: SingleFlight[str, int] = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return 42
+
+        waiters = [asyncio.create_task(flight.run("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert len(flight) == 1
+        release.set()
+        results = await asyncio.gather(*waiters)
+        return calls, results, len(flight)
+
+    calls, results, in_flight = asyncio.run(scenario())
+
+    assert calls == 1
+    assert results == [42] * 5
+    assert in_flight == 0
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight: SingleFlight[str, str] = SingleFlight()
+
+        async def work(value: str) -> str:
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(
+            flight.run("a", lambda: work("a")), flight.run("b", lambda: work("b"))
+        )
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+
+
+def test_every_waiter_gets_the_exception():
+    async def scenario():
+        flight: SingleFlight[str, int] = SingleFlight()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flight.run("key", work) for _ in range(3)), return_exceptions=True
+        )
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_results_are_not_reused_after_completion():
+    async def scenario():
+        flight: SingleFlight[str, int] = SingleFlight()
+        counter = 0
+
+        async def work() -> int:
+            nonlocal counter
+            counter += 1
+            return counter
+
+        return await flight.run("key", work), await flight.run("key", work)
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_cancelled_caller_does_not_cancel_shared_task():
+    async def scenario():
+        flight: SingleFlight[str, str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> str:
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.run("key", work))
+        second = asyncio.create_task(flight.run("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
@@ -0,0 +1,183 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, inspect, select, text
+
+from app.models import FeedbackCacheEntry, PageSnapshot, TagSet
+from app.services.feedback_cache import FeedbackCache
+
+
+@pytest.fixture(params=["native", "fallback"])
+def upsert_path(request, db, monkeypatch):
+    """Run a test with INSERT ... ON CONFLICT and with the update-then-insert fallback."""
+    if request.param == "fallback":
+        monkeypatch.delitem(db.UPSERT_INSERTS, "sqlite")
+    return db
+
+
+def _tag_sets(storage) -> dict[str, dict]:
+    with storage.SessionLocal() as session:
+        return {row.tag_hash: row.seo_tags for row in session.scalars(select(TagSet))}
+
+
+def test_upsert_inserts_then_updates(upsert_path):
+    storage = upsert_path
+    with storage.engine.begin() as connection:
+        storage.upsert(
+            connection,
+            TagSet,
+            [{"tag_hash": "a", "seo_tags": {"title": "A"}}, {"tag_hash": "b", "seo_tags": {}}],
+            key="tag_hash",
+            update=("seo_tags",),
+        )
+        storage.upsert(
+            connection,
+            TagSet,
+            [{"tag_hash": "a", "seo_tags": {"title": "A2"}}],
+            key="tag_hash",
+            update=("seo_tags",),
+        )
+
+    assert _tag_sets(storage) == {"a": {"title": "A2"}, "b": {}}
+
+
+def test_upsert_without_update_columns_keeps_existing_rows(upsert_path):
+    storage = upsert_path
+    with storage.SessionLocal() as session:
+        storage.upsert(session, TagSet, [{"tag_hash": "a", "seo_tags": {"v": 1}}], key="tag_hash")
+        storage.upsert(session, TagSet, [{"tag_hash": "a", "seo_tags": {"v": 2}}], key="tag_hash")
+        session.commit()
+
+    assert _tag_sets(storage) == {"a": {"v": 1}}
+
+
+def test_upsert_ignores_empty_batches(upsert_path):
+    with upsert_path.engine.begin() as connection:
+        upsert_path.upsert(connection, TagSet, [], key="tag_hash")
+
+    assert _tag_sets(upsert_path) == {}
+
+
+def test_record_analysis_stores_each_tag_set_once(upsert_path):
+    storage = upsert_path
+    with storage.SessionLocal() as session:
+        for _ in range(2):
+            storage.record_analysis(
+                session,
+                url="https://example.com/",
+                status_code=200,
+                load_time_ms=10.0,
+                timings=None,
+                issue_ids=[],
+                seo_tags={"title": "Same"},
+            )
+
+    assert list(_tag_sets(storage).values()) == [{"title": "Same"}]
+
+
+def _feedback(text: str):
+    return text, {"title": "t", "snippet": "s"}, {"title": "t", "description": "d"}
+
+
+def _cache_rows(storage) -> int:
+    with storage.SessionLocal() as session:
+        return session.scalar(select(func.count()).select_from(FeedbackCacheEntry))
+
+
+def test_feedback_cache_put_overwrites_existing_key(upsert_path):
+    cache = FeedbackCache(ttl_seconds=60, max_entries=100, memory_entries=0)
+    cache.put("key", _feedback("old"))
+    cache.put("key", _feedback("new"))
+
+    assert _cache_rows(upsert_path) == 1
+    assert cache.get("key") == _feedback("new")
+    assert cache.stats.database_hits == 1
+
+
+def test_feedback_cache_trims_least_recently_used_rows_periodically(db):
+    cache = FeedbackCache(ttl_seconds=60, max_entries=200, memory_entries=0)
+    assert cache.trim_interval == 2
+
+    for index in range(201):
+        cache.put(f"key-{index}", _feedback(str(index)))
+    # The 201st write is not a trim point, so the table may run over briefly.
+    assert _cache_rows(db) == 201
+
+    with db.SessionLocal() as session:
+        session.get(FeedbackCacheEntry, "key-0").last_used_at = datetime.utcnow()
+        session.commit()
+    cache.put("key-201", _feedback("201"))
+
+    assert _cache_rows(db) == 200
+    assert cache.get("key-0") is not None
+    assert cache.get("key-1") is None
+
+
+def _recent_row(url: str, status_code: int, analyzed_at: datetime) -> dict:
+    return {
+        "url": url,
+        "last_analyzed_at": analyzed_at,
+        "last_status_code": status_code,
+        "last_load_time_ms": 5.0,
+    }
+
+
+def test_upsert_recent_sites_keeps_one_row_per_url(upsert_path):
+    storage = upsert_path
+    first, second = datetime(2024, 1, 1), datetime(2024, 1, 2)
+    with storage.engine.begin() as connection:
+        storage.upsert_recent_sites(
+            connection,
+            [
+                _recent_row("https://a.example/", 200, first),
+                _recent_row("https://b.example/", 200, first),
+            ],
+        )
+        storage.upsert_recent_sites(connection, [_recent_row("https://a.example/", 404, second)])
+
+    with storage.SessionLocal() as session:
+        rows = storage.fetch_recent_site_rows(session)
+
+    assert [(row["url"], row["last_status_code"], row["last_analyzed_at"]) for row in rows] == [
+        ("https://a.example/", 404, second),
+        ("https://b.example/", 200, first),
+    ]
+
+
+def _save_snapshot(storage, *, status_code: int, etag: str, title: str) -> None:
+    with storage.SessionLocal() as session:
+        storage.save_page_snapshot(
+            session,
+            url="https://example.com/",
+            status_code=status_code,
+            etag=etag,
+            last_modified=None,
+            body_hash="0" * 64,
+            seo_tags={"title": title},
+            findings=[],
+        )
+
+
+def test_save_page_snapshot_replaces_the_stored_snapshot(upsert_path):
+    storage = upsert_path
+    _save_snapshot(storage, status_code=200, etag='"v1"', title="Old")
+    _save_snapshot(storage, status_code=203, etag='"v2"', title="New")
+
+    with storage.SessionLocal() as session:
+        snapshot = storage.get_page_snapshot(session, "https://example.com/")
+        count = session.scalar(select(func.count()).select_from(PageSnapshot))
+
+    assert count == 1
+    assert snapshot.status_code == 203
+    assert snapshot.etag == '"v2"'
+    assert snapshot.seo_tags == {"title": "New"}
+
+
+def test_init_db_adds_columns_missing_from_older_databases(db):
+    with db.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE page_snapshots DROP COLUMN status_code"))
+
+    db.init_db()
+
+    columns = {column["name"] for column in inspect(db.engine).get_columns("page_snapshots")}
+    assert "status_code" in columns
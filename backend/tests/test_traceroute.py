@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from app.services import traceroute
+from app.services.traceroute import Hop, parse_hop
+
+
+def test_parse_hop_unix_named_address():
+    hop = parse_hop(" 1  _gateway (192.168.1.1)  0.512 ms  0.480 ms  0.455 ms")
+
+    assert hop == Hop(
+        hop=1,
+        details="_gateway (192.168.1.1)  0.512 ms  0.480 ms  0.455 ms",
+        address="192.168.1.1",
+        hostname="_gateway",
+        rtts_ms=(0.512, 0.48, 0.455),
+        min_ms=0.455,
+        avg_ms=0.482,
+        loss=0.0,
+    )
+
+
+def test_parse_hop_bare_address_with_lost_probe():
+    hop = parse_hop(" 3  10.0.0.1  5.1 ms *  4.9 ms")
+
+    assert hop.address == "10.0.0.1"
+    assert hop.hostname is None
+    assert hop.rtts_ms == (5.1, None, 4.9)
+    assert hop.min_ms == 4.9
+    assert hop.avg_ms == 5.0
+    assert hop.loss == 0.333
+
+
+def test_parse_hop_windows_tracert():
+    hop = parse_hop("  4    <1 ms    <1 ms     2 ms  router.example [192.0.2.7]")
+
+    assert hop.hop == 4
+    assert hop.address == "192.0.2.7"
+    assert hop.hostname == "router.example"
+    assert hop.rtts_ms == (1.0, 1.0, 2.0)
+
+
+def test_parse_hop_ipv6_without_reverse_name():
+    hop = parse_hop(" 5  2001:db8::1 (2001:db8::1)  12.0 ms  11.5 ms  11.8 ms")
+
+    assert hop.address == "2001:db8::1"
+    assert hop.hostname is None
+
+
+@pytest.mark.parametrize(
+    "line",
+    [" 2  * * *", "  6     *        *        *     Request timed out."],
+)
+def test_parse_hop_unanswered(line):
+    hop = parse_hop(line)
+
+    assert hop.address is None
+    assert hop.rtts_ms == (None, None, None)
+    assert hop.min_ms is None and hop.avg_ms is None
+    assert hop.loss == 1.0
+
+
+@pytest.mark.parametrize(
+    "line",
+    ["traceroute to example.com (93.184.216.34), 20 hops max, 60 byte packets", "", "   "],
+)
+def test_parse_hop_ignores_non_hop_lines(line):
+    assert parse_hop(line) is None
+
+
+@pytest.fixture
+def fake_traceroute(tmp_path, monkeypatch):
+    """A traceroute stand-in that logs each run and prints two hops slowly."""
+    runs = tmp_path / "runs.log"
+    script = tmp_path / "traceroute"
+    script.write_text(
+        "#!/bin/sh\n"
+        f'echo "$@" >> "{runs}"\n'
+        'echo " 1  192.0.2.1  1.0 ms"\n'
+        "sleep 0.2\n"
+        'echo " 2  192.0.2.2  2.0 ms"\n'
+    )
+    script.chmod(0o755)
+    command = ("traceroute", str(script), "-m")
+    monkeypatch.setattr(traceroute, "_traceroute_command", lambda: command)
+    traceroute._process_slots.cache_clear()
+    traceroute.get_traceroute_cache.cache_clear()
+    yield runs
+    traceroute._process_slots.cache_clear()
+    traceroute.get_traceroute_cache.cache_clear()
+
+
+def test_streams_and_runs_for_one_host_share_a_process(fake_traceroute):
+    async def _streamed() -> list[int]:
+        return [
+            event.hop.hop
+            async for event in traceroute.iter_traceroutes(["example.com"])
+            if event.kind == "hop"
+        ]
+
+    async def scenario():
+        return await asyncio.gather(
+            _streamed(), _streamed(), traceroute.run_traceroute("EXAMPLE.com")
+        )
+
+    first, second, result = asyncio.run(scenario())
+
+    assert first == second == [hop.hop for hop in result.hops] == [1, 2]
+    assert len(fake_traceroute.read_text().splitlines()) == 1
+    assert traceroute._live_traces == {}
+
+
+def test_abandoned_trace_is_stopped_and_not_cached(fake_traceroute):
+    async def scenario():
+        stream = traceroute.TracerouteStream("example.com")
+        iterator = stream.__aiter__()
+        await anext(iterator)
+        await iterator.aclose()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert traceroute._live_traces == {}
+    assert traceroute.get_traceroute_cache().get("example.com", 20) is None
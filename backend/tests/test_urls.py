@@ -0,0 +1,17 @@
+import pytest
+
+from app.services.urls import normalize_url
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("HTTPS://Example.COM", "https://example.com/"),
+        ("http://example.com:80/a?b=1#frag", "http://example.com/a?b=1"),
+        ("https://example.com:8443/", "https://example.com:8443/"),
+        ("http://[2001:DB8::1]/", "http://[2001:db8::1]/"),
+        ("http://[2001:db8::1]:8080/p?q", "http://[2001:db8::1]:8080/p?q"),
+    ],
+)
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected